@@ -7,9 +7,40 @@ the matrix to be passed as an input is a two-dimensional array
 the program constructs an internal, working version of the matrix as a grid of linked lists
 a backtracking, recursive algorithm operates on the matrix, removing and restoring columns and rows, until an empty matrix is obtained
 This project tests a wide range of your programming skills: working with complex pointer-based structures, tricky boundary cases and recursion, using a small set of custom objects. Knuth’s pseudo-code is your guide, but you have to fill in some of the details, in order to obtain a working Python implementation.
+
+Two engines are provided, with the same methods:
+
++ `DLX`: one `DLXNode` object per 1-cell, the links being object references.
++ `ArrayDLX`: the links are stored in parallel integer arrays, and nodes are plain indices into these arrays.
+
+A search can be instrumented with a `SearchStats` collector, which also reports its progress, and saved to disk with a `Checkpoint`, to be resumed after a crash.
+
+Both also solve Knuth's generalized exact cover problem: the columns after the first `primary` ones are secondary columns, which are covered at most once and are never chosen for branching. An entry of a secondary column can have a color, in which case the column may be shared by any number of rows, as long as they give it the same color. Primary columns can have multiplicities: column `j` must then be covered by a number of rows between the bounds given in `multiplicities[j]`.
 """
 
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import unittest
+from array import array
+from contextlib import nullcontext, redirect_stdout
+from functools import partial
+from io import StringIO
+
 class DLXNode:
+    # The color of a node (0 if it has none), and the state of a column header for the generalized problem.
+    # These defaults are only overridden on the nodes that need it.
+    color = 0
+    secondary = False
+    room = 1  # Number of rows the column can still take
+    slack = 0  # Upper bound minus lower bound of the column multiplicity
+
     def __init__(self):
         self.left = self
         self.right = self
@@ -17,46 +48,312 @@ class DLXNode:
         self.down = self
         self.column = self
         self.row_id = None  # Track row indices
+        self.size = 0  # Number of live nodes, on column headers
+
+class SearchStats:
+    """
+    Statistics of a search, collected when passed as `stats` to `solutions` or `count_solutions`. Without it, the search runs exactly as before: the counting wrappers are only installed on the engine for the duration of an instrumented search.
+
+    Levels are numbered by the number of rows on the search path: the root is level 0.
+
+    + `nodes`: search nodes visited, i.e. calls to `choose_column`
+    + `solutions`: solutions found
+    + `nodes_per_level[k]`: search nodes visited at level k
+    + `branches_per_level[k]`: sum of the number of choices of the nodes of level k
+    + `updates_per_level[k]`: nodes removed from their lists (each of them is restored later) with k rows on the path
+    + `fraction_done`: estimated fraction of the search tree already explored, updated at each progress report
+    + `nodes_per_second`: throughput, updated at each progress report
+
+    The progress estimate follows Knuth: if the search is at choice i_k (from 0) of the d_k choices of the node at each level k of the current path, the tree explored so far is estimated at i_0 / d_0 + i_1 / (d_0 d_1) + ... of the whole.
+    """
+
+    def __init__(self, progress=None, interval=1.0):
+        """
+        :param progress: function called as `progress(stats)` every `interval` seconds during the search
+        :type progress: callable
+        :param interval: seconds between two progress reports
+        :type interval: float
+        """
+        self.progress = progress
+        self.interval = interval
+        self.nodes = 0
+        self.solutions = 0
+        self.nodes_per_level = []
+        self.branches_per_level = []
+        self.updates_per_level = []
+        self.fraction_done = 0.0
+        self.nodes_per_second = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def updates(self):
+        return sum(self.updates_per_level)
+
+    def branching_factors(self):
+        """
+        :return: the average number of choices of the search nodes, level by level
+        :rtype: list
+        """
+        return [branches / nodes if nodes else 0.0 for branches, nodes in zip(self.branches_per_level, self.nodes_per_level)]
+
+    def _add(self, counts, level, value):
+        while len(counts) <= level:
+            counts.append(0)
+        counts[level] += value
+
+
+class Checkpoint:
+    """
+    Checkpoints of a search, saved to a file, when passed as `checkpoint` to `solutions` or `count_solutions`.
+
+    The state of a search is the path of row choices from the root to the next search node to visit: every solution before that node, in search order, has been found, and none after it. It is saved every `interval` seconds, when the generator is closed between two solutions, and once the search is over. If the file already exists, the search resumes from the path it holds, on any engine built from the same matrix with the same options.
+
+    + `path`: the row indices of the path (None where a generalized search closes a column)
+    + `solutions`: the number of solutions found before the path, over all the runs
+    + `done`: True once the search is over
+
+    A run that dies between two checkpoints has found solutions after the saved path: if it stored them, it should keep only the first `solutions` ones before resuming.
+    """
+
+    def __init__(self, filename, interval=60.0):
+        """
+        :param filename: the checkpoint file, loaded if it exists
+        :type filename: str
+        :param interval: seconds between two saves
+        :type interval: float
+        """
+        self.filename = filename
+        self.interval = interval
+        self.path = ()
+        self.solutions = 0
+        self.done = False
+        self.matrix = None  # Fingerprint of the matrix and options the path belongs to
+        if os.path.exists(filename):
+            with open(filename) as checkpoint_file:
+                state = json.load(checkpoint_file)
+            self.path = tuple(state['path'])
+            self.solutions = state['solutions']
+            self.done = state['done']
+            self.matrix = state['matrix']
+
+    def save(self):
+        """
+        Write the checkpoint to a temporary file, then move it over the previous one, so that a crash leaves either of them whole.
+        """
+        state = {'path': list(self.path), 'solutions': self.solutions, 'done': self.done, 'matrix': self.matrix}
+        temporary = self.filename + '.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temporary, self.filename)
+
 
 class DLX:
-    def __init__(self, matrix):
+    def __init__(self, matrix, early_exit=False, primary=None, multiplicities=None):
+        """
+        Build the toroidal matrix.
+
+        For sparse input, and colors, see the `from_rows`, `from_csr` and `from_file` constructors.
+
+        :param matrix: a 0/1 matrix, as a list of rows; None leaves the matrix to be built by `create_from_rows`
+        :type matrix: list
+        :param early_exit: if True, `choose_column` stops at the first column of size 0 or 1 instead of looking for the smallest one. The solutions are the same, but may come in a different order.
+        :type early_exit: bool
+        :param primary: the number of primary columns: the columns after them are secondary. If None, all the columns are primary.
+        :type primary: int
+        :param multiplicities: maps primary column indices to the number of rows that must cover them, either an int, or a pair of bounds (lower, upper). The other primary columns are covered exactly once.
+        :type multiplicities: dict
+        """
         self.header = DLXNode()
         self.columns = []
         self.solution = []
-        self.create_toridal_matrix(matrix)
+        self.early_exit = early_exit
+        self.primary = primary
+        self.multiplicities = multiplicities
+        self.generalized = False
+        self.reset_counters()
+        if matrix is not None:
+            self.create_toridal_matrix(matrix)
+
+    @classmethod
+    def from_rows(cls, rows, num_columns, **options):
+        """
+        Build the structure from a sparse matrix, in time proportional to the number of 1s.
+
+        :param rows: an iterable of rows, each an iterable of the column indices of its 1s. It is read only once, one row at a time: a generator never needs to hold the whole matrix. An entry in a secondary column can be a pair (column index, color), the color being any hashable value.
+        :type rows: iterable
+        :param num_columns: the number of columns
+        :type num_columns: int
+        :param options: other arguments of the constructor
+        :return: a new object
+        """
+        dlx = cls(None, **options)
+        dlx.create_from_rows(rows, num_columns)
+        return dlx
+
+    @classmethod
+    def from_csr(cls, indptr, indices, num_columns, data=None, **options):
+        """
+        Build the structure from a matrix in compressed sparse row format, as stored by `scipy.sparse.csr_matrix`: the column indices of row i are `indices[indptr[i]:indptr[i+1]]`. For a SciPy matrix `m`, call `from_csr(m.indptr, m.indices, m.shape[1], m.data)`.
+
+        :param indptr: row offsets into `indices`, of length (number of rows + 1)
+        :type indptr: sequence
+        :param indices: column indices
+        :type indices: sequence
+        :param num_columns: the number of columns
+        :type num_columns: int
+        :param data: the values matching `indices`; entries whose value is 0 are skipped. If None, every entry is a 1.
+        :type data: sequence
+        :param options: other arguments of the constructor
+        :return: a new object
+        """
+        def rows():
+            for i in range(len(indptr) - 1):
+                start, end = indptr[i], indptr[i + 1]
+                if data is None:
+                    yield indices[start:end]
+                else:
+                    yield [indices[k] for k in range(start, end) if data[k]]
+        return cls.from_rows(rows(), num_columns, **options)
+
+    @classmethod
+    def from_file(cls, file, num_columns=None, **options):
+        """
+        Build the structure from a text file, read lazily, one line per row: each line lists the column indices of the row's 1s, separated by whitespace (a blank line is an empty row). An entry `j:color` gives a color to the entry in secondary column `j`.
+
+        :param file: a path, or an open text file
+        :type file: str or file
+        :param num_columns: the number of columns; if None, the first line of the file holds it
+        :type num_columns: int
+        :param options: other arguments of the constructor
+        :return: a new object
+        """
+        with (nullcontext(file) if hasattr(file, 'read') else open(file)) as lines:
+            if num_columns is None:
+                first_line = lines.readline()
+                if not first_line.strip():
+                    raise ValueError("the first line of the file should hold the number of columns")
+                num_columns = int(first_line)
+            return cls.from_rows((map(_parse_entry, line.split()) for line in lines), num_columns, **options)
+
+    def reset_counters(self):
+        """
+        Zero the `choose_column` work counters:
+
+        + `choose_calls`: number of calls to `choose_column`
+        + `columns_examined`: column headers read by `choose_column`
+        + `nodes_not_walked`: nodes that counting the column sizes by walking down each examined column would have visited
+        + `early_exits`: calls that stopped at a column of size 0 or 1
+        """
+        self.choose_calls = 0
+        self.columns_examined = 0
+        self.nodes_not_walked = 0
+        self.early_exits = 0
 
     def create_toridal_matrix(self, matrix):
-        num_columns = len(matrix[0])
-        column_nodes = [DLXNode() for _ in range(num_columns)]
+        rows = ([j for j, val in enumerate(row) if val] for row in matrix)
+        self.create_from_rows(rows, len(matrix[0]))
+
+    def create_from_rows(self, rows, num_columns):
+        """
+        Build the toroidal matrix from sparse rows (see `from_rows`).
+
+        :param rows: an iterable of rows, each an iterable of column indices
+        :type rows: iterable
+        :param num_columns: the number of columns
+        :type num_columns: int
+        :raises ValueError: if a column index is out of range, or repeated in a row, if a primary column is given a color, or if the multiplicities are invalid
+        """
+        primary = self._check_primary(num_columns)
+        self.columns = column_nodes = [DLXNode() for _ in range(num_columns)]
         for i in range(num_columns):
+            column_nodes[i].column = column_nodes[i]
+            if i >= primary:
+                # Secondary columns stay out of the header list, and are never chosen
+                column_nodes[i].secondary = True
+                continue
             self.header.right.left = column_nodes[i]
             column_nodes[i].right = self.header.right
             self.header.right = column_nodes[i]
             column_nodes[i].left = self.header
-            column_nodes[i].column = column_nodes[i]
-        for row_idx, row in enumerate(matrix):
+        color_ids = {}
+        self.color_names = [None]
+        num_rows = 0
+        for row_idx, row in enumerate(rows):
+            num_rows = row_idx + 1
             row_nodes = []
-            for j, val in enumerate(row):
-                if val:
-                    node = DLXNode()
-                    node.row_id = row_idx  # Track the row index
-                    column_nodes[j].up.down = node
-                    node.down = column_nodes[j]
-                    node.up = column_nodes[j].up
-                    column_nodes[j].up = node
-                    node.column = column_nodes[j]
-                    if row_nodes:
-                        node.left.right = row_nodes[-1]
-                        row_nodes[-1].right = node
-                        node.left = row_nodes[-1]
-                        node.right = row_nodes[0]
-                        row_nodes[0].left = node
-                    else:
-                        node.left = node
-                        node.right = node
-                    row_nodes.append(node)
+            for j in row:
+                color = None
+                if isinstance(j, tuple):
+                    j, color = j
+                if not 0 <= j < num_columns:
+                    raise ValueError("row {}: column {} out of range".format(row_idx, j))
+                column = column_nodes[j]
+                if column.up.row_id == row_idx:
+                    raise ValueError("row {}: column {} repeated".format(row_idx, j))
+                node = DLXNode()
+                node.row_id = row_idx  # Track the row index
+                if color is not None:
+                    if j < primary:
+                        raise ValueError("row {}: primary column {} cannot have a color".format(row_idx, j))
+                    if color not in color_ids:
+                        color_ids[color] = len(self.color_names)
+                        self.color_names.append(color)
+                    node.color = color_ids[color]
+                column.up.down = node
+                node.down = column
+                node.up = column.up
+                column.up = node
+                column.size += 1
+                node.column = column
+                if row_nodes:
+                    row_nodes[-1].right = node
+                    node.left = row_nodes[-1]
+                    node.right = row_nodes[0]
+                    row_nodes[0].left = node
+                row_nodes.append(node)
+        self.num_rows = num_rows
+        self._apply_multiplicities()
+
+    def _check_primary(self, num_columns):
+        """
+        Resolve the number of primary columns, once the number of columns is known.
+        """
+        if self.primary is None:
+            self.primary = num_columns
+        if not 0 <= self.primary <= num_columns:
+            raise ValueError("{} primary columns, out of {} columns".format(self.primary, num_columns))
+        return self.primary
+
+    def _apply_multiplicities(self):
+        """
+        Check the multiplicities given to the constructor, store them as (lower, upper) pairs on the column headers, and decide whether the generalized search is needed (colors, or multiplicities other than 1).
+        """
+        multiplicities = {}
+        for j, bounds in (self.multiplicities or {}).items():
+            lower, upper = (bounds, bounds) if isinstance(bounds, int) else bounds
+            if not 0 <= j < self.primary:
+                raise ValueError("column {} is not a primary column, and cannot have a multiplicity".format(j))
+            if not 0 <= lower <= upper or upper < 1:
+                raise ValueError("column {}: invalid multiplicity {}".format(j, bounds))
+            multiplicities[j] = (lower, upper)
+            self._set_bounds(j, lower, upper)
+        self.multiplicities = multiplicities
+        self.generalized = len(self.color_names) > 1 or any(bounds != (1, 1) for bounds in multiplicities.values())
+
+    def _set_bounds(self, j, lower, upper):
+        self.columns[j].room = upper
+        self.columns[j].slack = upper - lower
+
+    def _options(self):
+        """
+        :return: the constructor arguments that rebuild the same problem from `compact_matrix`
+        :rtype: dict
+        """
+        return {'early_exit': self.early_exit, 'primary': self.primary, 'multiplicities': self.multiplicities}
 
     def search(self, k):
+        if self.generalized:
+            return self._search_general()
         if self.header.right == self.header:
             self.print_solution()
             self.print_solution_rows()
@@ -81,6 +378,881 @@ class DLX:
         self.uncover_column(column)
         return False
 
+    def solutions(self, limit=None, iterative=False, stats=None, checkpoint=None):
+        """
+        Enumerate the exact covers, one at a time, without printing them.
+
+        .. note:: The matrix is modified while the generator is suspended: do not run another search on the same object until the generator is exhausted or closed (closing it restores the matrix).
+
+        :param limit: stop after that many solutions (no limit if None)
+        :type limit: int
+        :param iterative: if True, search with an explicit stack instead of recursion: there is no depth limit, and the solutions come in the same order. The generalized problem is always solved with an explicit stack.
+        :type iterative: bool
+        :param stats: if given, collect the statistics of the search into it, and report progress (see `SearchStats`)
+        :type stats: SearchStats
+        :param checkpoint: if given, resume the search from it, and save it periodically (see `Checkpoint`); the search then runs with an explicit stack
+        :type checkpoint: Checkpoint
+        :return: a generator of solutions, each a tuple of row indices
+        :rtype: generator
+        """
+        if limit is not None and limit <= 0:
+            return
+        covers = self._cover_generator(iterative) if checkpoint is None else self._checkpointed(checkpoint)
+        if stats is not None:
+            covers = self._instrumented(covers, stats)
+        try:
+            count = 0
+            for _ in covers:
+                yield self.solution_rows()
+                count += 1
+                if count == limit:
+                    return
+        finally:
+            covers.close()
+
+    def count_solutions(self, limit=None, iterative=False, stats=None, checkpoint=None):
+        """
+        Count the exact covers, without building the row tuples.
+
+        :param limit: stop counting at that many solutions (no limit if None)
+        :type limit: int
+        :param iterative: if True, search with an explicit stack instead of recursion
+        :type iterative: bool
+        :param stats: if given, collect the statistics of the search into it (see `SearchStats`)
+        :type stats: SearchStats
+        :param checkpoint: if given, resume the search from it, and save it periodically (see `Checkpoint`)
+        :type checkpoint: Checkpoint
+        :return: the number of solutions found by this run (`checkpoint.solutions` counts those of the previous runs too)
+        :rtype: int
+        """
+        if limit is not None and limit <= 0:
+            return 0
+        covers = self._cover_generator(iterative) if checkpoint is None else self._checkpointed(checkpoint)
+        if stats is not None:
+            covers = self._instrumented(covers, stats)
+        count = 0
+        try:
+            for _ in covers:
+                count += 1
+                if count == limit:
+                    break
+        finally:
+            covers.close()
+        return count
+
+    def _cover_generator(self, iterative, path=None):
+        """
+        :param path: if given, start from that search node (see `_enter`), with an explicit stack
+        :return: the search generator for this problem (see `_covers`)
+        """
+        if self.generalized:
+            return self._covers_general(path or ())
+        if path is not None:
+            return self._covers_iterative(path)
+        return self._covers_iterative() if iterative else self._covers()
+
+    def _covers(self):
+        """
+        Recursive generator behind `solutions` and `count_solutions`: yield (None) every time `self.solution` holds a complete cover. Covered columns are restored on the way out, whether the generator is exhausted or closed.
+        """
+        if self.header.right == self.header:
+            yield
+            return
+        column = self.choose_column()
+        self.cover_column(column)
+        try:
+            row_node = column.down
+            while row_node != column:
+                self.solution.append(row_node)
+                right_node = row_node.right
+                while right_node != row_node:
+                    self.cover_column(right_node.column)
+                    right_node = right_node.right
+                try:
+                    yield from self._covers()
+                finally:
+                    self.solution.pop()
+                    left_node = row_node.left
+                    while left_node != row_node:
+                        self.uncover_column(left_node.column)
+                        left_node = left_node.left
+                row_node = row_node.down
+        finally:
+            self.uncover_column(column)
+
+    def _covers_iterative(self, path=()):
+        """
+        Non-recursive version of `_covers`, that visits the search tree in the same order.
+
+        The search path is kept in two parallel lists, that make up the stack frames: `columns[i]` is the column chosen at depth i, and `self.solution[i]` the row currently tried in that column.
+
+        :param path: start from that search node (see `_enter`) instead of the root, and carry on with the rest of the tree
+        :type path: tuple
+        """
+        header = self.header
+        solution = self.solution
+        columns = self._enter(path)
+        try:
+            while True:
+                # Descend: a new node of the search tree
+                if header.right == header:
+                    yield
+                    row_node = None
+                else:
+                    column = self.choose_column()
+                    self.cover_column(column)
+                    columns.append(column)
+                    row_node = column.down
+                # Move to the next row to try, backtracking out of exhausted columns
+                while columns:
+                    column = columns[-1]
+                    if row_node is None:
+                        row_node = solution.pop()
+                        left_node = row_node.left
+                        while left_node != row_node:
+                            self.uncover_column(left_node.column)
+                            left_node = left_node.left
+                        row_node = row_node.down
+                    if row_node != column:
+                        solution.append(row_node)
+                        right_node = row_node.right
+                        while right_node != row_node:
+                            self.cover_column(right_node.column)
+                            right_node = right_node.right
+                        break
+                    self.uncover_column(columns.pop())
+                    row_node = None
+                else:
+                    return
+        finally:
+            # Closed while suspended: undo the current path
+            while columns:
+                row_node = solution.pop()
+                left_node = row_node.left
+                while left_node != row_node:
+                    self.uncover_column(left_node.column)
+                    left_node = left_node.left
+                self.uncover_column(columns.pop())
+
+    def solution_rows(self):
+        """
+        :return: the row indices of the rows currently in `self.solution`
+        :rtype: tuple
+        """
+        return tuple(node.row_id for node in self.solution)
+
+    def compact_matrix(self):
+        """
+        Export the matrix as lists of column indices, to rebuild the same structure somewhere else. The matrix must not be covered.
+
+        :return: a pair (number of columns, list of rows), each row being a tuple of column indices, or (column index, color) pairs
+        :rtype: tuple
+        """
+        rows = [[] for _ in range(self.num_rows)]
+        for j, column in enumerate(self.columns):
+            node = column.down
+            while node != column:
+                rows[node.row_id].append((j, self.color_names[node.color]) if node.color else j)
+                node = node.down
+        return len(self.columns), [tuple(row) for row in rows]
+
+    def _enter(self, path):
+        """
+        Replay a search path: at each level, choose a column the way the search does, cover it, and select the row of the path in that column.
+
+        :param path: row indices, one per level
+        :type path: tuple
+        :return: the columns chosen along the path, to be passed to `_leave`
+        :rtype: list
+        :raises ValueError: if the path is not a path of the search tree
+        """
+        if self.generalized:
+            return self._enter_general(path)
+        columns = []
+        for row in path:
+            if self.header.right == self.header:
+                self._leave(columns)
+                raise ValueError("path {} is longer than the search tree is deep".format(path))
+            column = self.choose_column()
+            row_node = column.down
+            while row_node != column and row_node.row_id != row:
+                row_node = row_node.down
+            if row_node == column:
+                self._leave(columns)
+                raise ValueError("row {} is not a choice at depth {} of the search".format(row, len(columns)))
+            self.cover_column(column)
+            columns.append(column)
+            self.solution.append(row_node)
+            right_node = row_node.right
+            while right_node != row_node:
+                self.cover_column(right_node.column)
+                right_node = right_node.right
+        return columns
+
+    def _leave(self, columns):
+        """
+        Undo `_enter`.
+
+        :param columns: the columns returned by `_enter`
+        :type columns: list
+        """
+        if self.generalized:
+            return self._leave_general(columns)
+        while columns:
+            row_node = self.solution.pop()
+            left_node = row_node.left
+            while left_node != row_node:
+                self.uncover_column(left_node.column)
+                left_node = left_node.left
+            self.uncover_column(columns.pop())
+
+    def _branch_rows(self):
+        """
+        :return: the row indices of the column the search would branch on next, or None if the matrix is empty (a solution)
+        :rtype: list
+        """
+        if self.generalized:
+            return self._branch_rows_general()
+        if self.header.right == self.header:
+            return None
+        column = self.choose_column()
+        rows = []
+        row_node = column.down
+        while row_node != column:
+            rows.append(row_node.row_id)
+            row_node = row_node.down
+        return rows
+
+    def split(self, depth):
+        """
+        Split the search tree at a given depth: every path of length `depth` is the root of an independent subtree. Shorter paths are returned if they already are solutions.
+
+        :param depth: the depth at which the tree is split
+        :type depth: int
+        :return: a list of paths, each a tuple of row indices, in search order
+        :rtype: list
+        """
+        paths = [()]
+        for _ in range(depth):
+            deeper = []
+            for path in paths:
+                columns = self._enter(path)
+                rows = self._branch_rows()
+                self._leave(columns)
+                if rows is None:
+                    deeper.append(path)
+                else:
+                    deeper.extend(path + (row,) for row in rows)
+            paths = deeper
+        return paths
+
+    def parallel_solutions(self, limit=None, processes=None, split_depth=1):
+        """
+        Enumerate the exact covers over a pool of processes.
+
+        The search tree is cut at `split_depth` (see `split`): each path becomes a task, and every worker rebuilds the structure once from `compact_matrix`, then enumerates the subtrees it is handed. The tasks are handed out one at a time, to whichever worker is idle, so that a few large subtrees do not leave the other workers waiting; a deeper split makes smaller tasks. Solutions are yielded as the tasks complete, in no particular order.
+
+        :param limit: stop after that many solutions (no limit if None)
+        :type limit: int
+        :param processes: number of worker processes (default: the number of CPUs)
+        :type processes: int
+        :param split_depth: depth at which the search tree is cut into tasks
+        :type split_depth: int
+        :return: a generator of solutions, each a tuple of row indices
+        :rtype: generator
+        """
+        if limit is not None and limit <= 0:
+            return
+        results = self._parallel_map(False, limit, processes, split_depth)
+        try:
+            count = 0
+            for solutions in results:
+                for rows in solutions:
+                    yield rows
+                    count += 1
+                    if count == limit:
+                        return
+        finally:
+            results.close()
+
+    def parallel_count_solutions(self, limit=None, processes=None, split_depth=1):
+        """
+        Count the exact covers over a pool of processes (see `parallel_solutions`).
+
+        :param limit: stop counting at that many solutions (no limit if None)
+        :type limit: int
+        :param processes: number of worker processes (default: the number of CPUs)
+        :type processes: int
+        :param split_depth: depth at which the search tree is cut into tasks
+        :type split_depth: int
+        :return: the number of solutions
+        :rtype: int
+        """
+        if limit is not None and limit <= 0:
+            return 0
+        results = self._parallel_map(True, limit, processes, split_depth)
+        count = 0
+        try:
+            for task_count in results:
+                count += task_count
+                if limit is not None and count >= limit:
+                    return limit
+        finally:
+            results.close()
+        return count
+
+    def _parallel_map(self, count_only, limit, processes, split_depth):
+        """
+        Run the tasks of `parallel_solutions` and yield their results as they complete. Closing the generator terminates the pool.
+        """
+        paths = self.split(split_depth)
+        num_columns, rows = self.compact_matrix()
+        task = partial(_parallel_task, count_only=count_only, limit=limit)
+        with multiprocessing.Pool(processes, _parallel_init, (type(self), num_columns, rows, self._options())) as pool:
+            yield from pool.imap_unordered(task, paths, chunksize=1)
+
+    def _instrumented(self, covers, stats):
+        """
+        Run a search generator with the `stats` counting wrappers installed on this object (see `SearchStats`).
+        """
+        row_lengths = [len(row) for row in self.compact_matrix()[1]]
+        solution = self.solution
+        add = stats._add
+        path = []  # (column, choices) of the nodes on the search path, for the progress estimate
+        choose_name = '_choose_general' if self.generalized else 'choose_column'
+        choose = getattr(self, choose_name)
+        start = last_report = time.perf_counter()
+
+        def counting_choose():
+            nonlocal last_report
+            column = choose()
+            if column is None:
+                # The generalized search asks for a column at the solutions too: not a search node
+                return column
+            level = len(solution)
+            choices = self._size(column) + 1 - self._need(column)
+            del path[level:]
+            path.append((column, choices))
+            stats.nodes += 1
+            add(stats.nodes_per_level, level, 1)
+            add(stats.branches_per_level, level, choices)
+            if stats.progress is not None and stats.nodes % 256 == 0:
+                now = time.perf_counter()
+                if now - last_report >= stats.interval:
+                    last_report = now
+                    self._report_progress(stats, path, now - start)
+            return column
+
+        def counting_cover(column):
+            updates = 1
+            node = self._down(column)
+            while node != column:
+                updates += row_lengths[self._row_of(node)] - 1
+                node = self._down(node)
+            add(stats.updates_per_level, len(solution), updates)
+            cover(column)
+
+        def counting_hide(row_node):
+            add(stats.updates_per_level, len(solution), row_lengths[self._row_of(row_node)] - 1)
+            hide(row_node)
+
+        def counting_cover_general(column):
+            add(stats.updates_per_level, len(solution), 1)
+            cover_general(column)
+
+        setattr(self, choose_name, counting_choose)
+        if self.generalized:
+            hide, cover_general = self._hide, self._cover_general
+            self._hide, self._cover_general = counting_hide, counting_cover_general
+        else:
+            cover = self.cover_column
+            self.cover_column = counting_cover
+        done = False
+        try:
+            for _ in covers:
+                stats.solutions += 1
+                yield
+            done = True
+        finally:
+            # A last report, before the search path is unwound
+            self._report_progress(stats, path, time.perf_counter() - start, done)
+            covers.close()
+            for name in (choose_name, 'cover_column', '_hide', '_cover_general'):
+                self.__dict__.pop(name, None)
+
+    def _report_progress(self, stats, path, elapsed, done=False):
+        """
+        Update the progress estimate and throughput of `stats`, and pass them to its progress function.
+        """
+        fraction, weight = 0.0, 1.0
+        for (column, choices), row_node in zip(path, self.solution):
+            # The position of the row in its column is the index of the current choice
+            index = 0
+            node = self._down(column)
+            while node != row_node and node != column:
+                index += 1
+                node = self._down(node)
+            weight /= max(choices, 1)
+            fraction += min(index, choices - 1) * weight
+        stats.fraction_done = 1.0 if done else fraction
+        stats.elapsed = elapsed
+        stats.nodes_per_second = stats.nodes / elapsed if elapsed > 0 else 0.0
+        if stats.progress is not None:
+            stats.progress(stats)
+
+    def _checkpointed(self, checkpoint):
+        """
+        Explicit-stack search generator that resumes from `checkpoint` and keeps it saved (see `Checkpoint`).
+        """
+        fingerprint = self._fingerprint()
+        if checkpoint.matrix is None:
+            checkpoint.matrix = fingerprint
+        elif checkpoint.matrix != fingerprint:
+            raise ValueError("checkpoint {} belongs to another matrix".format(checkpoint.filename))
+        if checkpoint.done:
+            return
+        covers = self._cover_generator(True, checkpoint.path)
+        choose_name = '_choose_general' if self.generalized else 'choose_column'
+        replaced = self.__dict__.get(choose_name)
+        choose = getattr(self, choose_name)
+        nodes = 0
+        replay = len(checkpoint.path)  # The first calls come from replaying the path
+        last_save = time.perf_counter()
+
+        def saving_choose():
+            # The search is about to branch at the node of the current path, nothing below it has been visited
+            nonlocal nodes, replay, last_save
+            if replay:
+                replay -= 1
+                return choose()
+            nodes += 1
+            if nodes % 256 == 0:
+                now = time.perf_counter()
+                if now - last_save >= checkpoint.interval:
+                    last_save = now
+                    checkpoint.path = self._current_path()
+                    checkpoint.save()
+            return choose()
+
+        def restore():
+            covers.close()
+            if replaced is None:
+                self.__dict__.pop(choose_name, None)
+            else:
+                setattr(self, choose_name, replaced)
+
+        setattr(self, choose_name, saving_choose)
+        try:
+            for _ in covers:
+                checkpoint.solutions += 1
+                try:
+                    yield
+                except GeneratorExit:
+                    # Closed at a solution: the checkpoint is the node after it
+                    path = self._current_path()
+                    restore()
+                    path = self._next_path(path)
+                    checkpoint.path, checkpoint.done = ((), True) if path is None else (path, False)
+                    checkpoint.save()
+                    raise
+            checkpoint.path, checkpoint.done = (), True
+            checkpoint.save()
+        finally:
+            restore()
+
+    def _fingerprint(self):
+        """
+        :return: a digest of the matrix and of the options that shape the search tree
+        :rtype: str
+        """
+        options = self._options()
+        options['multiplicities'] = sorted(options['multiplicities'].items())
+        return hashlib.sha256(repr((self.compact_matrix(), sorted(options.items()))).encode()).hexdigest()
+
+    def _current_path(self):
+        """
+        :return: the path of row choices of the running search (see `_enter`)
+        :rtype: tuple
+        """
+        if not self.generalized:
+            return self.solution_rows()
+        rows = iter(self.solution_rows())
+        return tuple(None if frame[4] else next(rows) for frame in self.frames)
+
+    def _next_path(self, path):
+        """
+        :return: the path of the first search node after the subtree of `path`, in search order, or None if there is none
+        :rtype: tuple
+        """
+        while path:
+            parent = path[:-1]
+            columns = self._enter(parent)
+            rows = self._branch_rows()
+            self._leave(columns)
+            position = rows.index(path[-1]) + 1
+            if position < len(rows):
+                return parent + (rows[position],)
+            path = parent
+        return None
+
+    def estimate_tree_size(self, probes=100, seed=None):
+        """
+        Estimate the number of nodes of the search tree (the number of calls to `choose_column` of a full enumeration) with Knuth's random probes: walk down the tree choosing a random row at each node, and add up the products d_0, d_0 d_1, ... of the numbers of choices met on the way. Each probe is an unbiased estimate; the result is their mean.
+
+        :param probes: number of random walks
+        :type probes: int
+        :param seed: seed of the random generator
+        :type seed: int
+        :return: the estimated number of search nodes
+        :rtype: float
+        """
+        rng = random.Random(seed)
+        total = 0
+        for _ in range(probes):
+            estimate, weight = 0, 1
+            steps = []
+            try:
+                while True:
+                    rows = self._branch_rows()
+                    if rows is None:
+                        break
+                    estimate += weight
+                    if not rows:
+                        break
+                    weight *= len(rows)
+                    steps.append(self._enter((rng.choice(rows),)))
+            finally:
+                while steps:
+                    self._leave(steps.pop())
+            total += estimate
+        return total / probes
+
+    # Generalized exact cover (colors and multiplicities)
+    #
+    # The search below is shared by both engines, which provide the primitives it calls. It follows Knuth's
+    # algorithm with colors: instead of covering the columns of a selected row, the row "commits" them: a
+    # primary column loses one unit of room (and is covered when none is left), an uncolored secondary column
+    # is covered, and a colored one is purified, i.e. the rows giving it another color are hidden.
+    #
+    # Branching on a column that can still take other rows after this one does not cover it: each row is
+    # tried as the topmost row of the column in the solution, and stays out of the matrix ("tweaked") while
+    # the rows below it are tried, so that every combination of rows comes up once. Once the lower bound of
+    # a column is met, its last choice is to take no more rows ("closing" it).
+
+    def _search_general(self):
+        """
+        `search` for the generalized problem: print the first solution.
+        """
+        for _ in self._covers_general():
+            self.print_solution()
+            self.print_solution_rows()
+            return True
+        return False
+
+    def _covers_general(self, path=()):
+        """
+        Explicit-stack search for the generalized problem, with the same contract as `_covers_iterative`.
+
+        A stack frame is a list [column, covered, need, tweaked rows, closed] made by `_branch`. The row currently tried is in `self.solution`, unless the frame is closed: the column then takes no more rows, which is the last choice of a column whose lower bound is met. The frames are also kept in `self.frames`, for `_current_path`.
+        """
+        solution = self.solution
+        self.frames = frames = self._enter_general(path)
+        try:
+            while True:
+                column = self._choose_general()
+                if column is None:
+                    yield
+                    row_node = None
+                else:
+                    frames.append(self._branch(column))
+                    row_node = self._down(column)
+                while frames:
+                    frame = frames[-1]
+                    column, covered, need, tweaked, closed = frame
+                    if row_node is None:
+                        if closed:
+                            self._unbranch(frames.pop())
+                            continue
+                        row_node = solution.pop()
+                        self._untry_row(row_node)
+                        if covered:
+                            row_node = self._down(row_node)
+                        else:
+                            tweaked.append(row_node)
+                            row_node = self._down(column)
+                    # A tweaked column needs enough rows left for this one and the ones below it
+                    if row_node != column and (covered or self._size(column) >= need):
+                        solution.append(row_node)
+                        self._try_row(row_node, covered)
+                        break
+                    if need == 0:
+                        self._close(frame)
+                        break
+                    self._unbranch(frames.pop())
+                    row_node = None
+                else:
+                    return
+        finally:
+            self._leave_general(frames)
+
+    def _close(self, frame):
+        """
+        Take the last choice of a column whose lower bound is met: no more rows. Every row of the column has been tried (and tweaked) by then, so only the header is left to unlink.
+        """
+        if not frame[1]:
+            self._cover_general(frame[0])
+        frame[4] = True
+
+    def _enter_general(self, path):
+        """
+        `_enter` for the generalized problem: the rows above the path's row in a tweaked column are tweaked, as the search would have done. A None in the path closes the column (see `_covers_general`).
+
+        :return: the stack frames of the path, to be passed to `_leave_general`
+        :rtype: list
+        """
+        frames = []
+        for row in path:
+            column = self._choose_general()
+            if column is None:
+                self._leave_general(frames)
+                raise ValueError("path {} is longer than the search tree is deep".format(path))
+            frame = self._branch(column)
+            column, covered, need, tweaked, _ = frame
+            row_node = self._down(column)
+            while row_node != column and (covered or self._size(column) >= need) and self._row_of(row_node) != row:
+                if covered:
+                    row_node = self._down(row_node)
+                else:
+                    self._tweak(row_node)
+                    tweaked.append(row_node)
+                    row_node = self._down(column)
+            if row_node != column and (covered or self._size(column) >= need):
+                self.solution.append(row_node)
+                self._try_row(row_node, covered)
+            elif row is None and need == 0:
+                self._close(frame)
+            else:
+                self._unbranch(frame)
+                self._leave_general(frames)
+                raise ValueError("row {} is not a choice at depth {} of the search".format(row, len(frames)))
+            frames.append(frame)
+        return frames
+
+    def _leave_general(self, frames):
+        """
+        Undo the stack frames of a generalized search path.
+        """
+        while frames:
+            frame = frames.pop()
+            if not frame[4]:
+                row_node = self.solution.pop()
+                self._untry_row(row_node)
+                if not frame[1]:
+                    frame[3].append(row_node)
+            self._unbranch(frame)
+
+    def _branch_rows_general(self):
+        """
+        `_branch_rows` for the generalized problem: only the rows that leave enough rows below them are choices, and a column whose lower bound is met can also be closed, which is a None choice.
+        """
+        column = self._choose_general()
+        if column is None:
+            return None
+        tweak = self._room(column) > 1
+        need = self._need(column)
+        size = self._size(column)
+        rows = []
+        row_node = self._down(column)
+        while row_node != column and not (tweak and size - len(rows) < need):
+            rows.append(self._row_of(row_node))
+            row_node = self._down(row_node)
+        if need == 0:
+            rows.append(None)
+        return rows
+
+    def _down(self, node):
+        return node.down
+
+    def _size(self, column):
+        return column.size
+
+    def _room(self, column):
+        return column.room
+
+    def _need(self, column):
+        return max(column.room - column.slack, 0)
+
+    def _row_of(self, node):
+        return node.row_id
+
+    def _choose_general(self):
+        """
+        Choose the active primary column with the fewest choices: the rows that leave enough rows below them for the need of the column, plus closing the column if its need is already met.
+
+        :return: a column, or None if every primary column is covered (a solution)
+        """
+        best_choices = float('inf')
+        chosen_column = None
+        examined = 0
+        not_walked = 0
+        column = self.header.right
+        while column != self.header:
+            need = column.room - column.slack
+            examined += 1
+            not_walked += column.size
+            choices = column.size + 1 - max(need, 0)
+            if choices < best_choices:
+                best_choices = choices
+                chosen_column = column
+                if choices <= 1 and self.early_exit:
+                    self.early_exits += 1
+                    break
+            column = column.right
+        self.choose_calls += 1
+        self.columns_examined += examined
+        self.nodes_not_walked += not_walked
+        return chosen_column
+
+    def _branch(self, column):
+        """
+        Start branching on a column: take one unit of its room, and cover it if none is left.
+
+        :return: a stack frame [column, covered, need, tweaked rows, closed]
+        :rtype: list
+        """
+        need = max(column.room - column.slack, 0)
+        column.room -= 1
+        covered = column.room == 0
+        if covered:
+            self._cover_general(column)
+        return [column, covered, need, [], False]
+
+    def _unbranch(self, frame):
+        column, covered, _, tweaked, closed = frame
+        if closed and not covered:
+            self._uncover_general(column)
+        for row_node in reversed(tweaked):
+            self._untweak(row_node)
+        if covered:
+            self._uncover_general(column)
+        column.room += 1
+
+    def _try_row(self, row_node, covered):
+        """
+        Select a row in the branching column: tweak it if the column was not covered, then commit its other columns.
+        """
+        if not covered:
+            self._tweak(row_node)
+        node = row_node.right
+        while node != row_node:
+            self._commit(node)
+            node = node.right
+
+    def _untry_row(self, row_node):
+        node = row_node.left
+        while node != row_node:
+            self._uncommit(node)
+            node = node.left
+
+    def _tweak(self, row_node):
+        """
+        Take a row out of the matrix, including out of its own column.
+        """
+        self._hide(row_node)
+        row_node.down.up = row_node.up
+        row_node.up.down = row_node.down
+        row_node.column.size -= 1
+
+    def _untweak(self, row_node):
+        row_node.column.size += 1
+        row_node.down.up = row_node
+        row_node.up.down = row_node
+        self._unhide(row_node)
+
+    def _commit(self, node):
+        column = node.column
+        if not column.secondary:
+            column.room -= 1
+            if column.room == 0:
+                self._cover_general(column)
+        elif node.color == 0:
+            self._cover_general(column)
+        elif node.color > 0:
+            self._purify(node)
+
+    def _uncommit(self, node):
+        column = node.column
+        if not column.secondary:
+            if column.room == 0:
+                self._uncover_general(column)
+            column.room += 1
+        elif node.color == 0:
+            self._uncover_general(column)
+        elif node.color > 0:
+            self._unpurify(node)
+
+    def _purify(self, node):
+        """
+        Hide the rows that give the node's column another color than the node's; mark the others (color -1) as already compatible.
+        """
+        color = node.color
+        column = node.column
+        row_node = column.down
+        while row_node != column:
+            if row_node.color == color:
+                row_node.color = -1
+            else:
+                self._hide(row_node)
+            row_node = row_node.down
+
+    def _unpurify(self, node):
+        color = node.color
+        column = node.column
+        row_node = column.up
+        while row_node != column:
+            if row_node.color < 0:
+                row_node.color = color
+            else:
+                self._unhide(row_node)
+            row_node = row_node.up
+
+    def _cover_general(self, column):
+        column.right.left = column.left
+        column.left.right = column.right
+        row_node = column.down
+        while row_node != column:
+            self._hide(row_node)
+            row_node = row_node.down
+
+    def _uncover_general(self, column):
+        row_node = column.up
+        while row_node != column:
+            self._unhide(row_node)
+            row_node = row_node.up
+        column.right.left = column
+        column.left.right = column
+
+    def _hide(self, row_node):
+        """
+        Unlink the other nodes of a row from their columns, except the nodes of purified columns.
+        """
+        node = row_node.right
+        while node != row_node:
+            if node.color >= 0:
+                node.down.up = node.up
+                node.up.down = node.down
+                node.column.size -= 1
+            node = node.right
+
+    def _unhide(self, row_node):
+        node = row_node.left
+        while node != row_node:
+            if node.color >= 0:
+                node.column.size += 1
+                node.down.up = node
+                node.up.down = node
+            node = node.left
+
     def cover_column(self, column):
         column.right.left = column.left
         column.left.right = column.right
@@ -90,6 +1262,7 @@ class DLX:
             while right_node != row_node:
                 right_node.down.up = right_node.up
                 right_node.up.down = right_node.down
+                right_node.column.size -= 1
                 right_node = right_node.right
             row_node = row_node.down
 
@@ -98,6 +1271,7 @@ class DLX:
         while row_node != column:
             left_node = row_node.left
             while left_node != row_node:
+                left_node.column.size += 1
                 left_node.down.up = left_node
                 left_node.up.down = left_node
                 left_node = left_node.left
@@ -106,20 +1280,26 @@ class DLX:
         column.left.right = column
 
     def choose_column(self):
-        # Choose column with the fewest nodes
+        # Choose column with the fewest nodes, as given by the size counters
         min_size = float('inf')
         chosen_column = None
+        examined = 0
+        not_walked = 0
         column = self.header.right
         while column != self.header:
-            size = 0
-            node = column.down
-            while node != column:
-                size += 1
-                node = node.down
+            size = column.size
+            examined += 1
+            not_walked += size
             if size < min_size:
                 min_size = size
                 chosen_column = column
+                if size <= 1 and self.early_exit:
+                    self.early_exits += 1
+                    break
             column = column.right
+        self.choose_calls += 1
+        self.columns_examined += examined
+        self.nodes_not_walked += not_walked
         return chosen_column
 
     def print_solution(self):
@@ -149,15 +1329,1089 @@ class DLX:
         print(solution_rows)
 
 
-# Example usage
-matrix = [
-    [1, 0, 0, 1, 0, 0, 1],
-    [1, 0, 0, 1, 0, 0, 0],
-    [0, 0, 0, 1, 1, 0, 1],
-    [0, 0, 1, 0, 1, 1, 0],
-    [0, 1, 1, 0, 0, 1, 1],
-    [0, 1, 0, 0, 0, 0, 1]
-]
+class ArrayDLX:
+    """
+    Dancing Links over parallel integer arrays, instead of one `DLXNode` object per 1-cell.
+
+    A node is an index into the `L`, `R`, `U`, `D` (left, right, up, down), `C` (column header) and `row_id` arrays. Node 0 is the root header, nodes 1 to n are the column headers (column `j` of the matrix is header `j + 1`), and the 1-cells are numbered row by row after that, so that the nodes of a row are contiguous.
+
+    The column headers are linked in the same order as in `DLX`, so that both engines branch on the same columns and find the same solutions, in the same order. The `S` array holds the size of each column, indexed by header.
+
+    For the generalized problem, the `ROOM` and `SLACK` arrays hold the state of the column multiplicities (see `DLXNode`), and the `COLOR` array, only allocated when some entry has a color, the color of each node.
+    """
+
+    def __init__(self, matrix, early_exit=False, primary=None, multiplicities=None):
+        """
+        Build the toroidal matrix.
+
+        :param matrix: a 0/1 matrix, as a list of rows; None leaves the matrix to be built by `create_from_rows`
+        :type matrix: list
+        :param early_exit: if True, `choose_column` stops at the first column of size 0 or 1 (see `DLX`)
+        :type early_exit: bool
+        :param primary: the number of primary columns (see `DLX`)
+        :type primary: int
+        :param multiplicities: the multiplicities of the primary columns (see `DLX`)
+        :type multiplicities: dict
+        """
+        self.header = 0
+        self.solution = []
+        self.early_exit = early_exit
+        self.primary = primary
+        self.multiplicities = multiplicities
+        self.generalized = False
+        self.reset_counters()
+        if matrix is not None:
+            self.create_toridal_matrix(matrix)
+
+    from_rows = classmethod(DLX.from_rows.__func__)
+    from_csr = classmethod(DLX.from_csr.__func__)
+    from_file = classmethod(DLX.from_file.__func__)
+    reset_counters = DLX.reset_counters
+    create_toridal_matrix = DLX.create_toridal_matrix
+    _check_primary = DLX._check_primary
+    _apply_multiplicities = DLX._apply_multiplicities
+    _options = DLX._options
+
+    def create_from_rows(self, rows, num_columns):
+        """
+        Build the arrays from sparse rows (see `DLX.create_from_rows`).
+        """
+        primary = self._check_primary(num_columns)
+        size = num_columns + 1
+        # Only the root and the primary headers (0 to primary) are linked together
+        ring = primary + 1
+        self.L = L = array('i', [(i + 1) % ring if i < ring else i for i in range(size)])
+        self.R = R = array('i', [(i - 1) % ring if i < ring else i for i in range(size)])
+        self.U = U = array('i', range(size))
+        self.D = D = array('i', range(size))
+        self.C = C = array('i', range(size))
+        self.row_id = row_id = array('i', [-1] * size)
+        self.S = S = array('i', [0] * size)
+        self.ROOM = array('i', [1] * size)
+        self.SLACK = array('i', [0] * size)
+        self.COLOR = COLOR = None
+        color_ids = {}
+        self.color_names = [None]
+        num_rows = 0
+        for row_idx, row in enumerate(rows):
+            num_rows = row_idx + 1
+            first = -1
+            for j in row:
+                color = None
+                if isinstance(j, tuple):
+                    j, color = j
+                if not 0 <= j < num_columns:
+                    raise ValueError("row {}: column {} out of range".format(row_idx, j))
+                column = j + 1
+                if row_id[U[column]] == row_idx:
+                    raise ValueError("row {}: column {} repeated".format(row_idx, j))
+                node = len(C)
+                if color is not None:
+                    if j < primary:
+                        raise ValueError("row {}: primary column {} cannot have a color".format(row_idx, j))
+                    if color not in color_ids:
+                        color_ids[color] = len(self.color_names)
+                        self.color_names.append(color)
+                    if COLOR is None:
+                        self.COLOR = COLOR = array('i', [0]) * node
+                    COLOR.append(color_ids[color])
+                elif COLOR is not None:
+                    COLOR.append(0)
+                C.append(column)
+                row_id.append(row_idx)
+                U.append(U[column])
+                D.append(column)
+                D[U[column]] = node
+                U[column] = node
+                S[column] += 1
+                if first < 0:
+                    first = node
+                    L.append(node)
+                    R.append(node)
+                else:
+                    # The previous node of the row is always node - 1
+                    L.append(node - 1)
+                    R.append(first)
+                    R[node - 1] = node
+                    L[first] = node
+        self.num_rows = num_rows
+        self._apply_multiplicities()
+        if self.generalized and COLOR is None:
+            self.COLOR = array('i', [0]) * len(C)
+
+    def _set_bounds(self, j, lower, upper):
+        self.ROOM[j + 1] = upper
+        self.SLACK[j + 1] = upper - lower
+
+    def search(self, k):
+        if self.generalized:
+            return self._search_general()
+        L, R, D, C = self.L, self.R, self.D, self.C
+        if R[self.header] == self.header:
+            self.print_solution()
+            self.print_solution_rows()
+            return True
+        column = self.choose_column()
+        self.cover_column(column)
+        row_node = D[column]
+        while row_node != column:
+            self.solution.append(row_node)
+            right_node = R[row_node]
+            while right_node != row_node:
+                self.cover_column(C[right_node])
+                right_node = R[right_node]
+            if self.search(k + 1):
+                return True
+            self.solution.pop()
+            left_node = L[row_node]
+            while left_node != row_node:
+                self.uncover_column(C[left_node])
+                left_node = L[left_node]
+            row_node = D[row_node]
+        self.uncover_column(column)
+        return False
+
+    solutions = DLX.solutions
+    count_solutions = DLX.count_solutions
+    _cover_generator = DLX._cover_generator
+    _instrumented = DLX._instrumented
+    _checkpointed = DLX._checkpointed
+    _fingerprint = DLX._fingerprint
+    _current_path = DLX._current_path
+    _next_path = DLX._next_path
+    _report_progress = DLX._report_progress
+    estimate_tree_size = DLX.estimate_tree_size
+
+    def _covers(self):
+        """
+        Recursive generator behind `solutions` and `count_solutions` (see `DLX._covers`).
+        """
+        L, R, D, C = self.L, self.R, self.D, self.C
+        if R[self.header] == self.header:
+            yield
+            return
+        column = self.choose_column()
+        self.cover_column(column)
+        try:
+            row_node = D[column]
+            while row_node != column:
+                self.solution.append(row_node)
+                right_node = R[row_node]
+                while right_node != row_node:
+                    self.cover_column(C[right_node])
+                    right_node = R[right_node]
+                try:
+                    yield from self._covers()
+                finally:
+                    self.solution.pop()
+                    left_node = L[row_node]
+                    while left_node != row_node:
+                        self.uncover_column(C[left_node])
+                        left_node = L[left_node]
+                row_node = D[row_node]
+        finally:
+            self.uncover_column(column)
+
+    def _covers_iterative(self, path=()):
+        """
+        Non-recursive version of `_covers` (see `DLX._covers_iterative`).
+        """
+        L, R, D, C = self.L, self.R, self.D, self.C
+        header = self.header
+        solution = self.solution
+        cover_column, uncover_column = self.cover_column, self.uncover_column
+        columns = self._enter(path)
+        try:
+            while True:
+                if R[header] == header:
+                    yield
+                    row_node = -1
+                else:
+                    column = self.choose_column()
+                    cover_column(column)
+                    columns.append(column)
+                    row_node = D[column]
+                while columns:
+                    column = columns[-1]
+                    if row_node < 0:
+                        row_node = solution.pop()
+                        left_node = L[row_node]
+                        while left_node != row_node:
+                            uncover_column(C[left_node])
+                            left_node = L[left_node]
+                        row_node = D[row_node]
+                    if row_node != column:
+                        solution.append(row_node)
+                        right_node = R[row_node]
+                        while right_node != row_node:
+                            cover_column(C[right_node])
+                            right_node = R[right_node]
+                        break
+                    uncover_column(columns.pop())
+                    row_node = -1
+                else:
+                    return
+        finally:
+            while columns:
+                row_node = solution.pop()
+                left_node = L[row_node]
+                while left_node != row_node:
+                    uncover_column(C[left_node])
+                    left_node = L[left_node]
+                uncover_column(columns.pop())
+
+    def solution_rows(self):
+        """
+        :return: the row indices of the rows currently in `self.solution`
+        :rtype: tuple
+        """
+        row_id = self.row_id
+        return tuple(row_id[node] for node in self.solution)
+
+    def compact_matrix(self):
+        """
+        Export the matrix as lists of column indices (see `DLX.compact_matrix`).
+        """
+        C, row_id, COLOR = self.C, self.row_id, self.COLOR
+        rows = [[] for _ in range(self.num_rows)]
+        for node in range(len(self.S), len(C)):
+            if COLOR is not None and COLOR[node]:
+                rows[row_id[node]].append((C[node] - 1, self.color_names[COLOR[node]]))
+            else:
+                rows[row_id[node]].append(C[node] - 1)
+        return len(self.S) - 1, [tuple(row) for row in rows]
+
+    def _enter(self, path):
+        """
+        Replay a search path (see `DLX._enter`).
+        """
+        if self.generalized:
+            return self._enter_general(path)
+        R, D, C, row_id = self.R, self.D, self.C, self.row_id
+        columns = []
+        for row in path:
+            if R[self.header] == self.header:
+                self._leave(columns)
+                raise ValueError("path {} is longer than the search tree is deep".format(path))
+            column = self.choose_column()
+            row_node = D[column]
+            while row_node != column and row_id[row_node] != row:
+                row_node = D[row_node]
+            if row_node == column:
+                self._leave(columns)
+                raise ValueError("row {} is not a choice at depth {} of the search".format(row, len(columns)))
+            self.cover_column(column)
+            columns.append(column)
+            self.solution.append(row_node)
+            right_node = R[row_node]
+            while right_node != row_node:
+                self.cover_column(C[right_node])
+                right_node = R[right_node]
+        return columns
+
+    def _leave(self, columns):
+        """
+        Undo `_enter`.
+        """
+        if self.generalized:
+            return self._leave_general(columns)
+        L, C = self.L, self.C
+        while columns:
+            row_node = self.solution.pop()
+            left_node = L[row_node]
+            while left_node != row_node:
+                self.uncover_column(C[left_node])
+                left_node = L[left_node]
+            self.uncover_column(columns.pop())
+
+    def _branch_rows(self):
+        """
+        :return: the row indices of the column the search would branch on next, or None if the matrix is empty (a solution)
+        :rtype: list
+        """
+        if self.generalized:
+            return self._branch_rows_general()
+        if self.R[self.header] == self.header:
+            return None
+        D, row_id = self.D, self.row_id
+        column = self.choose_column()
+        rows = []
+        row_node = D[column]
+        while row_node != column:
+            rows.append(row_id[row_node])
+            row_node = D[row_node]
+        return rows
+
+    split = DLX.split
+    parallel_solutions = DLX.parallel_solutions
+    parallel_count_solutions = DLX.parallel_count_solutions
+    _parallel_map = DLX._parallel_map
+
+    # Generalized exact cover: the search is shared with DLX, the primitives work on the arrays
+
+    _search_general = DLX._search_general
+    _covers_general = DLX._covers_general
+    _enter_general = DLX._enter_general
+    _leave_general = DLX._leave_general
+    _branch_rows_general = DLX._branch_rows_general
+    _close = DLX._close
+
+    def _down(self, node):
+        return self.D[node]
+
+    def _size(self, column):
+        return self.S[column]
+
+    def _room(self, column):
+        return self.ROOM[column]
+
+    def _need(self, column):
+        return max(self.ROOM[column] - self.SLACK[column], 0)
+
+    def _row_of(self, node):
+        return self.row_id[node]
+
+    def _choose_general(self):
+        """
+        Choose the active primary column with the fewest choices (see `DLX._choose_general`).
+        """
+        R, S, ROOM, SLACK = self.R, self.S, self.ROOM, self.SLACK
+        best_choices = float('inf')
+        chosen_column = None
+        examined = 0
+        not_walked = 0
+        column = R[self.header]
+        while column != self.header:
+            need = ROOM[column] - SLACK[column]
+            examined += 1
+            not_walked += S[column]
+            choices = S[column] + 1 - max(need, 0)
+            if choices < best_choices:
+                best_choices = choices
+                chosen_column = column
+                if choices <= 1 and self.early_exit:
+                    self.early_exits += 1
+                    break
+            column = R[column]
+        self.choose_calls += 1
+        self.columns_examined += examined
+        self.nodes_not_walked += not_walked
+        return chosen_column
+
+    def _branch(self, column):
+        ROOM = self.ROOM
+        need = max(ROOM[column] - self.SLACK[column], 0)
+        ROOM[column] -= 1
+        covered = ROOM[column] == 0
+        if covered:
+            self._cover_general(column)
+        return [column, covered, need, [], False]
+
+    def _unbranch(self, frame):
+        column, covered, _, tweaked, closed = frame
+        if closed and not covered:
+            self._uncover_general(column)
+        for row_node in reversed(tweaked):
+            self._untweak(row_node)
+        if covered:
+            self._uncover_general(column)
+        self.ROOM[column] += 1
+
+    def _try_row(self, row_node, covered):
+        if not covered:
+            self._tweak(row_node)
+        R = self.R
+        node = R[row_node]
+        while node != row_node:
+            self._commit(node)
+            node = R[node]
+
+    def _untry_row(self, row_node):
+        L = self.L
+        node = L[row_node]
+        while node != row_node:
+            self._uncommit(node)
+            node = L[node]
+
+    def _tweak(self, row_node):
+        U, D = self.U, self.D
+        self._hide(row_node)
+        up, down = U[row_node], D[row_node]
+        U[down] = up
+        D[up] = down
+        self.S[self.C[row_node]] -= 1
+
+    def _untweak(self, row_node):
+        U, D = self.U, self.D
+        self.S[self.C[row_node]] += 1
+        U[D[row_node]] = row_node
+        D[U[row_node]] = row_node
+        self._unhide(row_node)
+
+    def _commit(self, node):
+        column = self.C[node]
+        if column <= self.primary:
+            self.ROOM[column] -= 1
+            if self.ROOM[column] == 0:
+                self._cover_general(column)
+        elif self.COLOR[node] == 0:
+            self._cover_general(column)
+        elif self.COLOR[node] > 0:
+            self._purify(node)
+
+    def _uncommit(self, node):
+        column = self.C[node]
+        if column <= self.primary:
+            if self.ROOM[column] == 0:
+                self._uncover_general(column)
+            self.ROOM[column] += 1
+        elif self.COLOR[node] == 0:
+            self._uncover_general(column)
+        elif self.COLOR[node] > 0:
+            self._unpurify(node)
+
+    def _purify(self, node):
+        D, COLOR = self.D, self.COLOR
+        color = COLOR[node]
+        column = self.C[node]
+        row_node = D[column]
+        while row_node != column:
+            if COLOR[row_node] == color:
+                COLOR[row_node] = -1
+            else:
+                self._hide(row_node)
+            row_node = D[row_node]
+
+    def _unpurify(self, node):
+        U, COLOR = self.U, self.COLOR
+        color = COLOR[node]
+        column = self.C[node]
+        row_node = U[column]
+        while row_node != column:
+            if COLOR[row_node] < 0:
+                COLOR[row_node] = color
+            else:
+                self._unhide(row_node)
+            row_node = U[row_node]
+
+    def _cover_general(self, column):
+        L, R, D = self.L, self.R, self.D
+        L[R[column]] = L[column]
+        R[L[column]] = R[column]
+        row_node = D[column]
+        while row_node != column:
+            self._hide(row_node)
+            row_node = D[row_node]
+
+    def _uncover_general(self, column):
+        L, R, U = self.L, self.R, self.U
+        row_node = U[column]
+        while row_node != column:
+            self._unhide(row_node)
+            row_node = U[row_node]
+        L[R[column]] = column
+        R[L[column]] = column
+
+    def _hide(self, row_node):
+        R, U, D, C, S, COLOR = self.R, self.U, self.D, self.C, self.S, self.COLOR
+        node = R[row_node]
+        while node != row_node:
+            if COLOR[node] >= 0:
+                up, down = U[node], D[node]
+                U[down] = up
+                D[up] = down
+                S[C[node]] -= 1
+            node = R[node]
+
+    def _unhide(self, row_node):
+        L, U, D, C, S, COLOR = self.L, self.U, self.D, self.C, self.S, self.COLOR
+        node = L[row_node]
+        while node != row_node:
+            if COLOR[node] >= 0:
+                S[C[node]] += 1
+                U[D[node]] = node
+                D[U[node]] = node
+            node = L[node]
+
+    def cover_column(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[column]] = L[column]
+        R[L[column]] = R[column]
+        row_node = D[column]
+        while row_node != column:
+            right_node = R[row_node]
+            while right_node != row_node:
+                # Each read from an array builds a new int: read every link once
+                up, down = U[right_node], D[right_node]
+                U[down] = up
+                D[up] = down
+                S[C[right_node]] -= 1
+                right_node = R[right_node]
+            row_node = D[row_node]
+
+    def uncover_column(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        row_node = U[column]
+        while row_node != column:
+            left_node = L[row_node]
+            while left_node != row_node:
+                S[C[left_node]] += 1
+                U[D[left_node]] = left_node
+                D[U[left_node]] = left_node
+                left_node = L[left_node]
+            row_node = U[row_node]
+        L[R[column]] = column
+        R[L[column]] = column
+
+    def choose_column(self):
+        # Choose column with the fewest nodes, as given by the size counters
+        R, S = self.R, self.S
+        min_size = float('inf')
+        chosen_column = None
+        examined = 0
+        not_walked = 0
+        column = R[self.header]
+        while column != self.header:
+            size = S[column]
+            examined += 1
+            not_walked += size
+            if size < min_size:
+                min_size = size
+                chosen_column = column
+                if size <= 1 and self.early_exit:
+                    self.early_exits += 1
+                    break
+            column = R[column]
+        self.choose_calls += 1
+        self.columns_examined += examined
+        self.nodes_not_walked += not_walked
+        return chosen_column
+
+    def print_solution(self):
+        print("Solution (column indices):")
+        for node in self.solution:
+            row = []
+            right_node = node
+            while True:
+                row.append(self.C[right_node] - 1)
+                right_node = self.R[right_node]
+                if right_node == node:
+                    break
+            print(row)
+
+    def print_solution_rows(self):
+        print("Solution (row indices):")
+        print([self.row_id[node] for node in self.solution])
+
+
+def _parse_entry(token):
+    """
+    Parse an entry of a row file: a column index, or `index:color`.
+    """
+    if ':' in token:
+        j, color = token.split(':', 1)
+        return int(j), color
+    return int(token)
+
+
+# The structure each worker process of a parallel search rebuilds
+_worker_dlx = None
+
+def _parallel_init(engine, num_columns, rows, options):
+    """
+    Initializer of the worker processes: rebuild the structure from the compact matrix.
+    """
+    global _worker_dlx
+    _worker_dlx = engine.from_rows(rows, num_columns, **options)
+
+def _parallel_task(path, count_only, limit):
+    """
+    Enumerate the subtree below a path, in the worker's structure.
+
+    :return: the solutions in the subtree (a list of row tuples), or their number
+    """
+    dlx = _worker_dlx
+    columns = dlx._enter(path)
+    try:
+        if count_only:
+            return dlx.count_solutions(limit, iterative=True)
+        return list(dlx.solutions(limit, iterative=True))
+    finally:
+        dlx._leave(columns)
+
+
+class DLXTest(unittest.TestCase):
+
+    matrix = [
+        [1, 0, 0, 1, 0, 0, 1],
+        [1, 0, 0, 1, 0, 0, 0],
+        [0, 0, 0, 1, 1, 0, 1],
+        [0, 0, 1, 0, 1, 1, 0],
+        [0, 1, 1, 0, 0, 1, 1],
+        [0, 1, 0, 0, 0, 0, 1]
+    ]
+
+    # 4 exact covers: {0, 1, 2}, {0, 4}, {3, 2}, {5}
+    several_covers = [
+        [1, 0, 0],
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 1, 0],
+        [0, 1, 1],
+        [1, 1, 1]
+    ]
+
+    @staticmethod
+    def solution_rows(dlx):
+        """ Row indices of the solution left on the stack by a successful search """
+        return list(dlx.solution_rows())
+
+    def run_search(self, dlx):
+        with redirect_stdout(StringIO()):
+            return dlx.search(0)
+
+    def test_search_object_engine(self):
+        dlx = DLX(self.matrix)
+        self.assertTrue(self.run_search(dlx))
+        self.assertEqual(self.solution_rows(dlx), [3, 5, 1])
+
+    def test_search_array_engine(self):
+        dlx = ArrayDLX(self.matrix)
+        self.assertTrue(self.run_search(dlx))
+        self.assertEqual(self.solution_rows(dlx), [3, 5, 1])
+
+    def test_search_no_solution(self):
+        matrix = [[1, 1, 0], [0, 1, 1]]
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(matrix)
+            self.assertFalse(self.run_search(dlx))
+            self.assertEqual(dlx.solution, [])
+
+    def test_array_cover_uncover_restores_links(self):
+        dlx = ArrayDLX(self.matrix)
+        before = [a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D)]
+        for column in range(1, 8):
+            dlx.cover_column(column)
+            dlx.uncover_column(column)
+        dlx.cover_column(4)
+        dlx.cover_column(7)
+        dlx.uncover_column(7)
+        dlx.uncover_column(4)
+        self.assertEqual([a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D)], before)
+
+    def test_array_sizes_restored(self):
+        dlx = ArrayDLX(self.matrix)
+        self.assertEqual(dlx.S.tolist(), [0, 2, 2, 2, 3, 2, 2, 4])
+        dlx.cover_column(4)
+        self.assertEqual(dlx.S.tolist(), [0, 0, 2, 2, 3, 1, 2, 2])
+        dlx.uncover_column(4)
+        self.assertEqual(dlx.S.tolist(), [0, 2, 2, 2, 3, 2, 2, 4])
+
+    def test_object_sizes_restored(self):
+        dlx = DLX(self.matrix)
+        columns, column = [], dlx.header.left
+        while column != dlx.header:
+            columns.append(column)
+            column = column.left
+        self.assertEqual([c.size for c in columns], [2, 2, 2, 3, 2, 2, 4])
+        dlx.cover_column(columns[3])
+        self.assertEqual([c.size for c in columns], [0, 2, 2, 3, 1, 2, 2])
+        dlx.uncover_column(columns[3])
+        self.assertEqual([c.size for c in columns], [2, 2, 2, 3, 2, 2, 4])
+
+    def test_early_exit_same_solutions(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.matrix, early_exit=True)
+            self.assertTrue(self.run_search(dlx))
+            self.assertEqual(sorted(self.solution_rows(dlx)), [1, 3, 5])
+            self.assertGreater(dlx.early_exits, 0)
+            self.assertLessEqual(dlx.columns_examined, 7 * dlx.choose_calls)
+
+    def test_solutions_all(self):
+        for engine in (DLX, ArrayDLX):
+            solutions = list(engine(self.several_covers).solutions())
+            self.assertEqual(sorted(tuple(sorted(rows)) for rows in solutions), [(0, 1, 2), (0, 4), (2, 3), (5,)])
+            self.assertEqual(list(engine(self.matrix).solutions()), [(3, 5, 1)])
+
+    def test_solutions_same_order_both_engines(self):
+        self.assertEqual(list(DLX(self.several_covers).solutions()), list(ArrayDLX(self.several_covers).solutions()))
+
+    def test_solutions_limit(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.several_covers)
+            everything = list(dlx.solutions())
+            self.assertEqual(list(dlx.solutions(limit=2)), everything[:2])
+            self.assertEqual(list(dlx.solutions(limit=0)), [])
+            self.assertEqual(list(dlx.solutions(limit=10)), everything)
+
+    def test_count_solutions(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.several_covers)
+            self.assertEqual(dlx.count_solutions(), 4)
+            self.assertEqual(dlx.count_solutions(limit=3), 3)
+            self.assertEqual(engine([[1, 1, 0], [0, 1, 1]]).count_solutions(), 0)
+
+    def test_closed_generator_restores_matrix(self):
+        dlx = ArrayDLX(self.several_covers)
+        before = [a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D, dlx.S)]
+        solutions = dlx.solutions()
+        next(solutions)
+        solutions.close()
+        self.assertEqual([a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D, dlx.S)], before)
+        self.assertEqual(dlx.solution, [])
+        dlx = DLX(self.several_covers)
+        next(dlx.solutions())
+        self.assertEqual(dlx.count_solutions(), 4)
+
+    def test_iterative_same_order(self):
+        matrices = [self.matrix, self.several_covers, [[1, 1, 0], [0, 1, 1]]]
+        rng = random.Random(3)
+        for _ in range(20):
+            matrices.append([[int(rng.random() < 0.3) for _ in range(8)] for _ in range(14)])
+        for matrix in matrices:
+            if not any(map(any, matrix)):
+                continue
+            for engine in (DLX, ArrayDLX):
+                dlx = engine(matrix)
+                self.assertEqual(list(dlx.solutions(iterative=True)), list(dlx.solutions()))
+                self.assertEqual(dlx.count_solutions(limit=2, iterative=True), dlx.count_solutions(limit=2))
+
+    def test_iterative_closed_generator_restores_matrix(self):
+        dlx = ArrayDLX(self.several_covers)
+        before = [a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D, dlx.S)]
+        self.assertEqual(len(list(dlx.solutions(limit=3, iterative=True))), 3)
+        self.assertEqual([a.tolist() for a in (dlx.L, dlx.R, dlx.U, dlx.D, dlx.S)], before)
+        self.assertEqual(dlx.solution, [])
+
+    def test_iterative_no_recursion_limit(self):
+        # Identity matrix: the only cover uses all the rows, one per level
+        n = sys.getrecursionlimit() + 100
+        matrix = [[int(i == j) for j in range(n)] for i in range(n)]
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(matrix, early_exit=True)
+            self.assertEqual(dlx.count_solutions(iterative=True), 1)
+            with self.assertRaises(RecursionError):
+                dlx.count_solutions()
+
+    def test_compact_matrix(self):
+        expected = (7, [(0, 3, 6), (0, 3), (3, 4, 6), (2, 4, 5), (1, 2, 5, 6), (1, 6)])
+        for engine in (DLX, ArrayDLX):
+            self.assertEqual(engine(self.matrix).compact_matrix(), expected)
+
+    def test_enter_leave(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.several_covers)
+            first = next(dlx.solutions())
+            columns = dlx._enter(first)
+            self.assertEqual(dlx.solution_rows(), first)
+            self.assertIsNone(dlx._branch_rows())
+            dlx._leave(columns)
+            self.assertEqual(dlx.count_solutions(), 4)
+            with self.assertRaises(ValueError):
+                dlx._enter((first[0], first[0]))
+            self.assertEqual(dlx.solution, [])
+            self.assertEqual(dlx.count_solutions(), 4)
+
+    def test_split(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.several_covers)
+            solutions = list(dlx.solutions())
+            self.assertEqual(dlx.split(0), [()])
+            for depth in (1, 2, 3):
+                paths = dlx.split(depth)
+                # every solution lies below exactly one path
+                for rows in solutions:
+                    self.assertEqual(sum(rows[:len(path)] == path for path in paths), 1)
+
+    def test_parallel_solutions(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine(self.several_covers)
+            serial = sorted(dlx.solutions())
+            for split_depth in (1, 2):
+                self.assertEqual(sorted(dlx.parallel_solutions(processes=2, split_depth=split_depth)), serial)
+                self.assertEqual(dlx.parallel_count_solutions(processes=2, split_depth=split_depth), 4)
+            self.assertEqual(len(list(dlx.parallel_solutions(limit=3, processes=2))), 3)
+            self.assertEqual(dlx.parallel_count_solutions(limit=3, processes=2), 3)
+            self.assertEqual(dlx.count_solutions(), 4)
+
+    def test_from_rows(self):
+        num_columns, rows = DLX(self.matrix).compact_matrix()
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_rows((row for row in rows), num_columns)
+            self.assertIsInstance(dlx, engine)
+            self.assertEqual(dlx.compact_matrix(), (num_columns, rows))
+            self.assertEqual(list(dlx.solutions()), list(engine(self.matrix).solutions()))
+            # the order of the indices within a row does not matter
+            dlx = engine.from_rows([row[::-1] for row in rows], num_columns)
+            self.assertEqual(list(dlx.solutions()), [(3, 5, 1)])
+
+    def test_from_rows_empty_column(self):
+        for engine in (DLX, ArrayDLX):
+            self.assertEqual(engine.from_rows([[0], [1]], 3).count_solutions(), 0)
+            self.assertEqual(engine.from_rows([[0], [], [1]], 2).compact_matrix(), (2, [(0,), (), (1,)]))
+
+    def test_from_rows_invalid(self):
+        for engine in (DLX, ArrayDLX):
+            with self.assertRaises(ValueError):
+                engine.from_rows([[0, 3]], 3)
+            with self.assertRaises(ValueError):
+                engine.from_rows([[-1]], 3)
+            with self.assertRaises(ValueError):
+                engine.from_rows([[0, 1], [2, 1, 2]], 3)
+
+    def test_from_csr(self):
+        indptr = [0, 3, 5, 8, 11, 15, 17]
+        indices = [0, 3, 6, 0, 3, 3, 4, 6, 2, 4, 5, 1, 2, 5, 6, 1, 6]
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_csr(indptr, indices, 7)
+            self.assertIsInstance(dlx, engine)
+            self.assertEqual(dlx.compact_matrix(), DLX(self.matrix).compact_matrix())
+            data = [1] * len(indices)
+            data[0] = 0
+            dlx = engine.from_csr(indptr, indices, 7, data=data)
+            self.assertEqual(dlx.compact_matrix()[1][0], (3, 6))
+
+    def test_from_file(self):
+        text = "7\n0 3 6\n0 3\n3 4 6\n2 4 5\n1 2 5 6\n1 6\n"
+        expected = DLX(self.matrix).compact_matrix()
+        for engine in (DLX, ArrayDLX):
+            self.assertIsInstance(engine.from_file(StringIO(text)), engine)
+            self.assertEqual(engine.from_file(StringIO(text)).compact_matrix(), expected)
+            headless = StringIO(text.split("\n", 1)[1])
+            self.assertEqual(engine.from_file(headless, num_columns=7).compact_matrix(), expected)
+            with self.assertRaises(ValueError):
+                engine.from_file(StringIO(""))
+
+    def test_array_row_layout(self):
+        dlx = ArrayDLX(self.matrix)
+        # 7 column headers + root, then 17 one-cells
+        self.assertEqual(len(dlx.C), 8 + 17)
+        # row 0 holds columns 0, 3 and 6, linked in a ring
+        self.assertEqual([dlx.C[n] - 1 for n in (8, dlx.R[8], dlx.R[dlx.R[8]])], [0, 3, 6])
+        self.assertEqual(dlx.L[8], 10)
+
+    def test_stats(self):
+        for engine in (DLX, ArrayDLX):
+            stats = SearchStats()
+            dlx = engine(self.several_covers)
+            self.assertEqual(dlx.count_solutions(stats=stats), 4)
+            plain = engine(self.several_covers)
+            plain.count_solutions()
+            self.assertEqual(stats.nodes, plain.choose_calls)
+            self.assertEqual(stats.solutions, 4)
+            self.assertEqual(sum(stats.nodes_per_level), stats.nodes)
+            # the root branches on column 0, of size 3
+            self.assertEqual((stats.nodes_per_level[0], stats.branches_per_level[0]), (1, 3))
+            self.assertEqual(stats.branching_factors()[0], 3.0)
+            # covering column 0 removes its header and the other nodes of rows 0, 3 and 5
+            self.assertEqual(stats.updates_per_level[0], 1 + 0 + 1 + 2)
+            self.assertEqual(stats.fraction_done, 1.0)
+            # the counting wrappers are gone, and the matrix is intact
+            self.assertEqual(dlx.__dict__.keys() & {'choose_column', 'cover_column'}, set())
+            self.assertEqual(list(dlx.solutions()), list(plain.solutions()))
+
+    def test_stats_same_for_both_engines(self):
+        rows, num_columns = self.queens_rows(6)
+        results = []
+        for engine in (DLX, ArrayDLX):
+            for options in ({'primary': 12}, {'primary': 12, 'multiplicities': {0: (0, 1)}}):
+                stats = SearchStats()
+                count = engine.from_rows(rows, num_columns, **options).count_solutions(stats=stats)
+                results.append((count, stats.nodes_per_level, stats.branches_per_level, stats.updates_per_level))
+        self.assertEqual(results[:2], results[2:])
+
+    def test_progress(self):
+        reports = []
+        stats = SearchStats(progress=lambda stats: reports.append(stats.fraction_done), interval=0)
+        rows, num_columns = self.queens_rows(8)
+        dlx = DLX.from_rows(rows, num_columns, primary=16)
+        self.assertEqual(len(list(dlx.solutions(iterative=True, stats=stats))), 92)
+        self.assertGreater(len(reports), 1)
+        self.assertEqual(reports[-1], 1.0)
+        self.assertTrue(all(0 <= fraction <= 1 for fraction in reports))
+        self.assertEqual(reports, sorted(reports))
+        # a search stopped early is not done
+        stats = SearchStats()
+        next(dlx.solutions(stats=stats))
+        self.assertLess(stats.fraction_done, 1.0)
+
+    def test_estimate_tree_size(self):
+        identity = [[int(i == j) for j in range(5)] for i in range(5)]
+        rows, num_columns = self.queens_rows(6)
+        for engine in (DLX, ArrayDLX):
+            # a single path: every probe is exact
+            self.assertEqual(engine(identity).estimate_tree_size(probes=3), 5)
+            dlx = engine.from_rows(rows, num_columns, primary=12)
+            estimate = dlx.estimate_tree_size(probes=2000, seed=0)
+            expected = list(dlx.solutions())
+            dlx.reset_counters()
+            dlx.count_solutions()
+            self.assertAlmostEqual(estimate / dlx.choose_calls, 1, delta=0.1)
+            self.assertEqual(list(dlx.solutions()), expected)
+
+    def test_checkpoint_resume_from_every_save(self):
+        rows, num_columns = self.queens_rows(8)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'search.json')
+            for options in ({'primary': 16}, {'primary': 16, 'multiplicities': {0: (0, 1)}}):
+                expected = list(DLX.from_rows(rows, num_columns, **options).solutions())
+                saved = []
+                checkpoint = Checkpoint(filename, interval=0)
+                checkpoint.save = lambda: saved.append((checkpoint.path, checkpoint.solutions, checkpoint.done))
+                self.assertEqual(list(DLX.from_rows(rows, num_columns, **options).solutions(checkpoint=checkpoint)), expected)
+                self.assertGreater(len(saved), 2)
+                self.assertEqual(saved[-1], ((), len(expected), True))
+                for path, found, done in saved[:-1]:
+                    # resume on a fresh structure, of the other engine
+                    dlx = ArrayDLX.from_rows(rows, num_columns, **options)
+                    checkpoint = Checkpoint(filename)
+                    checkpoint.path, checkpoint.solutions, checkpoint.done = path, found, done
+                    checkpoint.matrix = dlx._fingerprint()
+                    self.assertEqual(list(dlx.solutions(checkpoint=checkpoint)), expected[found:])
+                    self.assertTrue(Checkpoint(filename).done)
+                os.remove(filename)
+
+    def test_checkpoint_closed_generator(self):
+        rows, num_columns = self.queens_rows(6)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'search.json')
+            for engine in (DLX, ArrayDLX):
+                dlx = engine.from_rows(rows, num_columns, primary=12)
+                expected = list(dlx.solutions())
+                found = []
+                for _ in expected:
+                    found.extend(dlx.solutions(limit=1, checkpoint=Checkpoint(filename, interval=3600)))
+                    self.assertEqual(Checkpoint(filename).solutions, len(found))
+                self.assertEqual(found, expected)
+                self.assertEqual(dlx.count_solutions(checkpoint=Checkpoint(filename)), 0)
+                self.assertTrue(Checkpoint(filename).done)
+                # the structure is intact
+                self.assertEqual(list(dlx.solutions()), expected)
+                os.remove(filename)
+
+    def test_checkpoint_other_matrix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'search.json')
+            next(DLX(self.several_covers).solutions(checkpoint=Checkpoint(filename)))
+            with self.assertRaises(ValueError):
+                DLX(self.matrix).count_solutions(checkpoint=Checkpoint(filename))
+            with self.assertRaises(ValueError):
+                DLX(self.several_covers, early_exit=True).count_solutions(checkpoint=Checkpoint(filename))
+            self.assertEqual(ArrayDLX(self.several_covers).count_solutions(checkpoint=Checkpoint(filename)), 3)
+
+    @staticmethod
+    def queens_rows(n):
+        """ N-queens: rows and files are primary columns, the diagonals secondary ones """
+        return [[r, n + c, 2 * n + r + c, 5 * n - 2 + r - c] for r in range(n) for c in range(n)], 6 * n - 2
+
+    # Columns 0 and 1 are primary; column 2 is a secondary column shared by rows of the same color
+    colored = [[0, (2, 'a')], [1, (2, 'a')], [1, (2, 'b')], [0, (2, 'b')], [0, 2]]
+
+    def test_secondary_columns(self):
+        for engine in (DLX, ArrayDLX):
+            for n, count in ((4, 2), (5, 10), (6, 4)):
+                rows, num_columns = self.queens_rows(n)
+                dlx = engine.from_rows(rows, num_columns, primary=2 * n)
+                self.assertFalse(dlx.generalized)
+                self.assertEqual(dlx.count_solutions(), count)
+            # a secondary column need not be covered
+            self.assertEqual(list(engine.from_rows([[0, 1], [0]], 2, primary=1).solutions()), [(0,), (1,)])
+
+    def test_colors(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_rows(self.colored, 3, primary=2)
+            self.assertTrue(dlx.generalized)
+            self.assertEqual(list(dlx.solutions()), [(1, 0), (2, 3)])
+            self.assertEqual(dlx.compact_matrix(), (3, [tuple(row) for row in self.colored]))
+            text = "3\n0 2:a\n1 2:a\n1 2:b\n0 2:b\n0 2\n"
+            self.assertEqual(list(engine.from_file(StringIO(text), primary=2).solutions()), [(1, 0), (2, 3)])
+
+    def test_multiplicities(self):
+        rows = [[0], [0], [0, 1], [1]]
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_rows(rows, 2, multiplicities={0: 2})
+            self.assertEqual(sorted(map(sorted, dlx.solutions())), [[0, 1, 3], [0, 2], [1, 2]])
+            dlx = engine.from_rows(rows, 2, multiplicities={0: (1, 2)})
+            self.assertEqual(sorted(map(sorted, dlx.solutions())), [[0, 1, 3], [0, 2], [0, 3], [1, 2], [1, 3], [2]])
+            dlx = engine.from_rows(rows, 2, multiplicities={0: (0, 1)})
+            self.assertEqual(sorted(map(sorted, dlx.solutions())), [[0, 3], [1, 3], [2], [3]])
+
+    def test_generalized_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            num_columns = rng.randint(2, 6)
+            primary = rng.randint(1, num_columns)
+            rows = []
+            for _ in range(rng.randint(1, 8)):
+                row = [rng.randrange(primary)] + rng.sample(range(num_columns), rng.randint(0, 2))
+                row = sorted(set(row))
+                rows.append([(j, rng.choice('ab')) if j >= primary and rng.random() < 0.6 else j for j in row])
+            multiplicities = {}
+            for j in range(primary):
+                if rng.random() < 0.4:
+                    lower = rng.randint(0, 2)
+                    multiplicities[j] = (lower, max(1, lower + rng.randint(0, 2)))
+            expected = []
+            for k in range(len(rows) + 1):
+                for chosen in itertools.combinations(range(len(rows)), k):
+                    entries = [[] for _ in range(num_columns)]
+                    for i in chosen:
+                        for entry in rows[i]:
+                            j, color = entry if isinstance(entry, tuple) else (entry, None)
+                            entries[j].append(color)
+                    if all(multiplicities.get(j, (1, 1))[0] <= len(entries[j]) <= multiplicities.get(j, (1, 1))[1] for j in range(primary)) \
+                            and all(len(set(colors)) <= 1 and (None not in colors or len(colors) == 1) for colors in entries[primary:]):
+                        expected.append(list(chosen))
+            expected.sort()
+            for engine in (DLX, ArrayDLX):
+                dlx = engine.from_rows(rows, num_columns, primary=primary, multiplicities=multiplicities)
+                self.assertEqual(sorted(sorted(solution) for solution in dlx.solutions()), expected)
+                split = []
+                for path in dlx.split(2):
+                    frames = dlx._enter(path)
+                    split.extend(sorted(solution) for solution in dlx.solutions())
+                    dlx._leave(frames)
+                self.assertEqual(sorted(split), expected)
+
+    def test_generalized_closed_generator_restores_matrix(self):
+        rows, num_columns = self.queens_rows(6)
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_rows(rows, num_columns, primary=12, multiplicities={0: (0, 1)})
+            expected = list(dlx.solutions())
+            solutions = dlx.solutions()
+            next(solutions)
+            solutions.close()
+            self.assertEqual(dlx.solution, [])
+            self.assertEqual(list(dlx.solutions()), expected)
+
+    def test_generalized_parallel(self):
+        for engine in (DLX, ArrayDLX):
+            dlx = engine.from_rows(self.colored, 3, primary=2, multiplicities={0: (1, 2)})
+            serial = sorted(dlx.solutions())
+            self.assertEqual(sorted(dlx.parallel_solutions(processes=2, split_depth=2)), serial)
+
+    def test_generalized_invalid(self):
+        for engine in (DLX, ArrayDLX):
+            with self.assertRaises(ValueError):
+                engine.from_rows([[(0, 'a')]], 2, primary=1)
+            with self.assertRaises(ValueError):
+                engine.from_rows([[0]], 2, primary=3)
+            with self.assertRaises(ValueError):
+                engine.from_rows([[0, 1]], 2, primary=1, multiplicities={1: 2})
+            with self.assertRaises(ValueError):
+                engine.from_rows([[0]], 1, multiplicities={0: (2, 1)})
+
+
+if __name__ == '__main__':
+    # Example usage
+    matrix = [
+        [1, 0, 0, 1, 0, 0, 1],
+        [1, 0, 0, 1, 0, 0, 0],
+        [0, 0, 0, 1, 1, 0, 1],
+        [0, 0, 1, 0, 1, 1, 0],
+        [0, 1, 1, 0, 0, 1, 1],
+        [0, 1, 0, 0, 0, 0, 1]
+    ]
 
-dlx = DLX(matrix)
-dlx.search(0)
+    dlx = DLX(matrix)
+    dlx.search(0)
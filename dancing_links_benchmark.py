@@ -0,0 +1,347 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks for the Dancing Links engines in `dancing_links`.
+
+Run the module as a script to print the results::
+
+    python3 dancing_links_benchmark.py
+
+"""
+
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+from dancing_links import DLX, ArrayDLX, SearchStats
+from dancing_links_puzzles import SUDOKU_SYMBOLS, read_puzzles, solve_sudoku_batch
+
+ENGINES = (DLX, ArrayDLX)
+
+
+def langford_matrix(n):
+    """
+    Exact cover matrix for Langford pairs of order n.
+
+    Columns 0 to n-1 stand for the numbers 1 to n, columns n to 3n-1 for the 2n positions. A row places the two copies of number i at positions p and p+i+1. There is no solution unless n % 4 is 0 or 3, so that the search explores the whole tree.
+
+    :param n: the order of the problem
+    :type n: int
+    :return: the 0/1 matrix
+    :rtype: list
+    """
+    matrix = []
+    for i in range(1, n + 1):
+        for p in range(2 * n - i - 1):
+            row = [0] * (3 * n)
+            row[i - 1] = 1
+            row[n + p] = 1
+            row[n + p + i + 1] = 1
+            matrix.append(row)
+    return matrix
+
+
+def strip_tiling_matrix(n, max_length):
+    """
+    Exact cover matrix for the tilings of a 1 x n strip with pieces of length 1 to max_length: one column per cell, one row per placement of a piece. The search tree is as deep as the number of pieces in a tiling, i.e. up to n.
+
+    :param n: the length of the strip
+    :type n: int
+    :param max_length: the length of the longest piece
+    :type max_length: int
+    :return: the 0/1 matrix
+    :rtype: list
+    """
+    matrix = []
+    for start in range(n):
+        for length in range(1, max_length + 1):
+            if start + length <= n:
+                row = [0] * n
+                for j in range(start, start + length):
+                    row[j] = 1
+                matrix.append(row)
+    return matrix
+
+
+def random_matrix(num_rows, num_columns, ones_per_row, seed=0):
+    """
+    A random sparse 0/1 matrix, with a fixed number of 1s per row.
+
+    :param num_rows: number of rows
+    :type num_rows: int
+    :param num_columns: number of columns
+    :type num_columns: int
+    :param ones_per_row: number of 1-cells in each row
+    :type ones_per_row: int
+    :param seed: seed of the random generator
+    :type seed: int
+    :return: the 0/1 matrix
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    matrix = []
+    for _ in range(num_rows):
+        row = [0] * num_columns
+        for j in rng.sample(range(num_columns), ones_per_row):
+            row[j] = 1
+        matrix.append(row)
+    return matrix
+
+
+def random_rows(num_rows, num_columns, ones_per_row, seed=0):
+    """
+    Generate the rows of a random sparse matrix as lists of column indices (see `random_matrix`), without building the matrix.
+    """
+    rng = random.Random(seed)
+    for _ in range(num_rows):
+        yield sorted(rng.sample(range(num_columns), ones_per_row))
+
+
+def random_sudokus(count, n=3, blanks=55, seed=0):
+    """
+    Generate Sudoku puzzles: shuffle the rows, columns and symbols of a solved grid of order n, then empty `blanks` random cells. A puzzle has at least one solution, maybe several.
+
+    :return: a generator of puzzles, as strings of symbols (see `dancing_links_puzzles.parse_sudoku`)
+    :rtype: generator
+    """
+    rng = random.Random(seed)
+    size = n * n
+    for _ in range(count):
+        bands = rng.sample(range(n), n)
+        stacks = rng.sample(range(n), n)
+        rows = [band * n + r for band in bands for r in rng.sample(range(n), n)]
+        columns = [stack * n + c for stack in stacks for c in rng.sample(range(n), n)]
+        symbols = rng.sample(SUDOKU_SYMBOLS[:size], size)
+        grid = [symbols[(n * (r % n) + r // n + c) % size] for r in rows for c in columns]
+        for cell in rng.sample(range(size * size), blanks):
+            grid[cell] = '.'
+        yield ''.join(grid)
+
+
+def sudoku_throughput(filename, processes):
+    """
+    Solve the puzzles of a file with `solve_sudoku_batch`.
+
+    :return: the number of puzzles per second
+    :rtype: float
+    """
+    start = time.perf_counter()
+    with open(filename) as puzzle_file:
+        count = sum(1 for _ in solve_sudoku_batch(read_puzzles(puzzle_file), processes=processes))
+    return count / (time.perf_counter() - start)
+
+
+def construction_cost(build):
+    """
+    Time and peak memory of a construction.
+
+    :param build: a function that builds and returns an engine
+    :return: a pair (seconds, peak bytes allocated)
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    # Memory is measured on a second run: tracing slows the allocations down
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def construction_memory(engine, matrix):
+    """
+    Memory allocated by building the internal structure of an engine (the input matrix is not counted).
+
+    :return: the number of bytes still allocated once the constructor returns
+    :rtype: int
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    dlx = engine(matrix)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dlx
+    return current - start
+
+
+def search_rate(engine, matrix, repeat=3, **options):
+    """
+    Search nodes processed per second by an engine, best of `repeat` runs. The search nodes are the calls to `choose_column`.
+
+    :return: the fastest engine instance, and its rate in nodes per second
+    :rtype: tuple
+    """
+    best, best_dlx = float('inf'), None
+    for _ in range(repeat):
+        dlx = engine(matrix, **options)
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            dlx.search(0)
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best, best_dlx = elapsed, dlx
+    return best_dlx, best_dlx.choose_calls / best
+
+
+def enumeration_time(engine, matrix, count_only):
+    """
+    Time a full enumeration with `solutions` (materializing every row tuple) or `count_solutions`.
+
+    :return: a pair (number of solutions, seconds)
+    :rtype: tuple
+    """
+    dlx = engine(matrix)
+    start = time.perf_counter()
+    if count_only:
+        count = dlx.count_solutions()
+    else:
+        count = sum(1 for _ in dlx.solutions())
+    return count, time.perf_counter() - start
+
+
+def recursion_overhead(engine, matrix, repeat=3):
+    """
+    Compare the recursive and the explicit-stack searches on a full enumeration.
+
+    :return: a triple (search nodes, best recursive time, best iterative time)
+    :rtype: tuple
+    """
+    times = {}
+    for iterative in (False, True):
+        best = float('inf')
+        for _ in range(repeat):
+            dlx = engine(matrix)
+            start = time.perf_counter()
+            dlx.count_solutions(iterative=iterative)
+            best = min(best, time.perf_counter() - start)
+        times[iterative] = best
+    return dlx.choose_calls, times[False], times[True]
+
+
+def instrumentation_cost(engine, matrix, repeat=3):
+    """
+    Compare a full count without and with a `SearchStats` collector, and the tree size estimated by random probes with the actual one.
+
+    :return: a tuple (best plain time, best instrumented time, the stats, estimated search nodes)
+    :rtype: tuple
+    """
+    plain = instrumented = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(matrix).count_solutions()
+        plain = min(plain, time.perf_counter() - start)
+        stats = SearchStats()
+        start = time.perf_counter()
+        engine(matrix).count_solutions(stats=stats)
+        instrumented = min(instrumented, time.perf_counter() - start)
+    estimate = engine(matrix).estimate_tree_size(probes=1000, seed=0)
+    return plain, instrumented, stats, estimate
+
+
+def parallel_speedup(engine, matrix, split_depth=2):
+    """
+    Time `parallel_count_solutions` with 1, 2, 4, ... worker processes, up to the number of CPUs, against the serial explicit-stack search.
+
+    :return: the serial time, and a list of (processes, seconds) pairs
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    engine(matrix).count_solutions(iterative=True)
+    serial = time.perf_counter() - start
+    timings = []
+    cpus = os.cpu_count() or 1
+    processes = 1
+    while True:
+        dlx = engine(matrix)
+        start = time.perf_counter()
+        dlx.parallel_count_solutions(processes=processes, split_depth=split_depth)
+        timings.append((processes, time.perf_counter() - start))
+        if processes >= cpus:
+            break
+        processes = min(2 * processes, cpus)
+    return serial, timings
+
+
+def main():
+    matrix = random_matrix(50000, 200, 5)
+    print("Construction memory, 50000 x 200 matrix, 5 ones per row:")
+    for engine in ENGINES:
+        print("  {:10} {:8.1f} MB".format(engine.__name__, construction_memory(engine, matrix) / 2**20))
+
+    num_rows, num_columns = 5000, 2000
+    matrix = random_matrix(num_rows, num_columns, 5)
+    rows = [[j for j, val in enumerate(row) if val] for row in matrix]
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as rows_file:
+        rows_file.write("{}\n".format(num_columns))
+        for row in rows:
+            rows_file.write(" ".join(map(str, row)) + "\n")
+    print("Construction, {} x {} matrix, 5 ones per row (time, peak memory; the dense matrix itself is not counted):".format(num_rows, num_columns))
+    for engine in ENGINES:
+        builds = [
+            ("dense matrix", lambda: engine(matrix)),
+            ("from_rows (list)", lambda: engine.from_rows(rows, num_columns)),
+            ("from_rows (generator)", lambda: engine.from_rows(random_rows(num_rows, num_columns, 5), num_columns)),
+            ("from_file", lambda: engine.from_file(rows_file.name)),
+        ]
+        for name, build in builds:
+            elapsed, peak = construction_cost(build)
+            print("  {:10} {:22} {:7.3f} s {:8.1f} MB".format(engine.__name__, name, elapsed, peak / 2**20))
+    os.remove(rows_file.name)
+    del matrix, rows
+
+    matrix = langford_matrix(9)
+    print("Search, Langford pairs n=9 (no solution, full tree):")
+    for engine in ENGINES:
+        for early_exit in (False, True):
+            dlx, rate = search_rate(engine, matrix, early_exit=early_exit)
+            print("  {:10} early_exit={:5} {:8d} nodes {:10.0f} nodes/s, {:8d} columns examined, {:8d} size-walk nodes saved".format(
+                engine.__name__, str(early_exit), dlx.choose_calls, rate, dlx.columns_examined, dlx.nodes_not_walked))
+
+    matrix = langford_matrix(8)
+    print("Enumeration, Langford pairs n=8:")
+    for engine in ENGINES:
+        for count_only in (False, True):
+            count, elapsed = enumeration_time(engine, matrix, count_only)
+            print("  {:10} {:18} {:6d} solutions {:8.3f} s".format(
+                engine.__name__, "count_solutions()" if count_only else "solutions()", count, elapsed))
+
+    matrix = strip_tiling_matrix(24, 2)
+    print("Recursive vs explicit-stack search, tilings of a 1 x 24 strip (depth up to 24):")
+    for engine in ENGINES:
+        nodes, recursive, iterative = recursion_overhead(engine, matrix)
+        print("  {:10} recursive {:8.0f} nodes/s, iterative {:8.0f} nodes/s, {:+.2f} us per node saved".format(
+            engine.__name__, nodes / recursive, nodes / iterative, (recursive - iterative) / nodes * 1e6))
+
+    matrix = langford_matrix(9)
+    print("Instrumentation, Langford pairs n=9:")
+    for engine in ENGINES:
+        plain, instrumented, stats, estimate = instrumentation_cost(engine, matrix)
+        print("  {:10} plain {:7.3f} s, with stats {:7.3f} s; {} nodes, {} updates, estimated {:.0f} nodes from 1000 probes".format(
+            engine.__name__, plain, instrumented, stats.nodes, stats.updates, estimate))
+        print("  {:10} branching factor per level: {}".format(engine.__name__, " ".join("{:.2f}".format(b) for b in stats.branching_factors())))
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as puzzle_file:
+        for puzzle in random_sudokus(2000):
+            puzzle_file.write(puzzle + "\n")
+    print("Sudoku batch, 2000 puzzles with 55 empty cells ({} CPUs):".format(os.cpu_count()))
+    for processes in sorted({1, 2, os.cpu_count() or 1}):
+        print("  {:3d} processes {:8.0f} puzzles/s".format(processes, sudoku_throughput(puzzle_file.name, processes)))
+    os.remove(puzzle_file.name)
+
+    matrix = langford_matrix(10)
+    print("Parallel count, Langford pairs n=10, split at depth 2 ({} CPUs):".format(os.cpu_count()))
+    for engine in ENGINES:
+        serial, timings = parallel_speedup(engine, matrix)
+        print("  {:10} serial {:8.3f} s".format(engine.__name__, serial))
+        for processes, elapsed in timings:
+            print("  {:10} {:3d} processes {:8.3f} s, speedup {:5.2f}".format(engine.__name__, processes, elapsed, serial / elapsed))
+
+
+if __name__ == '__main__':
+    main()
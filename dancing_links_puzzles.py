@@ -0,0 +1,438 @@
+#!/usr/bin/python3
+
+"""
+Puzzles encoded as exact cover problems for the engines of `dancing_links`.
+
+Each encoder returns an `Encoding`: the sparse rows that `DLX.from_rows` takes, without ever building the 0/1 matrix, and for every row a key that tells what it stands for (a digit in a cell, a piece at some place, a queen on a square). The decoders turn the keys of a solution back into a board.
+
++ Sudoku of any order n (n² x n² grids): `sudoku_encoding`, `sudoku_board`, `solve_sudoku`, and `solve_sudoku_batch` for whole files of puzzles, over a pool of processes
++ Polyomino tilings, with rotations and reflections of the pieces: `polyomino_encoding`, `tiling_board`
++ N-queens, the diagonals being secondary columns: `queens_encoding`, `queens_columns`
+
+Run the module as a script to solve a file of Sudoku puzzles, one per line, and print the throughput::
+
+    python3 dancing_links_puzzles.py puzzles.txt
+
+"""
+
+import multiprocessing
+import sys
+import time
+import unittest
+
+from dancing_links import DLX, ArrayDLX
+
+# Symbols of the Sudoku values 1, 2, ...; '0' and '.' stand for an empty cell
+SUDOKU_SYMBOLS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class Encoding:
+    """
+    An exact cover problem in sparse form, with the meaning of each of its rows.
+    """
+
+    def __init__(self, rows, num_columns, keys, primary=None):
+        """
+        :param rows: the rows, each a list of column indices
+        :type rows: list
+        :param num_columns: the number of columns
+        :type num_columns: int
+        :param keys: the key of each row, for the decoders
+        :type keys: list
+        :param primary: the number of primary columns (all of them if None)
+        :type primary: int
+        """
+        self.rows = rows
+        self.num_columns = num_columns
+        self.keys = keys
+        self.primary = primary
+
+    def engine(self, engine=DLX, **options):
+        """
+        :param engine: the class of the engine, `DLX` or `ArrayDLX`
+        :return: an engine built on the problem, `options` being passed to its constructor
+        """
+        return engine.from_rows(self.rows, self.num_columns, primary=self.primary, **options)
+
+    def solutions(self, limit=None, engine=DLX):
+        """
+        :param limit: stop after that many solutions (no limit if None)
+        :type limit: int
+        :return: a generator of solutions, each the list of the keys of its rows
+        :rtype: generator
+        """
+        for solution in self.engine(engine).solutions(limit):
+            yield [self.keys[row] for row in solution]
+
+
+def parse_sudoku(text):
+    """
+    Read a Sudoku grid written as a string of n⁴ symbols, row after row (see `SUDOKU_SYMBOLS`). Whitespace is ignored.
+
+    :param text: the grid
+    :type text: str
+    :return: the order n, and the list of the cell values, 0 for an empty cell
+    :rtype: tuple
+    :raises ValueError: if the length is not a fourth power, or a symbol is out of range
+    """
+    symbols = ''.join(text.split())
+    n = round(len(symbols) ** 0.25)
+    if n < 1 or n ** 4 != len(symbols):
+        raise ValueError("a Sudoku grid has n^4 cells, not {}".format(len(symbols)))
+    values = []
+    for symbol in symbols:
+        if symbol in '0.':
+            values.append(0)
+        else:
+            value = SUDOKU_SYMBOLS.find(symbol.upper()) + 1
+            if not 0 < value <= n * n:
+                raise ValueError("invalid symbol {!r} in a grid of order {}".format(symbol, n))
+            values.append(value)
+    return n, values
+
+
+def sudoku_encoding(text):
+    """
+    Encode a Sudoku grid of order n (see `parse_sudoku`) as an exact cover problem.
+
+    There are 4 n⁴ columns: one per cell, and one per value for every row, column and box of the grid. A row puts a value in a cell; given cells have a single row, and empty cells one row per value that no given cell of their row, column or box already holds.
+
+    :param text: the grid
+    :type text: str
+    :return: the encoding, whose keys are (row, column, value) triples
+    :rtype: Encoding
+    """
+    n, values = parse_sudoku(text)
+    size = n * n
+    cells = size * size
+    used = set()
+    for cell, value in enumerate(values):
+        if value:
+            r, c = divmod(cell, size)
+            used.update((('row', r, value), ('column', c, value), ('box', r // n * n + c // n, value)))
+    rows = []
+    keys = []
+    for cell, given in enumerate(values):
+        r, c = divmod(cell, size)
+        box = r // n * n + c // n
+        for value in ([given] if given else range(1, size + 1)):
+            if not given and (('row', r, value) in used or ('column', c, value) in used or ('box', box, value) in used):
+                continue
+            v = value - 1
+            rows.append([cell, cells + r * size + v, 2 * cells + c * size + v, 3 * cells + box * size + v])
+            keys.append((r, c, value))
+    return Encoding(rows, 4 * cells, keys)
+
+
+def sudoku_board(keys, n):
+    """
+    Decode a Sudoku solution.
+
+    :param keys: the (row, column, value) keys of a solution
+    :type keys: list
+    :param n: the order of the grid
+    :type n: int
+    :return: the grid, as a string of n⁴ symbols
+    :rtype: str
+    """
+    size = n * n
+    grid = ['.'] * (size * size)
+    for r, c, value in keys:
+        grid[r * size + c] = SUDOKU_SYMBOLS[value - 1]
+    return ''.join(grid)
+
+
+def solve_sudoku(text, engine=DLX):
+    """
+    :param text: a Sudoku grid (see `parse_sudoku`)
+    :type text: str
+    :return: the first solution, as a string of symbols, or None if there is none
+    :rtype: str
+    """
+    encoding = sudoku_encoding(text)
+    n = round(len(''.join(text.split())) ** 0.25)
+    for keys in encoding.solutions(limit=1, engine=engine):
+        return sudoku_board(keys, n)
+    return None
+
+
+def read_puzzles(lines):
+    """
+    :param lines: an iterable of lines, e.g. an open file; blank lines and lines starting with '#' are skipped
+    :return: a generator of the puzzles, with surrounding whitespace removed
+    :rtype: generator
+    """
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def solve_sudoku_batch(puzzles, processes=None, chunksize=64):
+    """
+    Solve many Sudoku puzzles over a pool of processes.
+
+    :param puzzles: an iterable of grids (see `parse_sudoku`), consumed lazily
+    :type puzzles: iterable
+    :param processes: number of worker processes (default: the number of CPUs); 1 solves them in this process
+    :type processes: int
+    :param chunksize: number of puzzles handed to a worker at once
+    :type chunksize: int
+    :return: a generator of the solutions (None for a puzzle without one), in the order of the puzzles
+    :rtype: generator
+    """
+    if processes == 1:
+        yield from map(solve_sudoku, puzzles)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(solve_sudoku, puzzles, chunksize)
+
+
+def polyomino(*lines):
+    """
+    Read the shape of a piece drawn with 'X' (or any character but '.' and spaces) for its cells::
+
+        polyomino('.XX',
+                  'XX.',
+                  '.X.')
+
+    :return: the cells of the piece, as (row, column) pairs
+    :rtype: list
+    """
+    return [(r, c) for r, line in enumerate(lines) for c, char in enumerate(line) if char not in '. ']
+
+
+# The 12 pentominoes, named after the letters they resemble
+PENTOMINOES = {
+    'F': polyomino('.XX', 'XX.', '.X.'),
+    'I': polyomino('XXXXX'),
+    'L': polyomino('X.', 'X.', 'X.', 'XX'),
+    'N': polyomino('.X', 'XX', 'X.', 'X.'),
+    'P': polyomino('XX', 'XX', 'X.'),
+    'T': polyomino('XXX', '.X.', '.X.'),
+    'U': polyomino('X.X', 'XXX'),
+    'V': polyomino('X..', 'X..', 'XXX'),
+    'W': polyomino('X..', 'XX.', '.XX'),
+    'X': polyomino('.X.', 'XXX', '.X.'),
+    'Y': polyomino('.X', 'XX', '.X', '.X'),
+    'Z': polyomino('XX.', '.X.', '.XX'),
+}
+
+
+def rectangle(height, width):
+    """
+    :return: the cells of a height x width board
+    :rtype: list
+    """
+    return [(r, c) for r in range(height) for c in range(width)]
+
+
+def orientations(cells, reflections=True):
+    """
+    The distinct orientations of a piece, each shifted so that its topmost row and leftmost column are 0.
+
+    :param cells: the cells of the piece
+    :type cells: list
+    :param reflections: if True, the mirror images of the piece count as orientations too
+    :type reflections: bool
+    :return: the orientations, each a sorted tuple of cells, in a fixed order
+    :rtype: list
+    """
+    shapes = []
+    shape = list(cells)
+    for mirror in ((False, True) if reflections else (False,)):
+        for _ in range(4):
+            min_r = min(r for r, _ in shape)
+            min_c = min(c for _, c in shape)
+            normalized = tuple(sorted((r - min_r, c - min_c) for r, c in shape))
+            if normalized not in shapes:
+                shapes.append(normalized)
+            shape = [(c, -r) for r, c in shape]
+        shape = [(r, -c) for r, c in shape]
+    return shapes
+
+
+def polyomino_encoding(board, pieces, reflections=True, each_once=True):
+    """
+    Encode the tilings of a board by polyominoes as an exact cover problem.
+
+    The columns are one per piece (when each piece is used once), then one per cell of the board. A row places an orientation of a piece on the board.
+
+    :param board: the cells of the board, as (row, column) pairs: any shape, with holes or not
+    :type board: iterable
+    :param pieces: the cells of each piece, by name (see `polyomino` and `PENTOMINOES`)
+    :type pieces: dict
+    :param reflections: if True, pieces may be turned over
+    :type reflections: bool
+    :param each_once: if True, every piece is used exactly once; otherwise, any number of times
+    :type each_once: bool
+    :return: the encoding, whose keys are (piece name, tuple of board cells) pairs
+    :rtype: Encoding
+    """
+    board = list(board)
+    cell_column = {cell: j for j, cell in enumerate(board, len(pieces) if each_once else 0)}
+    rows = []
+    keys = []
+    for piece, (name, cells) in enumerate(pieces.items()):
+        for shape in orientations(cells, reflections):
+            first_r, first_c = shape[0]
+            for anchor_r, anchor_c in board:
+                placed = tuple((r + anchor_r - first_r, c + anchor_c - first_c) for r, c in shape)
+                if all(cell in cell_column for cell in placed):
+                    rows.append(([piece] if each_once else []) + [cell_column[cell] for cell in placed])
+                    keys.append((name, placed))
+    return Encoding(rows, len(cell_column) + (len(pieces) if each_once else 0), keys)
+
+
+def tiling_board(keys):
+    """
+    Decode a tiling.
+
+    :param keys: the (piece name, cells) keys of a solution
+    :type keys: list
+    :return: the name of the piece on each cell, by cell
+    :rtype: dict
+    """
+    return {cell: name for name, cells in keys for cell in cells}
+
+
+def format_tiling(tiling):
+    """
+    :param tiling: the piece names by cell (see `tiling_board`)
+    :type tiling: dict
+    :return: the board, one line per row, the cells showing the first letter of their piece's name ('.' outside the board)
+    :rtype: str
+    """
+    height = max(r for r, _ in tiling) + 1
+    width = max(c for _, c in tiling) + 1
+    return '\n'.join(''.join(str(tiling.get((r, c), '.'))[0] for c in range(width)) for r in range(height))
+
+
+def queens_encoding(n):
+    """
+    Encode the N-queens problem as a generalized exact cover problem.
+
+    The 2n primary columns are the rows and files of the board, which must hold exactly one queen each. The 4n - 2 diagonals are secondary columns: at most one queen each.
+
+    :param n: the size of the board
+    :type n: int
+    :return: the encoding, whose keys are the (row, column) squares of the queens
+    :rtype: Encoding
+    """
+    rows = []
+    keys = []
+    for r in range(n):
+        for c in range(n):
+            rows.append([r, n + c, 2 * n + r + c, 5 * n - 2 + r - c])
+            keys.append((r, c))
+    return Encoding(rows, 6 * n - 2, keys, primary=2 * n)
+
+
+def queens_columns(keys):
+    """
+    Decode an N-queens solution as in `n_queen_dijkstra`: the column of the queen in each row.
+
+    :param keys: the (row, column) keys of a solution
+    :type keys: list
+    :rtype: list
+    """
+    columns = [None] * len(keys)
+    for r, c in keys:
+        columns[r] = c
+    return columns
+
+
+class PuzzlesTest(unittest.TestCase):
+
+    puzzle = '53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79'
+    solution = '534678912672195348198342567859761423426853791713924856961537284287419635345286179'
+
+    def test_sudoku(self):
+        for engine in (DLX, ArrayDLX):
+            self.assertEqual(solve_sudoku(self.puzzle, engine), self.solution)
+        encoding = sudoku_encoding(self.puzzle)
+        self.assertEqual(encoding.num_columns, 4 * 81)
+        self.assertEqual(len(list(encoding.solutions())), 1)
+        # the givens have a single row, and the empty cells no row that contradicts them
+        self.assertEqual(sum(1 for r, c, _ in encoding.keys if (r, c) == (0, 0)), 1)
+        self.assertNotIn((0, 2, 5), encoding.keys)
+
+    def test_sudoku_other_orders(self):
+        self.assertEqual(solve_sudoku('.'), '1')
+        self.assertEqual(len(list(sudoku_encoding('.' * 16).solutions())), 288)
+        solution = solve_sudoku('.' * 256)
+        self.assertEqual(len(solution), 256)
+        for i in range(16):
+            self.assertEqual(len(set(solution[i * 16:(i + 1) * 16])), 16)
+            self.assertEqual(len(set(solution[i::16])), 16)
+
+    def test_sudoku_invalid(self):
+        self.assertIsNone(solve_sudoku('11' + '.' * 79))
+        with self.assertRaises(ValueError):
+            parse_sudoku('.' * 80)
+        with self.assertRaises(ValueError):
+            parse_sudoku('A' + '.' * 80)
+
+    def test_sudoku_batch(self):
+        puzzles = ['# a comment', self.puzzle, '', '11' + '.' * 79, self.puzzle]
+        expected = [self.solution, None, self.solution]
+        self.assertEqual(list(solve_sudoku_batch(read_puzzles(puzzles), processes=1)), expected)
+        self.assertEqual(list(solve_sudoku_batch(read_puzzles(puzzles), processes=2, chunksize=1)), expected)
+
+    def test_orientations(self):
+        counts = {name: len(orientations(cells)) for name, cells in PENTOMINOES.items()}
+        self.assertEqual(counts, {'F': 8, 'I': 2, 'L': 8, 'N': 8, 'P': 8, 'T': 4, 'U': 4, 'V': 4, 'W': 4, 'X': 1, 'Y': 8, 'Z': 4})
+        self.assertEqual(len(orientations(PENTOMINOES['F'], reflections=False)), 4)
+
+    def test_domino_tilings(self):
+        domino = {'D': polyomino('XX')}
+        for n, count in ((1, 1), (2, 2), (5, 8), (10, 89)):
+            encoding = polyomino_encoding(rectangle(2, n), domino, each_once=False)
+            self.assertEqual(encoding.engine().count_solutions(), count)
+        self.assertEqual(polyomino_encoding(rectangle(4, 4), domino, each_once=False).engine().count_solutions(), 36)
+
+    def test_pentomino_tiling(self):
+        pieces = {name: PENTOMINOES[name] for name in 'FLUY'}
+        encoding = polyomino_encoding(rectangle(4, 5), pieces)
+        self.assertEqual(encoding.engine().count_solutions(), 12)
+        self.assertEqual(encoding.engine(ArrayDLX).count_solutions(), 12)
+        # the symmetries of the rectangle map tilings onto tilings
+        self.assertEqual(polyomino_encoding(rectangle(5, 4), pieces).engine().count_solutions(), 12)
+        for keys in encoding.solutions():
+            tiling = tiling_board(keys)
+            self.assertEqual(sorted(tiling), rectangle(4, 5))
+            text = format_tiling(tiling)
+            self.assertEqual([len(line) for line in text.split('\n')], [5] * 4)
+            self.assertEqual(sorted(text.replace('\n', '')), sorted('FLUY' * 5))
+        # a board with a hole: no tiling of 19 cells by pieces of 5
+        self.assertEqual(polyomino_encoding(rectangle(4, 5)[1:], pieces).engine().count_solutions(), 0)
+
+    def test_queens(self):
+        for n, count in ((1, 1), (2, 0), (3, 0), (4, 2), (6, 4), (8, 92)):
+            encoding = queens_encoding(n)
+            self.assertEqual(encoding.engine().count_solutions(), count)
+        self.assertEqual([queens_columns(keys) for keys in queens_encoding(4).solutions()], [[1, 3, 0, 2], [2, 0, 3, 1]])
+
+
+def main():
+    """
+    Solve the Sudoku puzzles of a file over a pool of processes and print the throughput.
+    """
+    if len(sys.argv) != 2:
+        print("Usage: {} PUZZLE_FILE".format(sys.argv[0]))
+        sys.exit(2)
+    start = time.perf_counter()
+    solved = unsolved = 0
+    with open(sys.argv[1]) as puzzle_file:
+        for solution in solve_sudoku_batch(read_puzzles(puzzle_file)):
+            if solution is None:
+                unsolved += 1
+            else:
+                solved += 1
+    elapsed = time.perf_counter() - start
+    print("{} puzzles solved, {} without solution, in {:.2f} s: {:.0f} puzzles/s".format(
+        solved, unsolved, elapsed, (solved + unsolved) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,602 @@
 #!/usr/bin/python3
 
+import heapq
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import priority_queue
+
+
+class CycleError(ValueError):
+    """
+    Raised by a topological sort on a graph with a cycle.
+
+    :ivar cycle: the vertices of the cycle, each one with an edge to the next, and the last one with an edge to the first
+    """
+
+    def __init__(self, cycle):
+        super().__init__("cycle: " + " -> ".join(map(repr, cycle + cycle[:1])))
+        self.cycle = cycle
+
+
 class Graph:
+    # The number of BFS results kept in the cache, the least recently used going first
+    bfs_cache_size = 8
+    # The number of edges per vertex from which `minimum_spanning_tree` picks Prim's algorithm over Kruskal's
+    prim_density = 4
+
     def __init__(self, vertices, edges, directed=False):
-        self.vertices = vertices
-        self.edges = edges
+        """
+        :param vertices: the vertex labels
+        :param edges: the edges, as pairs of labels, or triples (label, label, weight); the weight of a pair is 1
+        :param directed: if False, every edge goes both ways
+        :type directed: bool
+        """
         self.directed = directed
         self.graph = {vertex: [] for vertex in vertices}
+        # The weights of the edges out of each vertex, parallel to its neighbors in `graph`
+        self.weights = {vertex: [] for vertex in self.graph}
+        self.weighted = False
         for edge in edges:
+            weight = 1
+            if len(edge) > 2:
+                weight = edge[2]
+                self.weighted = True
             self.graph[edge[0]].append(edge[1])
+            self.weights[edge[0]].append(weight)
             if not directed:
                 self.graph[edge[1]].append(edge[0])
+                self.weights[edge[1]].append(weight)
+        self._reverse = None
+        # The results of the searches, kept until an edit changes them (see `add_edge`)
+        self._cache = {}
+        self._bfs_cache = {}
+
+    @property
+    def vertices(self):
+        """
+        :return: the vertices, in the order they were added
+        :rtype: list
+        """
+        return list(self.graph)
+
+    @property
+    def edges(self):
+        """
+        :return: the edges, as pairs, or triples with their weights if any edge was given one; those of an undirected graph come once each, from the vertex added first
+        :rtype: list
+        """
+        graph, weights = self.graph, self.weights
+        if not self.directed:
+            rank = {vertex: i for i, vertex in enumerate(graph)}
+        edges = []
+        for vertex, neighbors in graph.items():
+            loop = False
+            for neighbor, weight in zip(neighbors, weights[vertex]):
+                if not self.directed:
+                    # Each undirected edge is in the lists of both ends, and a loop twice in the list of its vertex
+                    if neighbor == vertex:
+                        loop = not loop
+                        if not loop:
+                            continue
+                    elif rank[neighbor] < rank[vertex]:
+                        continue
+                edges.append((vertex, neighbor, weight) if self.weighted else (vertex, neighbor))
+        return edges
+
+    def add_vertex(self, vertex):
+        """
+        Add a vertex without edges, after the others; nothing happens if it is already there. The cached search results remain valid, and are extended with it.
+        """
+        if vertex in self.graph:
+            return
+        n = len(self.graph)
+        self.graph[vertex] = []
+        self.weights[vertex] = []
+        if self._reverse is not None:
+            self._reverse[0][vertex] = []
+            self._reverse[1][vertex] = []
+        cache = self._cache
+        if 'DFS' in cache:
+            # A new root, after all the others
+            cache['DFS'][vertex] = (2 * n + 1, 2 * n + 2, None)
+        if 'scc' in cache:
+            components, component_of = cache['scc']
+            component_of[vertex] = len(components)
+            components.append([vertex])
+        if 'topological' in cache:
+            order, position = cache['topological']
+            position[vertex] = len(order)
+            order.append(vertex)
+
+    def add_edge(self, u, v, weight=1):
+        """
+        Add an edge, after the other edges of its vertices.
+
+        The cached search results are kept whenever the edge cannot change them. The DFS stays if the edge leads to a vertex visited before the search left its origin, and a BFS stays if the edge leads to a vertex no farther than its origin, or from a vertex it did not reach. Otherwise they are dropped, to be computed again on the next call. The strongly connected components stay if the edge remains inside a component or goes from a component to an earlier one. The topological order is repaired with the algorithm of Pearce and Kelly (2006), which only moves the vertices between the two ends of the edge. A repaired order remains topological, but it may differ from the one a fresh sort would return.
+
+        :raises KeyError: if a vertex is not in the graph
+        """
+        for vertex in (u, v):
+            if vertex not in self.graph:
+                raise KeyError(vertex)
+        self.graph[u].append(v)
+        self.weights[u].append(weight)
+        if not self.directed:
+            self.graph[v].append(u)
+            self.weights[v].append(weight)
+        elif self._reverse is not None:
+            self._reverse[0][v].append(u)
+            self._reverse[1][v].append(weight)
+        if weight != 1:
+            self.weighted = True
+
+        arcs = ((u, v),) if self.directed else ((u, v), (v, u))
+        cache = self._cache
+        result = cache.get('DFS')
+        if result is not None and any(result[b][0] > result[a][1] for a, b in arcs):
+            del cache['DFS']
+        for key, result in list(self._bfs_cache.items()):
+            if any(a in result and (b not in result or result[b][0] > result[a][0]) for a, b in arcs):
+                del self._bfs_cache[key]
+        if 'scc' in cache:
+            component_of = cache['scc'][1]
+            if component_of[u] < component_of[v] or (component_of[u] != component_of[v] and not self.directed):
+                del cache['scc']
+        if 'topological' in cache:
+            if not self.directed or not self._reorder(u, v):
+                del cache['topological']
+
+    def remove_edge(self, u, v):
+        """
+        Remove an edge from u to v, the first one in the edges of u if there are parallel ones.
+
+        The cached search results are kept whenever the edge cannot change them (see `add_edge`). The DFS and the BFS stay unless the edge is in their trees. The strongly connected components stay if the edge goes from a component to another, and the topological order always stays.
+
+        :raises KeyError: if there is no such edge
+        """
+        if u not in self.graph or v not in self.graph[u]:
+            raise KeyError((u, v))
+        i = self.graph[u].index(v)
+        del self.graph[u][i]
+        weight = self.weights[u].pop(i)
+        if not self.directed:
+            i = self.graph[v].index(u)
+            del self.graph[v][i]
+            del self.weights[v][i]
+        elif self._reverse is not None:
+            reverse_graph, reverse_weights = self._reverse
+            for i, (vertex, w) in enumerate(zip(reverse_graph[v], reverse_weights[v])):
+                if vertex == u and w == weight:
+                    del reverse_graph[v][i]
+                    del reverse_weights[v][i]
+                    break
+
+        arcs = ((u, v),) if self.directed else ((u, v), (v, u))
+        cache = self._cache
+        result = cache.get('DFS')
+        if result is not None and any(result[b][2] == a for a, b in arcs):
+            del cache['DFS']
+        for key, result in list(self._bfs_cache.items()):
+            if any(b in result and result[b][1] == a for a, b in arcs):
+                del self._bfs_cache[key]
+        if 'scc' in cache and cache['scc'][1][u] == cache['scc'][1][v]:
+            del cache['scc']
+
+    def _reorder(self, u, v):
+        """
+        Repair the cached topological order after the addition of an edge from u to v (Pearce and Kelly, 2006). If v comes after u, there is nothing to do. Otherwise, the vertices that v reaches up to the position of u, and those that reach u down to the position of v, are moved, those of u first, to the positions they take up.
+
+        :return: False if the edge closes a cycle
+        :rtype: bool
+        """
+        order, position = self._cache['topological']
+        low, high = position[v], position[u]
+        if low > high:
+            return True
+        if u == v:
+            return False
+        graph = self.graph
+        forward = [v]
+        seen = {v}
+        for vertex in forward:
+            for neighbor in graph[vertex]:
+                if neighbor == u:
+                    return False
+                if neighbor not in seen and position[neighbor] < high:
+                    seen.add(neighbor)
+                    forward.append(neighbor)
+        reverse_graph = self._reverse_adjacency()[0]
+        backward = [u]
+        seen = {u}
+        for vertex in backward:
+            for neighbor in reverse_graph[vertex]:
+                if neighbor not in seen and position[neighbor] > low:
+                    seen.add(neighbor)
+                    backward.append(neighbor)
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        moved = backward + forward
+        for vertex, slot in zip(moved, sorted(position[vertex] for vertex in moved)):
+            order[slot] = vertex
+            position[vertex] = slot
+        return True
 
     def dfs(self):
+        """
+        Depth-first search of the whole graph, the roots being taken in the order of `vertices`, and the neighbors of a vertex in the order of its edges.
+
+        :return: the (entry time, exit time) of each vertex, the clock starting at 1
+        :rtype: dict
+        """
+        return {vertex: (entry, exit_time) for vertex, (entry, exit_time, _) in self.DFS().items()}
+
+    def DFS(self):
+        """
+        Depth-first search of the whole graph (see `dfs`), with an explicit stack: there is no limit on the depth of the search, and the timestamps are the same as those of the recursive `dfs_recursive`.
+
+        :return: the (entry time, exit time, DFS parent) of each vertex, the parent of a root being None
+        :rtype: dict
+        """
+        return dict(self._DFS())
+
+    def _DFS(self):
+        """
+        :return: the result of `DFS`, from the cache if it is there; it must not be modified
+        :rtype: dict
+        """
+        result = self._cache.get('DFS')
+        if result is not None:
+            return result
+        graph = self.graph
+        entry = {}
+        parent = {}
+        result = {}
+        time = 1
+        for root in graph:
+            if root in entry:
+                continue
+            parent[root] = None
+            entry[root] = time
+            time += 1
+            # The stack frames are kept in two parallel lists: the vertices on the current path, and the position
+            # of the next neighbor each of them has to look at (plain ints, which the garbage collector ignores)
+            path = [root]
+            positions = [0]
+            while path:
+                vertex = path[-1]
+                neighbors = graph[vertex]
+                i = positions[-1]
+                while i < len(neighbors):
+                    neighbor = neighbors[i]
+                    i += 1
+                    if neighbor not in entry:
+                        positions[-1] = i
+                        parent[neighbor] = vertex
+                        entry[neighbor] = time
+                        time += 1
+                        path.append(neighbor)
+                        positions.append(0)
+                        break
+                else:
+                    path.pop()
+                    positions.pop()
+                    result[vertex] = (entry[vertex], time, parent[vertex])
+                    time += 1
+        self._cache['DFS'] = result
+        return result
+
+    def bfs(self, *sources):
+        """
+        Breadth-first search from one or more sources, a frontier (all the vertices at the same distance) at a time. The vertices of a frontier are expanded in the order they were reached, their neighbors in the order of the edges.
+
+        :param sources: the labels of the vertices at distance 0
+        :return: the (distance, BFS parent) of each vertex reachable from the sources, in the order they were reached; the parent of a source is None
+        :rtype: dict
+        :raises KeyError: if a source is not a vertex
+        """
+        graph = self.graph
+        for source in sources:
+            if source not in graph:
+                raise KeyError(source)
+        cache = self._bfs_cache
+        if sources in cache:
+            # Last used, last dropped
+            cache[sources] = result = cache.pop(sources)
+            return dict(result)
+        result = {}
+        for source in sources:
+            result.setdefault(source, (0, None))
+        frontier = list(result)
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for vertex in frontier:
+                for neighbor in graph[vertex]:
+                    if neighbor not in result:
+                        result[neighbor] = (distance, vertex)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        cache[sources] = result
+        if len(cache) > self.bfs_cache_size:
+            del cache[next(iter(cache))]
+        return dict(result)
+
+    def strongly_connected_components(self):
+        """
+        Tarjan's algorithm, with an explicit stack (see `DFS`), in O(V + E). In an undirected graph, these are the connected components.
+
+        :return: the strongly connected components, as lists of vertices, in reverse topological order: the edges between components go from later to earlier ones
+        :rtype: list
+        """
+        return [list(component) for component in self._strongly_connected_components()[0]]
+
+    def _strongly_connected_components(self):
+        """
+        :return: the result of `strongly_connected_components`, from the cache if it is there, and the index of the component of each vertex; they must not be modified
+        :rtype: tuple
+        """
+        if 'scc' in self._cache:
+            return self._cache['scc']
+        graph = self.graph
+        index = {}  # the order in which the vertices were visited
+        low = {}    # the lowest index reached from the subtree of a vertex by one more edge, while it is on the stack
+        stack = []  # the visited vertices not assigned to a component yet
+        components = []
+        for root in graph:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            path = [root]
+            positions = [0]
+            while path:
+                vertex = path[-1]
+                neighbors = graph[vertex]
+                i = positions[-1]
+                while i < len(neighbors):
+                    neighbor = neighbors[i]
+                    i += 1
+                    if neighbor not in index:
+                        positions[-1] = i
+                        index[neighbor] = low[neighbor] = len(index)
+                        stack.append(neighbor)
+                        path.append(neighbor)
+                        positions.append(0)
+                        break
+                    if neighbor in low and index[neighbor] < low[vertex]:
+                        low[vertex] = index[neighbor]
+                else:
+                    path.pop()
+                    positions.pop()
+                    if low[vertex] == index[vertex]:
+                        # The vertex is the root of a component: the vertices above it on the stack
+                        start = len(stack) - 1
+                        while stack[start] != vertex:
+                            start -= 1
+                        component = stack[start:]
+                        del stack[start:]
+                        for member in component:
+                            del low[member]
+                        components.append(component)
+                    elif low[vertex] < low[path[-1]]:
+                        low[path[-1]] = low[vertex]
+        component_of = {vertex: i for i, component in enumerate(components) for vertex in component}
+        self._cache['scc'] = components, component_of
+        return components, component_of
+
+    def topological_sort(self):
+        """
+        Topological order, from the exit times of `DFS`: every edge goes from a vertex that exits later to one that exits earlier, unless it closes a cycle with the path of DFS parents down to its origin.
+
+        :return: the vertices, every edge going from a vertex to a later one
+        :rtype: list
+        :raises CycleError: if the graph has a cycle (an undirected edge is a cycle of two vertices)
+        """
+        if 'topological' in self._cache:
+            return list(self._cache['topological'][0])
+        result = self._DFS()
+        exit_times = {vertex: exit_time for vertex, (_, exit_time, _) in result.items()}
+        for vertex, neighbors in self.graph.items():
+            exit_time = exit_times[vertex]
+            for neighbor in neighbors:
+                if exit_times[neighbor] >= exit_time:
+                    # A back edge: the neighbor is an ancestor of the vertex
+                    cycle = [vertex]
+                    while cycle[-1] != neighbor:
+                        cycle.append(result[cycle[-1]][2])
+                    cycle.reverse()
+                    raise CycleError(cycle)
+        order = list(result)
+        order.reverse()
+        self._cache['topological'] = order, {vertex: i for i, vertex in enumerate(order)}
+        return list(order)
+
+    def condensation(self):
+        """
+        The condensation DAG: each strongly connected component becomes a vertex, and the edges between components become a single edge.
+
+        :return: the components, in topological order, and the DAG of their indices
+        :rtype: tuple
+        """
+        graph = self.graph
+        components = self.strongly_connected_components()
+        components.reverse()
+        component_of = {vertex: i for i, component in enumerate(components) for vertex in component}
+        # The last component with an edge to each component, to keep a single edge between two components
+        last = [-1] * len(components)
+        edges = []
+        for i, component in enumerate(components):
+            last[i] = i
+            for vertex in component:
+                for neighbor in graph[vertex]:
+                    j = component_of[neighbor]
+                    if last[j] != i:
+                        last[j] = i
+                        edges.append((i, j))
+        return components, Graph(range(len(components)), edges, directed=True)
+
+    def connected_components(self):
+        """
+        Connected components, with a union-find structure (path halving, the vertex added first becoming the root). In a directed graph, the edges count both ways: these are the weakly connected components.
+
+        :return: the components, as lists of vertices in the order they were added, ordered by their first vertex
+        :rtype: list
+        """
+        roots = {vertex: vertex for vertex in self.graph}
+        rank = {vertex: i for i, vertex in enumerate(self.graph)}
+        for vertex, neighbors in self.graph.items():
+            for neighbor in neighbors:
+                u, v = vertex, neighbor
+                while roots[u] != u:
+                    roots[u] = u = roots[roots[u]]
+                while roots[v] != v:
+                    roots[v] = v = roots[roots[v]]
+                if u != v:
+                    if rank[u] < rank[v]:
+                        roots[v] = u
+                    else:
+                        roots[u] = v
+        components = {}
+        for vertex in self.graph:
+            root = vertex
+            while roots[root] != root:
+                root = roots[root]
+            components.setdefault(root, []).append(vertex)
+        return list(components.values())
+
+    def minimum_spanning_tree(self, algorithm='auto'):
+        """
+        Minimum spanning forest of an undirected graph: a minimum spanning tree of each connected component.
+
+        Kruskal's algorithm sorts the edges by weight, and takes those that join two trees of the forest, with a `UnionFind` structure. Prim's algorithm grows a tree from a vertex, always taking the lightest edge out of the tree, from a heap of candidate edges. Kruskal's sort runs in C, but the unions cost a Python call per edge until the forest is complete. Prim's algorithm only looks at each edge once, and pushes few of them on the heap, so it wins on dense graphs. By default, it is picked from `prim_density` edges per vertex (see `graph_benchmark.py`).
+
+        :param algorithm: 'kruskal', 'prim', or 'auto'
+        :type algorithm: str
+        :return: the (u, v, weight) edges of the forest, Kruskal's by increasing weight, Prim's in the order they joined the tree
+        :rtype: list
+        :raises ValueError: if the graph is directed
+        """
+        if self.directed:
+            raise ValueError("minimum spanning trees need an undirected graph")
+        if algorithm == 'auto':
+            edges = sum(map(len, self.graph.values())) // 2
+            algorithm = 'prim' if edges >= self.prim_density * len(self.graph) else 'kruskal'
+        if algorithm == 'prim':
+            return _prim(self.graph, self._edges_of())
+        if algorithm != 'kruskal':
+            raise ValueError("unknown algorithm {!r}".format(algorithm))
+        labels = list(self.graph)
+        ids = {vertex: i for i, vertex in enumerate(labels)}
+        sources = array('i')
+        destinations = array('i')
+        weights = []
+        for i, vertex in enumerate(labels):
+            for neighbor, weight in zip(self.graph[vertex], self.weights[vertex]):
+                # Each edge once, from its end added first; loops never belong to a tree
+                j = ids[neighbor]
+                if j > i:
+                    sources.append(i)
+                    destinations.append(j)
+                    weights.append(weight)
+        return [(labels[sources[e]], labels[destinations[e]], weights[e]) for e in _kruskal(len(labels), sources, destinations, weights)]
+
+    def dijkstra(self, *sources, heap='binary'):
+        """
+        Dijkstra's algorithm from one or more sources, on non-negative weights. The priority queue holds (distance, rank, vertex) entries, the rank breaking ties in the order the entries were pushed; a vertex whose distance drops is pushed again, and its stale entries are skipped when they come out.
+
+        :param sources: the labels of the vertices at distance 0
+        :param heap: the priority queue, 'binary' (`heapq`) or 'project' (the max-heap of `priority_queue`, see `ProjectHeap`)
+        :type heap: str
+        :return: the (distance, parent in a shortest path tree) of each vertex reachable from the sources, in the order their distances were settled
+        :rtype: dict
+        :raises KeyError: if a source is not a vertex
+        :raises ValueError: if the search meets a negative weight
+        """
+        for source in sources:
+            if source not in self.graph:
+                raise KeyError(source)
+        return _dijkstra(self._edges_of(), sources, heap)
+
+    def shortest_path(self, source, target, bidirectional=True):
+        """
+        Shortest path between two vertices, on non-negative weights. The bidirectional search runs Dijkstra's algorithm forward from the source and backward from the target, expanding the side whose next distance is smaller, and stops when the two next distances add up to the best path found: it settles about two balls of half the radius instead of one ball of the whole radius.
+
+        :param bidirectional: if False, run `dijkstra` from the source until it settles the target
+        :type bidirectional: bool
+        :return: the distance and the vertices of a shortest path, or (inf, None) if the target cannot be reached
+        :rtype: tuple
+        :raises KeyError: if the source or the target is not a vertex
+        :raises ValueError: if the search meets a negative weight
+        """
+        for vertex in (source, target):
+            if vertex not in self.graph:
+                raise KeyError(vertex)
+        if bidirectional:
+            return _bidirectional_dijkstra(self._edges_of(), self._edges_of(reverse=True), source, target)
+        return _path_to(_dijkstra(self._edges_of(), (source,), target=target), target)
+
+    def bellman_ford(self, *sources):
+        """
+        Bellman-Ford algorithm from one or more sources, for weights of any sign. Each round relaxes the edges out of the vertices whose distance dropped in the previous round, so that the search stops as soon as the distances are settled, and it takes at most n rounds of O(E).
+
+        :param sources: the labels of the vertices at distance 0
+        :return: the (distance, parent in a shortest path tree) of each vertex reachable from the sources, in the order they were reached
+        :rtype: dict
+        :raises KeyError: if a source is not a vertex
+        :raises ValueError: if a negative cycle can be reached from the sources
+        """
+        for source in sources:
+            if source not in self.graph:
+                raise KeyError(source)
+        return _bellman_ford(self._edges_of(), len(self.graph), sources)
+
+    def _edges_of(self, reverse=False):
+        """
+        :param reverse: if True, follow the edges backward
+        :return: a function that returns the (neighbor, weight) pairs of a vertex
+        :rtype: function
+        """
+        graph, weights = self._reverse_adjacency() if reverse else (self.graph, self.weights)
+        return lambda vertex: zip(graph[vertex], weights[vertex])
+
+    def _reverse_adjacency(self):
+        """
+        :return: the in-neighbors of each vertex and the weights of their edges, like `graph` and `weights`, built on first use and kept up to date by the edits; for an undirected graph, `graph` and `weights` themselves
+        :rtype: tuple
+        """
+        if not self.directed:
+            return self.graph, self.weights
+        if self._reverse is None:
+            graph, weights = self.graph, self.weights
+            reverse_graph = {vertex: [] for vertex in graph}
+            reverse_weights = {vertex: [] for vertex in graph}
+            for vertex, neighbors in graph.items():
+                for neighbor, weight in zip(neighbors, weights[vertex]):
+                    reverse_graph[neighbor].append(vertex)
+                    reverse_weights[neighbor].append(weight)
+            self._reverse = reverse_graph, reverse_weights
+        return self._reverse
+
+    def dfs_recursive(self):
+        """
+        Recursive version of `dfs`: it raises RecursionError on paths longer than the recursion limit.
+
+        :return: the (entry time, exit time) of each vertex
+        :rtype: dict
+        """
         visited = {vertex: False for vertex in self.vertices}
         entry_exit = {}
 
@@ -33,6 +618,1731 @@ class Graph:
 
         return entry_exit
 
-# Example usage
-g = Graph(['a', 'b', 'c', 'd'], [('a', 'c'), ('d', 'a'), ('b', 'c'), ('b', 'd')], directed=True)
-print(g.dfs())  # Should print the entry and exit times for each vertex
+
+class CSRGraph:
+    """
+    A graph with the same constructor and methods as `Graph`, stored in compressed sparse row (CSR) form.
+
+    The vertex labels are interned to contiguous integer ids, in the order of `vertices`: `labels[i]` is the label of vertex i, and `ids` maps the labels back to ids. The neighbors of vertex i are `targets[offsets[i]:offsets[i + 1]]`, in the order of the edges, as in `Graph`. Both are flat integer arrays, which take 4 bytes per edge and 8 per vertex, against a pointer to a list item per edge and a list and a dictionary entry per vertex for `Graph`. If any edge has a weight, `weights` is a parallel array of floats (8 bytes per edge); otherwise it is None, and every weight is 1. The algorithms run on the ids, the labels only appear in their results.
+    """
+
+    # See `Graph.prim_density`: Kruskal's algorithm is cheaper to set up on the arrays
+    prim_density = 30
+
+    def __init__(self, vertices, edges, directed=False):
+        """
+        :param vertices: the vertex labels
+        :type vertices: iterable
+        :param edges: the edges, as pairs of labels, or triples (label, label, weight); they are read once, so a generator will do
+        :type edges: iterable
+        :param directed: if False, every edge goes both ways
+        :type directed: bool
+        """
+        self.directed = directed
+        self.labels = list(vertices)
+        self.vertices = self.labels
+        self._ids = ids = {label: i for i, label in enumerate(self.labels)}
+        sources = array('i')
+        destinations = array('i')
+        weights = None  # until the first weighted edge
+        for edge in edges:
+            sources.append(ids[edge[0]])
+            destinations.append(ids[edge[1]])
+            if len(edge) > 2:
+                if weights is None:
+                    weights = array('d', [1]) * (len(sources) - 1)
+                weights.append(edge[2])
+            elif weights is not None:
+                weights.append(1)
+        self.num_edges = len(sources)
+        self._build(sources, destinations, weights)
+
+    @classmethod
+    def _from_arrays(cls, labels, sources, destinations, weights=None, directed=False):
+        """
+        :param labels: the vertex labels
+        :param sources: the ids of the origins of the edges
+        :type sources: array
+        :param destinations: the ids of their ends
+        :type destinations: array
+        :return: the graph of those edges, without going through the labels
+        :rtype: CSRGraph
+        """
+        graph = cls.__new__(cls)
+        graph.directed = directed
+        graph.labels = graph.vertices = list(labels)
+        graph._ids = None
+        graph.num_edges = len(sources)
+        graph._build(sources, destinations, weights)
+        return graph
+
+    @property
+    def ids(self):
+        """
+        :return: the id of each label, built on first use if the graph was not built from labels
+        :rtype: dict
+        """
+        if self._ids is None:
+            self._ids = {label: i for i, label in enumerate(self.labels)}
+        return self._ids
+
+    @classmethod
+    def from_edge_list(cls, filename, directed=False, label=int, cache=True, chunk_size=1 << 24):
+        """
+        Build the graph from a text file with one edge per line: two labels, and optionally a weight, separated by whitespace. The lines starting with '#' or '%' are comments. The vertices are those of the edges, in the order they first appear.
+
+        The file is read and parsed `chunk_size` bytes at a time, with no tuple made per edge: the tokens of a chunk are split at once, interned through `map`, and the ids go straight into arrays. The graph is then saved in binary form next to the file (see `save`), and the next call maps that cache instead of parsing the text again, as long as the size and modification time of the file, the direction and the type of the labels have not changed. Since `save` only keeps int and str labels, the cache is only used when `label` is `int` or `str`.
+
+        :param label: the function that turns a label token (a str) into a label
+        :param cache: the path of the binary cache, True for the path of the file with a '.csr' suffix, or False for no cache; ignored if `label` is neither `int` nor `str`
+        :return: the graph
+        :rtype: CSRGraph
+        :raises ValueError: if the lines do not all have the same number of columns, 2 or 3
+        """
+        if cache is True:
+            cache = filename + '.csr'
+        label_type = {int: 'int', str: 'str'}.get(label)
+        if label_type is None:
+            cache = False
+        stat = os.stat(filename)
+        source = [stat.st_size, stat.st_mtime_ns]
+        if cache and os.path.exists(cache):
+            graph = cls.load(cache)
+            if graph.source == source and graph.directed == directed and graph.label_type == label_type:
+                return graph
+        ids = {}
+        labels = []
+        sources = array('i')
+        destinations = array('i')
+        weights = None
+        columns = None
+        for chunk in _edge_list_chunks(filename, chunk_size):
+            tokens = chunk.split()
+            if columns is None:
+                if not tokens:
+                    continue
+                columns = len(next(line for line in chunk.split('\n') if line.strip()).split())
+                if columns not in (2, 3):
+                    raise ValueError("{}: expected 2 or 3 columns, not {}".format(filename, columns))
+                if columns == 3:
+                    weights = array('d')
+            if not _EDGE_LINES[columns].fullmatch(chunk):
+                raise ValueError("{}: every line should have {} columns".format(filename, columns))
+            if columns == 3:
+                weights.extend(map(float, tokens[2::3]))
+                del tokens[2::3]
+            # The ends of the edges, in turn: the labels are interned in the order they first appear
+            ends = list(map(label, tokens))
+            new_labels = [end for end in dict.fromkeys(ends) if end not in ids]
+            ids.update(zip(new_labels, range(len(labels), len(labels) + len(new_labels))))
+            labels.extend(new_labels)
+            ends = array('i', map(ids.__getitem__, ends))
+            sources.extend(ends[0::2])
+            destinations.extend(ends[1::2])
+        graph = cls._from_arrays(labels, sources, destinations, weights, directed)
+        graph._ids = ids
+        graph.source = source
+        if cache:
+            graph.save(cache)
+        return graph
+
+    def save(self, filename):
+        """
+        Save the graph in binary form: a line of magic, a JSON header line, then the raw arrays, each one aligned on 8 bytes, so that `load` can map them in place. The labels are saved as an array of 64-bit integers if they all are ints, or as the lines of a UTF-8 text if they all are strs. The file is written under a temporary name, then moved over the previous one.
+
+        :raises ValueError: if the labels are not all ints, or all strs without line breaks
+        """
+        if all(type(label) is int for label in self.labels):
+            labels, label_type = array('q', self.labels), 'int'
+        elif all(type(label) is str and '\n' not in label for label in self.labels):
+            labels, label_type = array('B', '\n'.join(self.labels).encode()), 'str'
+        else:
+            raise ValueError("only graphs with int labels, or str labels without line breaks, can be saved")
+        sections = {'offsets': self.offsets, 'targets': self.targets, 'labels': labels}
+        if self.weights is not None:
+            sections['weights'] = self.weights
+        layout = {}
+        position = 0
+        for key, values in sections.items():
+            layout[key] = [position, len(values), _typecode(values)]
+            position += -(-len(values) * values.itemsize // 8) * 8
+        header = json.dumps({'directed': self.directed, 'num_edges': self.num_edges, 'labels': label_type,
+                             'source': getattr(self, 'source', None), 'sections': layout}).encode()
+        header = _CSR_MAGIC + header + b'\n'
+        header += b' ' * (-len(header) % 8)
+        temporary = filename + '.tmp'
+        with open(temporary, 'wb') as cache:
+            cache.write(header)
+            for key, values in sections.items():
+                data = memoryview(values).cast('B')
+                cache.write(data)
+                cache.write(bytes(-len(data) % 8))
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Map a graph saved by `save`. The arrays are read-only views of the file, mapped in memory: the operating system only reads the pages the algorithms touch, and shares them between the processes that load the same file. The labels are decoded if they are not integers, and `ids` is only built on first use.
+
+        :return: the graph
+        :rtype: CSRGraph
+        :raises ValueError: if the file was not written by `save`
+        """
+        with open(filename, 'rb') as cache:
+            data = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(_CSR_MAGIC)] != _CSR_MAGIC:
+            raise ValueError("{}: not a graph saved by CSRGraph.save".format(filename))
+        end = data.find(b'\n', len(_CSR_MAGIC))
+        header = json.loads(data[len(_CSR_MAGIC):end])
+        start = end + 1 + (-(end + 1) % 8)
+        view = memoryview(data)
+        sections = {}
+        for key, (position, length, typecode) in header['sections'].items():
+            position += start
+            itemsize = array(typecode).itemsize
+            sections[key] = view[position:position + length * itemsize].cast(typecode)
+        graph = cls.__new__(cls)
+        graph.directed = header['directed']
+        graph.num_edges = header['num_edges']
+        graph.source = header['source']
+        graph.offsets, graph.targets = sections['offsets'], sections['targets']
+        graph.weights = sections.get('weights')
+        graph.label_type = header['labels']
+        if header['labels'] == 'int':
+            graph.labels = sections['labels']
+        else:
+            # One line per vertex: a single empty label is an empty text too
+            graph.labels = bytes(sections['labels']).decode().split('\n') if len(graph.offsets) > 1 else []
+        graph.vertices = graph.labels
+        graph._ids = None
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        :return: the CSR form of a `Graph`, with the neighbors of each vertex in the same order
+        :rtype: CSRGraph
+        """
+        ids = {label: i for i, label in enumerate(graph.graph)}
+        sources = array('i')
+        destinations = array('i')
+        weights = array('d') if graph.weighted else None
+        for vertex, neighbors in graph.graph.items():
+            sources.extend(repeat(ids[vertex], len(neighbors)))
+            destinations.extend(ids[neighbor] for neighbor in neighbors)
+            if weights is not None:
+                weights.extend(graph.weights[vertex])
+        # The lists of `graph` hold both directions of the undirected edges already
+        csr = cls._from_arrays(graph.graph, sources, destinations, weights, directed=True)
+        csr.directed = graph.directed
+        if not graph.directed:
+            csr.num_edges //= 2
+        return csr
+
+    def _build(self, sources, destinations, weights=None):
+        """
+        Build `offsets`, `targets` and `weights` from the edges, given as parallel arrays of ids (and weights, or None): a counting sort on the sources, that keeps the edges of each vertex in their original order.
+        """
+        n = len(self.labels)
+        offsets = array('q', [0]) * (n + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        if not self.directed:
+            for destination in destinations:
+                offsets[destination + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        targets = array('i', [0]) * offsets[n]
+        position = offsets[:n]
+        for source, destination in zip(sources, destinations):
+            targets[position[source]] = destination
+            position[source] += 1
+            if not self.directed:
+                targets[position[destination]] = source
+                position[destination] += 1
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = None
+        if weights is not None:
+            # Second pass, so that unweighted graphs do not pay for it
+            self.weights = array('d', [0]) * offsets[n]
+            position = offsets[:n]
+            for source, destination, weight in zip(sources, destinations, weights):
+                self.weights[position[source]] = weight
+                position[source] += 1
+                if not self.directed:
+                    self.weights[position[destination]] = weight
+                    position[destination] += 1
+
+    def reverse_arrays(self):
+        """
+        :return: the `offsets` and `targets` arrays of the reverse graph (the in-neighbors of each vertex), built on first use; for an undirected graph, those of the graph itself
+        :rtype: tuple
+        """
+        reverse = self._reverse_graph()
+        return reverse.offsets, reverse.targets
+
+    def _reverse_graph(self):
+        """
+        :return: the reverse graph, with the same labels and ids, built on first use; for an undirected graph, the graph itself
+        :rtype: CSRGraph
+        """
+        if not self.directed:
+            return self
+        if getattr(self, '_reverse', None) is None:
+            offsets, targets = self.offsets, self.targets
+            sources = array('i')
+            for vertex in range(len(self.labels)):
+                sources.extend([vertex] * (offsets[vertex + 1] - offsets[vertex]))
+            reverse = CSRGraph.__new__(CSRGraph)
+            reverse.labels, reverse.vertices, reverse._ids = self.labels, self.vertices, self._ids
+            reverse.directed, reverse.num_edges = True, len(targets)
+            reverse._build(targets, sources, self.weights)
+            self._reverse = reverse
+        return self._reverse
+
+    def neighbors(self, vertex):
+        """
+        :return: the labels of the neighbors of a vertex, in the order of the edges
+        :rtype: list
+        """
+        i = self.ids[vertex]
+        labels = self.labels
+        return [labels[j] for j in self.targets[self.offsets[i]:self.offsets[i + 1]]]
+
+    def dfs(self):
+        """
+        Depth-first search (see `Graph.dfs`).
+
+        :return: the (entry time, exit time) of each vertex
+        :rtype: dict
+        """
+        entry, exit_times, _, order = self._dfs()
+        labels = self.labels
+        return {labels[i]: (entry[i], exit_times[i]) for i in order}
+
+    def DFS(self):
+        """
+        Depth-first search (see `Graph.DFS`).
+
+        :return: the (entry time, exit time, DFS parent) of each vertex
+        :rtype: dict
+        """
+        entry, exit_times, parent, order = self._dfs()
+        labels = self.labels
+        return {labels[i]: (entry[i], exit_times[i], labels[parent[i]] if parent[i] >= 0 else None) for i in order}
+
+    def bfs(self, *sources, direction_optimizing=False, alpha=14, beta=24):
+        """
+        Breadth-first search from one or more sources (see `Graph.bfs`), level-synchronous: each step expands a whole frontier into the next one.
+
+        With `direction_optimizing`, a step may run bottom-up instead (Beamer, Asanović and Patterson, 2012): every vertex not reached yet looks for an in-neighbor in the frontier, and stops at the first one. On graphs of low diameter, where most of the vertices are reached in a few steps with huge frontiers, that skips most of the edges. The search goes bottom-up when the edges out of the frontier outnumber the edges into the unreached vertices divided by `alpha`, and back top-down once the frontier shrinks below 1 / `beta` of the vertices. The distances are the same, but the parents may differ from those of the top-down search, which takes the first parent in the order of the edges.
+
+        :param sources: the labels of the vertices at distance 0
+        :param direction_optimizing: if True, switch between top-down and bottom-up steps
+        :type direction_optimizing: bool
+        :return: the (distance, BFS parent) of each vertex reachable from the sources, in the order they were reached
+        :rtype: dict
+        """
+        distance, parent, order = self._bfs([self.ids[source] for source in sources], direction_optimizing, alpha, beta)
+        labels = self.labels
+        return {labels[i]: (distance[i], labels[parent[i]] if parent[i] >= 0 else None) for i in order}
+
+    def _bfs(self, sources, direction_optimizing=False, alpha=14, beta=24):
+        """
+        Breadth-first search on the ids (see `bfs`).
+
+        :param sources: the ids of the sources
+        :type sources: list
+        :return: the distances (-1 if not reached) and parents (-1 for the sources) of the vertices, as arrays indexed by id, and the ids in the order they were reached
+        :rtype: tuple
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.labels)
+        distance = array('q', [-1]) * n
+        parent = array('i', [-1]) * n
+        frontier = []
+        for source in sources:
+            if distance[source] < 0:
+                distance[source] = 0
+                frontier.append(source)
+        order = array('i', frontier)
+        if direction_optimizing:
+            reverse_offsets, reverse_targets = self.reverse_arrays()
+            # Edges into the vertices not reached yet, which a bottom-up step would look at
+            unreached_edges = len(reverse_targets) - sum(reverse_offsets[v + 1] - reverse_offsets[v] for v in frontier)
+        bottom_up = False
+        level = 0
+        while frontier:
+            level += 1
+            if direction_optimizing:
+                if bottom_up:
+                    bottom_up = len(frontier) * beta >= n or len(frontier) >= previous_size
+                else:
+                    frontier_edges = 0
+                    for vertex in frontier:
+                        frontier_edges += offsets[vertex + 1] - offsets[vertex]
+                    bottom_up = frontier_edges * alpha > unreached_edges
+                previous_size = len(frontier)
+            next_frontier = []
+            if bottom_up:
+                in_frontier = bytearray(n)
+                for vertex in frontier:
+                    in_frontier[vertex] = 1
+                for vertex in range(n):
+                    if distance[vertex] < 0:
+                        for neighbor in reverse_targets[reverse_offsets[vertex]:reverse_offsets[vertex + 1]]:
+                            if in_frontier[neighbor]:
+                                distance[vertex] = level
+                                parent[vertex] = neighbor
+                                next_frontier.append(vertex)
+                                break
+            else:
+                for vertex in frontier:
+                    for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                        if distance[neighbor] < 0:
+                            distance[neighbor] = level
+                            parent[neighbor] = vertex
+                            next_frontier.append(neighbor)
+            if direction_optimizing:
+                for vertex in next_frontier:
+                    unreached_edges -= reverse_offsets[vertex + 1] - reverse_offsets[vertex]
+            order.extend(next_frontier)
+            frontier = next_frontier
+        return distance, parent, order
+
+    def strongly_connected_components(self):
+        """
+        Tarjan's algorithm (see `Graph.strongly_connected_components`).
+
+        :return: the strongly connected components, as lists of vertices, in reverse topological order
+        :rtype: list
+        """
+        labels = self.labels
+        return [[labels[i] for i in component] for component in self._strongly_connected_components()]
+
+    def _strongly_connected_components(self):
+        """
+        Tarjan's algorithm on the ids, with an explicit stack (see `_dfs`).
+
+        :return: the components, as arrays of ids, in reverse topological order
+        :rtype: list
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.labels)
+        index = array('q', [-1]) * n
+        low = array('q', [0]) * n
+        on_stack = bytearray(n)
+        stack = array('i')
+        components = []
+        count = 0
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            index[root] = low[root] = count
+            count += 1
+            stack.append(root)
+            on_stack[root] = 1
+            path = [root]
+            positions = [offsets[root]]
+            while path:
+                vertex = path[-1]
+                i = positions[-1]
+                end = offsets[vertex + 1]
+                while i < end:
+                    neighbor = targets[i]
+                    i += 1
+                    if index[neighbor] < 0:
+                        positions[-1] = i
+                        index[neighbor] = low[neighbor] = count
+                        count += 1
+                        stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        path.append(neighbor)
+                        positions.append(offsets[neighbor])
+                        break
+                    if on_stack[neighbor] and index[neighbor] < low[vertex]:
+                        low[vertex] = index[neighbor]
+                else:
+                    path.pop()
+                    positions.pop()
+                    if low[vertex] == index[vertex]:
+                        start = len(stack) - 1
+                        while stack[start] != vertex:
+                            start -= 1
+                        component = stack[start:]
+                        del stack[start:]
+                        for member in component:
+                            on_stack[member] = 0
+                        components.append(component)
+                    elif low[vertex] < low[path[-1]]:
+                        low[path[-1]] = low[vertex]
+        return components
+
+    def topological_sort(self):
+        """
+        Topological order, from the exit times of the DFS (see `Graph.topological_sort`).
+
+        :return: the vertices, every edge going from a vertex to a later one
+        :rtype: list
+        :raises CycleError: if the graph has a cycle
+        """
+        offsets, targets = self.offsets, self.targets
+        _, exit_times, parent, order = self._dfs()
+        labels = self.labels
+        for vertex in range(len(labels)):
+            exit_time = exit_times[vertex]
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if exit_times[neighbor] >= exit_time:
+                    cycle = [vertex]
+                    while cycle[-1] != neighbor:
+                        cycle.append(parent[cycle[-1]])
+                    cycle.reverse()
+                    raise CycleError([labels[i] for i in cycle])
+        return [labels[i] for i in reversed(order)]
+
+    def condensation(self):
+        """
+        The condensation DAG (see `Graph.condensation`).
+
+        :return: the components, in topological order, and the DAG of their indices, as a `CSRGraph`
+        :rtype: tuple
+        """
+        offsets, targets = self.offsets, self.targets
+        components = self._strongly_connected_components()
+        components.reverse()
+        component_of = array('i', [0]) * len(self.labels)
+        for i, component in enumerate(components):
+            for vertex in component:
+                component_of[vertex] = i
+        last = array('i', [-1]) * len(components)
+        sources = array('i')
+        destinations = array('i')
+        for i, component in enumerate(components):
+            last[i] = i
+            for vertex in component:
+                for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                    j = component_of[neighbor]
+                    if last[j] != i:
+                        last[j] = i
+                        sources.append(i)
+                        destinations.append(j)
+        labels = self.labels
+        dag = CSRGraph._from_arrays(range(len(components)), sources, destinations, directed=True)
+        return [[labels[v] for v in component] for component in components], dag
+
+    def connected_components(self):
+        """
+        Connected components (see `Graph.connected_components`), with the union-find kernel of `parallel_connected_components` run over all the vertices at once.
+
+        :return: the components, as lists of vertices in the order of the ids, ordered by their first vertex
+        :rtype: list
+        """
+        n = len(self.labels)
+        roots = array('i', range(n))
+        _hook(self.offsets, self.targets, roots, 0, n)
+        _flatten(roots, 0, n)
+        return self._components(roots)
+
+    def parallel_connected_components(self, processes=None, chunks=None):
+        """
+        Connected components over a pool of processes.
+
+        The CSR arrays and an array of union-find parents are copied once into `multiprocessing.shared_memory` blocks, which every worker maps when it starts: a task is only a range of vertices. In each round, the workers run the union-find kernel over the edges out of their ranges, all on the same parents, every root being hooked below a root of smaller id, so that no write can make a cycle. Two workers may hook the same root at once and lose one of the hooks, so the rounds go on until one makes no hook, usually the second or the third. A last pass points every vertex at its root.
+
+        :param processes: number of worker processes (default: the number of CPUs)
+        :type processes: int
+        :param chunks: number of tasks per round, ranges of vertices with about the same number of edges (default: 4 per process)
+        :type chunks: int
+        :return: the components, as in `connected_components`
+        :rtype: list
+        """
+        n = len(self.labels)
+        processes = processes or os.cpu_count()
+        ranges = self._vertex_ranges(chunks or 4 * processes)
+        blocks, views, descriptions = _share(offsets=self.offsets, targets=self.targets, roots=array('i', range(n)))
+        try:
+            with multiprocessing.Pool(processes, _parallel_init, (descriptions,)) as pool:
+                while sum(pool.map(_hook_task, ranges)):
+                    pass
+                pool.map(_flatten_task, ranges)
+            roots = array('i', views['roots'])
+        finally:
+            _unshare(blocks, views)
+        return self._components(roots)
+
+    def _vertex_ranges(self, chunks):
+        """
+        :return: up to `chunks` (start, stop) ranges of vertex ids, that cover all of them, with about the same number of edges each
+        :rtype: list
+        """
+        offsets = self.offsets
+        n = len(self.labels)
+        bounds = sorted({0, n} | {min(bisect_left(offsets, len(self.targets) * i // chunks), n) for i in range(1, chunks)})
+        return list(zip(bounds, bounds[1:]))
+
+    def _components(self, roots):
+        """
+        :param roots: the root id of each vertex
+        :return: the components, as lists of labels, ordered by their first vertex
+        :rtype: list
+        """
+        components = {}
+        labels = self.labels
+        for vertex, root in enumerate(roots):
+            components.setdefault(root, []).append(labels[vertex])
+        return list(components.values())
+
+    def parallel_bfs(self, *sources, processes=None, chunks=None, threshold=1000):
+        """
+        Breadth-first search over a pool of processes (see `bfs`), level-synchronous: the frontier is split into chunks, which the workers expand at once.
+
+        The CSR arrays, the distances, the parents and the frontier are kept in `multiprocessing.shared_memory` blocks, which every worker maps when it starts: a task is only a slice of the frontier, and its result the array of the vertices it reached first. Two workers may both claim a vertex; the main process drops the second copy from the next frontier, and the parent is that of the last write. The distances are the same as those of `bfs`, but the parents and the order of the vertices within a level may differ. The frontiers smaller than `threshold` are expanded by the main process alone.
+
+        :param sources: the labels of the vertices at distance 0
+        :param processes: number of worker processes (default: the number of CPUs)
+        :type processes: int
+        :param chunks: number of tasks per level (default: 4 per process)
+        :type chunks: int
+        :return: the (distance, BFS parent) of each vertex reachable from the sources, level by level
+        :rtype: dict
+        """
+        n = len(self.labels)
+        processes = processes or os.cpu_count()
+        chunks = chunks or 4 * processes
+        frontier = array('i')
+        distance = array('q', [-1]) * n
+        for source in sources:
+            source = self.ids[source]
+            if distance[source] < 0:
+                distance[source] = 0
+                frontier.append(source)
+        order = array('i', frontier)
+        blocks, views, descriptions = _share(offsets=self.offsets, targets=self.targets, distance=distance,
+                                             parent=array('i', [-1]) * n, frontier=array('i', [0]) * n)
+        try:
+            with multiprocessing.Pool(processes, _parallel_init, (descriptions,)) as pool:
+                level = 0
+                queued = bytearray(n)
+                while frontier:
+                    level += 1
+                    if len(frontier) < threshold:
+                        next_frontier = _expand(views, frontier, 0, len(frontier), level)
+                    else:
+                        views['frontier'][:len(frontier)] = frontier
+                        step = -(-len(frontier) // chunks)
+                        tasks = [(start, min(start + step, len(frontier)), level) for start in range(0, len(frontier), step)]
+                        next_frontier = array('i')
+                        for reached in pool.map(_expand_task, tasks):
+                            for vertex in reached:
+                                if not queued[vertex]:
+                                    queued[vertex] = 1
+                                    next_frontier.append(vertex)
+                    order.extend(next_frontier)
+                    frontier = next_frontier
+            distance = array('q', views['distance'])
+            parent = array('i', views['parent'])
+        finally:
+            _unshare(blocks, views)
+        labels = self.labels
+        return {labels[i]: (distance[i], labels[parent[i]] if parent[i] >= 0 else None) for i in order}
+
+    def minimum_spanning_tree(self, algorithm='auto'):
+        """
+        Minimum spanning forest (see `Graph.minimum_spanning_tree`), on the ids.
+
+        :return: the (u, v, weight) edges of the forest
+        :rtype: list
+        """
+        if self.directed:
+            raise ValueError("minimum spanning trees need an undirected graph")
+        labels = self.labels
+        if algorithm == 'auto':
+            algorithm = 'prim' if self.num_edges >= self.prim_density * len(labels) else 'kruskal'
+        if algorithm == 'prim':
+            return [(labels[u], labels[v], weight) for u, v, weight in _prim(range(len(labels)), self._edges_of())]
+        if algorithm != 'kruskal':
+            raise ValueError("unknown algorithm {!r}".format(algorithm))
+        offsets, targets = self.offsets, self.targets
+        sources = array('i')
+        destinations = array('i')
+        weights = array('d') if self.weights is not None else None
+        for vertex in range(len(labels)):
+            start = offsets[vertex]
+            for k, neighbor in enumerate(targets[start:offsets[vertex + 1]], start):
+                if neighbor > vertex:
+                    sources.append(vertex)
+                    destinations.append(neighbor)
+                    if weights is not None:
+                        weights.append(self.weights[k])
+        tree = _kruskal(len(labels), sources, destinations, weights)
+        return [(labels[sources[e]], labels[destinations[e]], 1 if weights is None else weights[e]) for e in tree]
+
+    def dijkstra(self, *sources, heap='binary'):
+        """
+        Dijkstra's algorithm from one or more sources (see `Graph.dijkstra`).
+
+        :return: the (distance, parent in a shortest path tree) of each vertex reachable from the sources, in the order their distances were settled
+        :rtype: dict
+        """
+        return self._labeled(_dijkstra(self._edges_of(), [self.ids[source] for source in sources], heap))
+
+    def shortest_path(self, source, target, bidirectional=True):
+        """
+        Shortest path between two vertices (see `Graph.shortest_path`).
+
+        :return: the distance and the vertices of a shortest path, or (inf, None) if the target cannot be reached
+        :rtype: tuple
+        """
+        source, target = self.ids[source], self.ids[target]
+        if bidirectional:
+            distance, path = _bidirectional_dijkstra(self._edges_of(), self._reverse_graph()._edges_of(), source, target)
+        else:
+            distance, path = _path_to(_dijkstra(self._edges_of(), (source,), target=target), target)
+        return distance, path and [self.labels[i] for i in path]
+
+    def bellman_ford(self, *sources):
+        """
+        Bellman-Ford algorithm from one or more sources (see `Graph.bellman_ford`).
+
+        :return: the (distance, parent in a shortest path tree) of each vertex reachable from the sources, in the order they were reached
+        :rtype: dict
+        """
+        return self._labeled(_bellman_ford(self._edges_of(), len(self.labels), [self.ids[source] for source in sources]))
+
+    def _edges_of(self):
+        """
+        :return: a function that returns the (neighbor, weight) pairs of a vertex id
+        :rtype: function
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        if weights is None:
+            return lambda vertex: zip(targets[offsets[vertex]:offsets[vertex + 1]], repeat(1))
+        return lambda vertex: zip(targets[offsets[vertex]:offsets[vertex + 1]], weights[offsets[vertex]:offsets[vertex + 1]])
+
+    def _labeled(self, result):
+        """
+        :param result: the (distance, parent) of vertex ids
+        :return: the same, with labels instead of ids
+        :rtype: dict
+        """
+        labels = self.labels
+        return {labels[i]: (distance, None if parent is None else labels[parent]) for i, (distance, parent) in result.items()}
+
+    def _dfs(self):
+        """
+        Explicit-stack depth-first search on the ids (see `Graph.DFS`).
+
+        :return: the entry times, exit times and parents (-1 for the roots) of the vertices, as arrays indexed by id, and the ids in the order they were left
+        :rtype: tuple
+        """
+        offsets, targets = self.offsets, self.targets
+        n = len(self.labels)
+        entry = array('q', [0]) * n  # 0: not visited yet
+        exit_times = array('q', [0]) * n
+        parent = array('i', [-1]) * n
+        order = array('i')
+        time = 1
+        for root in range(n):
+            if entry[root]:
+                continue
+            entry[root] = time
+            time += 1
+            path = [root]
+            positions = [offsets[root]]
+            while path:
+                vertex = path[-1]
+                i = positions[-1]
+                end = offsets[vertex + 1]
+                while i < end:
+                    neighbor = targets[i]
+                    i += 1
+                    if not entry[neighbor]:
+                        positions[-1] = i
+                        parent[neighbor] = vertex
+                        entry[neighbor] = time
+                        time += 1
+                        path.append(neighbor)
+                        positions.append(offsets[neighbor])
+                        break
+                else:
+                    path.pop()
+                    positions.pop()
+                    exit_times[vertex] = time
+                    time += 1
+                    order.append(vertex)
+        return entry, exit_times, parent, order
+
+
+class ProjectHeap:
+    """
+    A min-priority queue on the max-heap of `priority_queue`: the items are kept in a `HeapCapable` array with their keys negated, moved up by swaps with their `priority_queue.parent`, and down by `priority_queue.max_heapify`. It takes (distance, rank, vertex) items, the ranks being distinct, so that the vertices themselves are never compared.
+    """
+
+    def __init__(self):
+        self.heap = priority_queue.HeapCapable([])
+
+    def __len__(self):
+        return self.heap.heap_size
+
+    def push(self, item):
+        distance, rank, vertex = item
+        A = self.heap
+        A.append((-distance, -rank, vertex))
+        i = A.heap_size
+        A.heap_size += 1
+        while i > 0:
+            up = priority_queue.parent(i)
+            if A[up] >= A[i]:
+                break
+            A[i], A[up] = A[up], A[i]
+            i = up
+
+    def pop(self):
+        """
+        :return: the item of smallest distance (and rank)
+        :rtype: tuple
+        """
+        A = self.heap
+        A.heap_size -= 1
+        top = A.pop()
+        if A.heap_size:
+            top, A[0] = A[0], top
+            priority_queue.max_heapify(A, 0)
+        return -top[0], -top[1], top[2]
+
+
+class UnionFind:
+    """
+    Disjoint sets of the integers 0 to n - 1, in two flat arrays: the parent of each element (itself for a root), and the rank of each root, an upper bound on the height of its tree. Union by rank keeps the trees O(log n) high, so that the ranks fit in bytes, and path halving, which points every other node of a find path to its grandparent, flattens them as they are walked: m operations take O(m α(n)).
+    """
+
+    def __init__(self, n):
+        self.parent = array('i', range(n))
+        self.rank = bytearray(n)
+        # The number of sets
+        self.count = n
+
+    def find(self, x):
+        """
+        :return: the root of the set of x
+        :rtype: int
+        """
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = x = parent[parent[x]]
+        return x
+
+    def union(self, x, y):
+        """
+        Merge the sets of x and y, the root of lower rank going under the other.
+
+        :return: False if they were the same set already
+        :rtype: bool
+        """
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        rank = self.rank
+        if rank[x] < rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        if rank[x] == rank[y]:
+            rank[x] += 1
+        self.count -= 1
+        return True
+
+
+class ReachabilityIndex:
+    """
+    The transitive closure of a graph, for constant-time reachability queries: `index.reaches(u, v)`.
+
+    The vertices of a strongly connected component reach the same vertices, so the closure is kept per component of the condensation (see `Graph.condensation`), whose components come in topological order: a component only reaches itself and later ones. The row of component i is a bitset, bit j - i telling whether it reaches component j. The rows are built in reverse topological order, each one as a Python int, the bitwise OR of its own bit and the rows of its successors, shifted into place, then stored as bytes, so that a query reads a single byte instead of shifting a long int. A row takes about (k - i) / 8 bytes for k components, up to k² / 16 bytes in all when most of the pairs are reachable.
+
+    The index is a snapshot: it does not follow the edits of the graph.
+
+    :ivar component_of: the index of the component of each vertex
+    :ivar rows: the bitset of each component, as bytes, least significant bit first
+    """
+
+    def __init__(self, graph):
+        """
+        :param graph: a `Graph` or a `CSRGraph`
+        """
+        components, dag = graph.condensation()
+        self.component_of = {vertex: i for i, component in enumerate(components) for vertex in component}
+        successors = dag.neighbors if isinstance(dag, CSRGraph) else dag.graph.__getitem__
+        rows = [0] * len(components)
+        for i in range(len(components) - 1, -1, -1):
+            row = 1
+            for j in successors(i):
+                row |= rows[j] << (j - i)
+            rows[i] = row
+        for i, row in enumerate(rows):
+            rows[i] = row.to_bytes((row.bit_length() + 7) // 8, 'little')
+        self.rows = rows
+
+    def reaches(self, u, v):
+        """
+        :return: True if there is a path from u to v; a vertex reaches itself
+        :rtype: bool
+        :raises KeyError: if u or v is not a vertex
+        """
+        i = self.component_of[u]
+        shift = self.component_of[v] - i
+        if shift < 0:
+            return False
+        row = self.rows[i]
+        byte = shift >> 3
+        return byte < len(row) and (row[byte] >> (shift & 7)) & 1 == 1
+
+    def memory(self):
+        """
+        :return: the size of the bitsets, in bytes
+        :rtype: int
+        """
+        return sum(map(len, self.rows))
+
+
+def _kruskal(n, sources, destinations, weights):
+    """
+    Kruskal's algorithm on any list of undirected edges between the integers 0 to n - 1 (see `Graph.minimum_spanning_tree`).
+
+    :param weights: the weights of the edges, or None if they all weigh the same
+    :return: the indices of the edges of a minimum spanning forest, by increasing weight
+    :rtype: list
+    """
+    # A stable sort: the edges of the same weight are taken in their order
+    order = range(len(sources)) if weights is None else sorted(range(len(sources)), key=weights.__getitem__)
+    sets = UnionFind(n)
+    union = sets.union
+    tree = []
+    for edge in order:
+        if union(sources[edge], destinations[edge]):
+            tree.append(edge)
+            if sets.count == 1:
+                break
+    return tree
+
+
+def _prim(vertices, edges_of):
+    """
+    Prim's algorithm on any undirected graph (see `Graph.minimum_spanning_tree`), from each vertex not in the forest yet, in order.
+
+    :param edges_of: a function that returns the (neighbor, weight) pairs of a vertex
+    :return: the (u, v, weight) edges of a minimum spanning forest, in the order they joined it
+    :rtype: list
+    """
+    in_forest = set()
+    # The weight of the lightest edge seen from the tree to each vertex: an edge is only pushed if it is lighter,
+    # which makes about V log(E / V) pushes on random weights instead of E
+    lightest = {}
+    tree = []
+    rank = 0  # breaks the ties between the heap entries, in the order they were pushed
+    for root in vertices:
+        if root in in_forest:
+            continue
+        in_forest.add(root)
+        heap = []
+        vertex = root
+        while True:
+            for neighbor, weight in edges_of(vertex):
+                if neighbor not in in_forest and (neighbor not in lightest or weight < lightest[neighbor]):
+                    lightest[neighbor] = weight
+                    heapq.heappush(heap, (weight, rank, vertex, neighbor))
+                    rank += 1
+            while heap and heap[0][3] in in_forest:
+                heapq.heappop(heap)
+            if not heap:
+                break
+            weight, _, origin, vertex = heapq.heappop(heap)
+            in_forest.add(vertex)
+            tree.append((origin, vertex, weight))
+    return tree
+
+
+def _dijkstra(edges_of, sources, heap='binary', target=None):
+    """
+    Dijkstra's algorithm on any graph (see `Graph.dijkstra`).
+
+    :param edges_of: a function that returns the (neighbor, weight) pairs of a vertex
+    :param target: if not None, stop once this vertex is settled
+    :return: the (distance, parent) of the vertices settled, in the order they were settled
+    :rtype: dict
+    """
+    if heap == 'binary':
+        queue = []
+        push = lambda item: heapq.heappush(queue, item)
+        pop = lambda: heapq.heappop(queue)
+    elif heap == 'project':
+        queue = ProjectHeap()
+        push, pop = queue.push, queue.pop
+    else:
+        raise ValueError("unknown heap {!r}".format(heap))
+    best = {}
+    result = {}
+    rank = 0
+    for source in sources:
+        if source not in best:
+            best[source] = (0, None)
+            push((0, rank, source))
+            rank += 1
+    while queue:
+        distance, _, vertex = pop()
+        if vertex in result:
+            continue
+        result[vertex] = best[vertex]
+        if vertex == target:
+            break
+        for neighbor, weight in edges_of(vertex):
+            if weight < 0:
+                raise ValueError("negative weight {} on edge ({!r}, {!r})".format(weight, vertex, neighbor))
+            new_distance = distance + weight
+            if neighbor not in best or new_distance < best[neighbor][0]:
+                best[neighbor] = (new_distance, vertex)
+                push((new_distance, rank, neighbor))
+                rank += 1
+    return result
+
+
+def _path_to(result, target):
+    """
+    :param result: the (distance, parent) of the vertices reached by a search
+    :return: the distance of `target` and the path to it from a source, or (inf, None) if it was not reached
+    :rtype: tuple
+    """
+    if target not in result:
+        return float('inf'), None
+    path = [target]
+    while result[path[-1]][1] is not None:
+        path.append(result[path[-1]][1])
+    path.reverse()
+    return result[target][0], path
+
+
+def _bidirectional_dijkstra(forward, backward, source, target):
+    """
+    Bidirectional Dijkstra search on any graph (see `Graph.shortest_path`).
+
+    :param forward: a function that returns the (neighbor, weight) pairs of the edges out of a vertex
+    :param backward: a function that returns the (neighbor, weight) pairs of the edges into a vertex
+    :return: the distance and the vertices of a shortest path, or (inf, None)
+    :rtype: tuple
+    """
+    if source == target:
+        return 0, [source]
+    edges_of = (forward, backward)
+    queues = ([(0, 0, source)], [(0, 1, target)])
+    best = ({source: (0, None)}, {target: (0, None)})
+    settled = (set(), set())
+    shortest, meeting = float('inf'), None
+    rank = 2
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= shortest:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        distance, _, vertex = heapq.heappop(queues[side])
+        if vertex in settled[side]:
+            continue
+        settled[side].add(vertex)
+        mine, other = best[side], best[1 - side]
+        for neighbor, weight in edges_of[side](vertex):
+            if weight < 0:
+                raise ValueError("negative weight {} on edge ({!r}, {!r})".format(
+                    weight, *((vertex, neighbor) if side == 0 else (neighbor, vertex))))
+            new_distance = distance + weight
+            if neighbor not in mine or new_distance < mine[neighbor][0]:
+                mine[neighbor] = (new_distance, vertex)
+                heapq.heappush(queues[side], (new_distance, rank, neighbor))
+                rank += 1
+                if neighbor in other and new_distance + other[neighbor][0] < shortest:
+                    shortest, meeting = new_distance + other[neighbor][0], neighbor
+    if meeting is None:
+        return float('inf'), None
+    _, path = _path_to(best[0], meeting)
+    vertex = best[1][meeting][1]
+    while vertex is not None:
+        path.append(vertex)
+        vertex = best[1][vertex][1]
+    return shortest, path
+
+
+def _bellman_ford(edges_of, n, sources):
+    """
+    Bellman-Ford algorithm on any graph (see `Graph.bellman_ford`).
+
+    :param edges_of: a function that returns the (neighbor, weight) pairs of a vertex
+    :param n: the number of vertices
+    :return: the (distance, parent) of the vertices reached, in the order they were reached
+    :rtype: dict
+    """
+    best = {}
+    for source in sources:
+        best[source] = (0, None)
+    # The vertices whose distance dropped in the last round, in a dict to keep them unique and in order
+    changed = dict.fromkeys(best)
+    # A shortest path has at most n - 1 edges: a distance that still drops in round n goes round a negative cycle
+    for _ in range(n):
+        if not changed:
+            break
+        next_changed = {}
+        for vertex in changed:
+            distance = best[vertex][0]
+            for neighbor, weight in edges_of(vertex):
+                new_distance = distance + weight
+                if neighbor not in best or new_distance < best[neighbor][0]:
+                    best[neighbor] = (new_distance, vertex)
+                    next_changed[neighbor] = None
+        changed = next_changed
+    if changed:
+        raise ValueError("negative cycle reachable from the sources")
+    return best
+
+
+# The first line of the files written by `CSRGraph.save`
+_CSR_MAGIC = b'CSRGraph 1\n'
+
+
+def _edge_lines_pattern(columns):
+    """
+    :return: a pattern for a text of lines that are either blank or made of `columns` fields, separated by whitespace other than newlines; its quantifiers are possessive, so that matching a chunk of a million lines keeps no backtracking state
+    """
+    line = r'[^\S\n]*+(?:\S++(?:[^\S\n]++\S++){%d}[^\S\n]*+)?+' % (columns - 1)
+    return re.compile(r'(?:{0}\n)*+{0}'.format(line))
+
+
+_EDGE_LINES = {columns: _edge_lines_pattern(columns) for columns in (2, 3)}
+
+
+def _typecode(values):
+    """
+    :param values: an array, or a memoryview of one (such as the arrays of a graph mapped by `CSRGraph.load`)
+    :return: its type code
+    :rtype: str
+    """
+    return values.typecode if isinstance(values, array) else values.format
+
+
+def _edge_list_chunks(filename, chunk_size):
+    """
+    Read an edge list file by chunks of whole lines, without its comment lines.
+
+    :return: a generator of str chunks
+    :rtype: generator
+    """
+    with open(filename, 'rb') as edge_list:
+        rest = b''
+        while True:
+            data = edge_list.read(chunk_size)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b'\n') + 1
+            data, rest = data[:cut], data[cut:]
+            if data:
+                yield _strip_comments(data).decode()
+        if rest:
+            yield _strip_comments(rest).decode()
+
+
+def _strip_comments(data):
+    if b'#' not in data and b'%' not in data:
+        return data
+    return b'\n'.join(line for line in data.split(b'\n') if not line.lstrip().startswith((b'#', b'%')))
+
+
+def _hook(offsets, targets, roots, start, stop):
+    """
+    Union-find over the edges out of the vertices start to stop - 1, with path halving: the root of larger id is hooked below the other, so that every vertex points to a smaller id or to itself.
+
+    :param roots: the parents of the vertices, updated in place
+    :return: the number of hooks
+    :rtype: int
+    """
+    hooks = 0
+    for vertex in range(start, stop):
+        for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+            u, v = vertex, neighbor
+            while roots[u] != u:
+                roots[u] = u = roots[roots[u]]
+            while roots[v] != v:
+                roots[v] = v = roots[roots[v]]
+            if u != v:
+                if u < v:
+                    roots[v] = u
+                else:
+                    roots[u] = v
+                hooks += 1
+    return hooks
+
+
+def _flatten(roots, start, stop):
+    """
+    Point the vertices start to stop - 1 straight at their roots.
+    """
+    for vertex in range(start, stop):
+        root = roots[vertex]
+        while roots[root] != root:
+            root = roots[root]
+        roots[vertex] = root
+
+
+def _expand(arrays, frontier, start, stop, level):
+    """
+    Expand `frontier[start:stop]` into the next level of a BFS: claim the neighbors not reached yet.
+
+    :param arrays: the `offsets`, `targets`, `distance` and `parent` arrays (or views) of the search
+    :return: the vertices claimed
+    :rtype: array
+    """
+    offsets, targets, distance, parent = arrays['offsets'], arrays['targets'], arrays['distance'], arrays['parent']
+    reached = array('i')
+    for i in range(start, stop):
+        vertex = frontier[i]
+        for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+            if distance[neighbor] < 0:
+                distance[neighbor] = level
+                parent[neighbor] = vertex
+                reached.append(neighbor)
+    return reached
+
+
+def _share(**arrays):
+    """
+    Copy arrays into new shared memory blocks.
+
+    :return: the blocks, views of their contents as arrays of the same type, and the (name, typecode, length) of each block for `_parallel_init`
+    :rtype: tuple
+    """
+    blocks, views, descriptions = [], {}, {}
+    for key, values in arrays.items():
+        typecode = _typecode(values)
+        block = shared_memory.SharedMemory(create=True, size=max(len(values), 1) * values.itemsize)
+        blocks.append(block)
+        views[key] = block.buf.cast(typecode)[:len(values)]
+        views[key][:] = memoryview(values)
+        descriptions[key] = (block.name, typecode, len(values))
+    return blocks, views, descriptions
+
+
+def _unshare(blocks, views):
+    """
+    Release and destroy the blocks made by `_share`.
+    """
+    for view in views.values():
+        view.release()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+# The views of the shared arrays, in each worker process of a parallel search
+_worker_arrays = {}
+_worker_blocks = []
+
+def _parallel_init(descriptions):
+    """
+    Initializer of the worker processes: map the shared memory blocks.
+    """
+    for key, (name, typecode, length) in descriptions.items():
+        # The workers share the resource tracker of the main process, which unlinks the blocks
+        block = shared_memory.SharedMemory(name)
+        _worker_blocks.append(block)
+        _worker_arrays[key] = block.buf.cast(typecode)[:length]
+
+def _hook_task(bounds):
+    arrays = _worker_arrays
+    return _hook(arrays['offsets'], arrays['targets'], arrays['roots'], *bounds)
+
+def _flatten_task(bounds):
+    _flatten(_worker_arrays['roots'], *bounds)
+
+def _expand_task(task):
+    start, stop, level = task
+    return _expand(_worker_arrays, _worker_arrays['frontier'], start, stop, level)
+
+
+def path_graph(n, directed=True, engine=None):
+    """
+    :param engine: the class of the graph, `Graph` (the default) or `CSRGraph`
+    :return: the path 0 - 1 - ... - n-1
+    :rtype: Graph
+    """
+    return (engine or Graph)(range(n), [(i, i + 1) for i in range(n - 1)], directed=directed)
+
+
+def random_graph(n, m, directed=True, seed=0, engine=None, weights=None):
+    """
+    :param engine: the class of the graph, `Graph` (the default) or `CSRGraph`
+    :param weights: if not None, the (lowest, highest) integer weight of the edges, drawn uniformly
+    :type weights: tuple
+    :return: a graph with n vertices 0 to n-1, and m edges between random vertices (loops and parallel edges included)
+    :rtype: Graph
+    """
+    rng = random.Random(seed)
+    if weights is None:
+        edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(m)]
+    else:
+        edges = [(rng.randrange(n), rng.randrange(n), rng.randint(*weights)) for _ in range(m)]
+    return (engine or Graph)(range(n), edges, directed=directed)
+
+
+class GraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.g = Graph(('a', 'b', 'c', 'd'), (('a', 'c'), ('d', 'a'), ('b', 'c'), ('b', 'd')), directed=True)
+
+    def test_DFS(self):
+        self.assertEqual(self.g.DFS(), {'a': (1, 4, None), 'b': (5, 8, None), 'c': (2, 3, 'a'), 'd': (6, 7, 'b')})
+
+    def test_dfs(self):
+        self.assertEqual(self.g.dfs(), {'a': (1, 4), 'b': (5, 8), 'c': (2, 3), 'd': (6, 7)})
+
+    def test_dfs_undirected(self):
+        g = Graph(('a', 'b', 'c', 'd'), (('a', 'c'), ('d', 'a'), ('b', 'c'), ('b', 'd')))
+        self.assertEqual(g.DFS(), {'a': (1, 8, None), 'c': (2, 7, 'a'), 'b': (3, 6, 'c'), 'd': (4, 5, 'b')})
+
+    def test_same_as_recursive(self):
+        for directed in (True, False):
+            for seed in range(10):
+                g = random_graph(60, 90, directed=directed, seed=seed)
+                self.assertEqual(g.dfs(), g.dfs_recursive())
+                # the results come in the same order too: by exit time
+                self.assertEqual(list(g.dfs()), list(g.dfs_recursive()))
+
+    def test_parents(self):
+        g = random_graph(200, 300, seed=1)
+        result = g.DFS()
+        for vertex, (entry, exit_time, parent) in result.items():
+            if parent is not None:
+                self.assertIn(vertex, g.graph[parent])
+                # the interval of a vertex is nested in that of its parent
+                self.assertLess(result[parent][0], entry)
+                self.assertLess(exit_time, result[parent][1])
+        self.assertEqual(sorted(t for entry, exit_time, _ in result.values() for t in (entry, exit_time)), list(range(1, 401)))
+
+    def test_long_path(self):
+        n = sys.getrecursionlimit() * 10
+        g = path_graph(n)
+        result = g.DFS()
+        self.assertEqual(result[0], (1, 2 * n, None))
+        self.assertEqual(result[n - 1], (n, n + 1, n - 2))
+        with self.assertRaises(RecursionError):
+            g.dfs_recursive()
+        self.assertEqual(CSRGraph.from_graph(g).DFS()[n - 1], (n, n + 1, n - 2))
+
+    def test_bfs(self):
+        self.assertEqual(self.g.bfs('a'), {'a': (0, None), 'c': (1, 'a')})
+        self.assertEqual(self.g.bfs('b'), {'b': (0, None), 'c': (1, 'b'), 'd': (1, 'b'), 'a': (2, 'd')})
+        # multi-source: each vertex is as far as its closest source
+        self.assertEqual(self.g.bfs('a', 'd', 'a'), {'a': (0, None), 'd': (0, None), 'c': (1, 'a')})
+        csr = CSRGraph.from_graph(self.g)
+        for direction_optimizing in (False, True):
+            self.assertEqual(csr.bfs('b', direction_optimizing=direction_optimizing), self.g.bfs('b'))
+        with self.assertRaises(KeyError):
+            self.g.bfs('z')
+        with self.assertRaises(KeyError):
+            csr.bfs('z')
+
+    def test_bfs_csr_same_as_graph(self):
+        for directed in (True, False):
+            for seed in range(5):
+                g = random_graph(100, 250, directed=directed, seed=seed)
+                csr = CSRGraph.from_graph(g)
+                sources = random.Random(seed).sample(range(100), 3)
+                expected = g.bfs(*sources)
+                self.assertEqual(list(csr.bfs(*sources).items()), list(expected.items()))
+                # direction-optimizing: same distances, and valid parents
+                result = csr.bfs(*sources, direction_optimizing=True, alpha=1, beta=1000)
+                self.assertEqual({v: d for v, (d, _) in result.items()}, {v: d for v, (d, _) in expected.items()})
+                for vertex, (distance, parent) in result.items():
+                    if parent is None:
+                        self.assertIn(vertex, sources)
+                    else:
+                        self.assertEqual(result[parent][0], distance - 1)
+                        self.assertIn(vertex, g.graph[parent])
+
+    def test_csr_layout(self):
+        csr = CSRGraph(('a', 'b', 'c', 'd'), (('a', 'c'), ('d', 'a'), ('b', 'c'), ('b', 'd')), directed=True)
+        self.assertEqual(csr.ids, {'a': 0, 'b': 1, 'c': 2, 'd': 3})
+        self.assertEqual(list(csr.offsets), [0, 1, 3, 3, 4])
+        self.assertEqual(list(csr.targets), [2, 2, 3, 0])
+        self.assertEqual(csr.neighbors('b'), ['c', 'd'])
+        self.assertEqual(csr.DFS(), self.g.DFS())
+        undirected = CSRGraph(('a', 'b'), iter([('a', 'b'), ('b', 'b')]))
+        self.assertEqual(undirected.neighbors('b'), ['a', 'b', 'b'])
+        with self.assertRaises(KeyError):
+            CSRGraph(('a',), [('a', 'z')])
+
+    def test_csr_same_as_graph(self):
+        for directed in (True, False):
+            for seed in range(5):
+                g = random_graph(80, 150, directed=directed, seed=seed)
+                csr = CSRGraph.from_graph(g)
+                self.assertEqual(list(csr.DFS().items()), list(g.DFS().items()))
+                self.assertEqual(csr.dfs(), g.dfs())
+                for vertex in g.vertices:
+                    self.assertEqual(csr.neighbors(vertex), g.graph[vertex])
+
+    def test_dijkstra(self):
+        g = Graph('abcde', [('a', 'b', 4), ('a', 'c', 1), ('c', 'b', 2), ('b', 'd', 1), ('c', 'd', 5), ('e', 'a', 1)], directed=True)
+        expected = {'a': (0, None), 'c': (1, 'a'), 'b': (3, 'c'), 'd': (4, 'b')}
+        for engine in (Graph, CSRGraph):
+            h = g if engine is Graph else CSRGraph.from_graph(g)
+            for heap in ('binary', 'project'):
+                self.assertEqual(list(h.dijkstra('a', heap=heap).items()), list(expected.items()))
+            for bidirectional in (True, False):
+                self.assertEqual(h.shortest_path('a', 'd', bidirectional), (4, ['a', 'c', 'b', 'd']))
+                self.assertEqual(h.shortest_path('d', 'a', bidirectional), (float('inf'), None))
+                self.assertEqual(h.shortest_path('b', 'b', bidirectional), (0, ['b']))
+            self.assertEqual(h.bellman_ford('a'), expected)
+            with self.assertRaises(ValueError):
+                h.dijkstra('a', heap='fibonacci')
+            with self.assertRaises(KeyError):
+                h.shortest_path('a', 'z')
+        # without weights, the distances are those of the BFS
+        g = random_graph(100, 300, directed=False, seed=3)
+        self.assertEqual({v: d for v, (d, _) in g.dijkstra(0).items()}, {v: d for v, (d, _) in g.bfs(0).items()})
+
+    def test_shortest_paths_agree(self):
+        for directed in (True, False):
+            for seed in range(5):
+                g = random_graph(120, 400, directed=directed, seed=seed, weights=(0, 20))
+                csr = CSRGraph.from_graph(g)
+                expected = g.dijkstra(0, 1)
+                # the project heap breaks ties in the same order as heapq
+                self.assertEqual(list(g.dijkstra(0, 1, heap='project').items()), list(expected.items()))
+                self.assertEqual(list(csr.dijkstra(0, 1).items()), list(expected.items()))
+                distances = {v: d for v, (d, _) in expected.items()}
+                for h in (g, csr):
+                    self.assertEqual({v: d for v, (d, _) in h.bellman_ford(0, 1).items()}, distances)
+                rng = random.Random(seed)
+                for _ in range(20):
+                    source, target = rng.randrange(120), rng.randrange(120)
+                    distance = g.dijkstra(source).get(target, (float('inf'),))[0]
+                    for h in (g, csr):
+                        length, path = h.shortest_path(source, target)
+                        self.assertEqual(length, distance)
+                        if path is not None:
+                            self.assertEqual((path[0], path[-1]), (source, target))
+                            weights = [min(w for v, w in zip(g.graph[u], g.weights[u]) if v == next_u) for u, next_u in zip(path, path[1:])]
+                            self.assertEqual(sum(weights), distance)
+
+    def test_negative_weights(self):
+        edges = [('s', 'a', 4), ('s', 'b', 2), ('a', 'c', -3), ('b', 'a', 1), ('c', 'd', 2)]
+        for engine in (Graph, CSRGraph):
+            g = engine('sabcd', edges, directed=True)
+            self.assertEqual(g.bellman_ford('s'), {'s': (0, None), 'a': (3, 'b'), 'b': (2, 's'), 'c': (0, 'a'), 'd': (2, 'c')})
+            with self.assertRaises(ValueError):
+                g.dijkstra('s')
+            with self.assertRaises(ValueError):
+                g.shortest_path('s', 'd')
+            cyclic = engine('sabcd', edges + [('c', 'b', 1)], directed=True)
+            with self.assertRaises(ValueError):
+                cyclic.bellman_ford('s')
+            # the cycle cannot be reached from d
+            self.assertEqual(cyclic.bellman_ford('d'), {'d': (0, None)})
+
+    def test_weighted_csr_layout(self):
+        csr = CSRGraph('abc', iter([('a', 'b', 2.5), ('c', 'a'), ('b', 'c', 1)]))
+        self.assertEqual(list(csr.targets), [1, 2, 0, 2, 0, 1])
+        self.assertEqual(list(csr.weights), [2.5, 1, 2.5, 1, 1, 1])
+        self.assertIsNone(CSRGraph('ab', [('a', 'b')]).weights)
+        directed = CSRGraph('abc', [('a', 'b', 2.5), ('c', 'a', 3), ('b', 'c', 1)], directed=True)
+        reverse = directed._reverse_graph()
+        self.assertEqual((list(reverse.targets), list(reverse.weights)), ([2, 0, 1], [3, 2.5, 1]))
+
+    def test_strongly_connected_components(self):
+        g = Graph('abcdefgh', [('a', 'b'), ('b', 'c'), ('c', 'a'), ('b', 'd'), ('d', 'e'), ('e', 'f'), ('f', 'd'), ('g', 'f'), ('g', 'h'), ('h', 'g')], directed=True)
+        expected = [['d', 'e', 'f'], ['a', 'b', 'c'], ['g', 'h']]
+        for h in (g, CSRGraph.from_graph(g)):
+            self.assertEqual(h.strongly_connected_components(), expected)
+            components, dag = h.condensation()
+            self.assertEqual(components, [['g', 'h'], ['a', 'b', 'c'], ['d', 'e', 'f']])
+            self.assertEqual({v: dag.neighbors(v) for v in range(3)} if isinstance(dag, CSRGraph) else dag.graph, {0: [2], 1: [2], 2: []})
+        # brute force: two vertices are in the same component iff they reach each other
+        for seed in range(5):
+            g = random_graph(60, 90, seed=seed)
+            reach = {v: set(g.bfs(v)) for v in g.vertices}
+            for h in (g, CSRGraph.from_graph(g)):
+                components = h.strongly_connected_components()
+                self.assertEqual(sorted(v for component in components for v in component), list(range(60)))
+                for component in components:
+                    for v in component:
+                        self.assertEqual({w for w in reach[v] if v in reach[w]}, set(component))
+                # reverse topological order: no edge goes to a later component
+                position = {v: i for i, component in enumerate(components) for v in component}
+                for v in g.vertices:
+                    for w in g.graph[v]:
+                        self.assertGreaterEqual(position[v], position[w])
+                # the components of the condensation come in topological order
+                components, dag = h.condensation()
+                dag = dag if isinstance(dag, CSRGraph) else CSRGraph.from_graph(dag)
+                self.assertTrue(all(i < j for i in dag.vertices for j in dag.neighbors(i)))
+                self.assertEqual(len(dag.topological_sort()), len(components))
+
+    def test_topological_sort(self):
+        for seed in range(5):
+            rng = random.Random(seed)
+            edges = [tuple(sorted(rng.sample(range(50), 2))) for _ in range(120)]
+            for engine in (Graph, CSRGraph):
+                order = engine(range(50), edges, directed=True).topological_sort()
+                position = {v: i for i, v in enumerate(order)}
+                self.assertEqual(sorted(order), list(range(50)))
+                self.assertTrue(all(position[u] < position[v] for u, v in edges))
+                g = engine(range(50), edges + [(30, 10), (40, 40)], directed=True)
+                with self.assertRaises(CycleError) as context:
+                    g.topological_sort()
+                cycle = context.exception.cycle
+                neighbors = g.graph if engine is Graph else {v: g.neighbors(v) for v in g.vertices}
+                for u, v in zip(cycle, cycle[1:] + cycle[:1]):
+                    self.assertIn(v, neighbors[u])
+        with self.assertRaises(CycleError) as context:
+            Graph('ab', [('a', 'b')]).topological_sort()
+        self.assertEqual(context.exception.cycle, ['a', 'b'])
+        self.assertEqual(str(context.exception), "cycle: 'a' -> 'b' -> 'a'")
+
+    def test_long_cycle(self):
+        n = sys.getrecursionlimit() * 10
+        for engine in (Graph, CSRGraph):
+            g = engine(range(n), [(i, (i + 1) % n) for i in range(n)], directed=True)
+            self.assertEqual(g.strongly_connected_components(), [list(range(n))])
+            with self.assertRaises(CycleError) as context:
+                g.topological_sort()
+            self.assertEqual(context.exception.cycle, list(range(n)))
+            self.assertEqual(path_graph(n, engine=engine).topological_sort(), list(range(n)))
+
+    def test_edits(self):
+        for directed in (True, False):
+            rng = random.Random(directed)
+            g = random_graph(30, 35, directed=directed, seed=7)
+            for step in range(400):
+                edit = rng.random()
+                if edit < 0.05:
+                    g.add_vertex(len(g.graph))
+                elif edit < 0.55 or not any(g.graph.values()):
+                    g.add_edge(rng.choice(g.vertices), rng.choice(g.vertices))
+                else:
+                    u = rng.choice([u for u in g.vertices if g.graph[u]])
+                    g.remove_edge(u, rng.choice(g.graph[u]))
+                # the same graph, without the cached results
+                fresh = Graph(g.vertices, (), directed=directed)
+                fresh.graph = {v: list(neighbors) for v, neighbors in g.graph.items()}
+                fresh.weights = {v: list(weights) for v, weights in g.weights.items()}
+                self.assertEqual(list(g.DFS().items()), list(fresh.DFS().items()))
+                for sources in ((0,), (1, 2)):
+                    self.assertEqual(list(g.bfs(*sources).items()), list(fresh.bfs(*sources).items()))
+                components = g.strongly_connected_components()
+                self.assertEqual({frozenset(c) for c in components}, {frozenset(c) for c in fresh.strongly_connected_components()})
+                position = {v: i for i, component in enumerate(components) for v in component}
+                self.assertTrue(all(position[u] >= position[v] for u in g.vertices for v in g.graph[u]))
+                try:
+                    fresh.topological_sort()
+                except CycleError:
+                    with self.assertRaises(CycleError):
+                        g.topological_sort()
+                else:
+                    order = g.topological_sort()
+                    position = {v: i for i, v in enumerate(order)}
+                    self.assertEqual(sorted(order), sorted(g.vertices))
+                    self.assertTrue(all(position[u] < position[v] for u in g.vertices for v in g.graph[u]))
+                # the edges make the same graph again
+                copy = Graph(g.vertices, g.edges, directed=directed)
+                self.assertEqual({v: sorted(n) for v, n in copy.graph.items()}, {v: sorted(n) for v, n in g.graph.items()})
+                self.assertEqual(list(CSRGraph.from_graph(g).DFS().items()), list(fresh.DFS().items()))
+
+    def test_cache_repair(self):
+        g = Graph('abc', (), directed=True)
+        self.assertEqual(g.topological_sort(), ['c', 'b', 'a'])
+        g.add_edge('a', 'c')
+        self.assertIn('topological', g._cache)
+        self.assertEqual(g.topological_sort(), ['a', 'b', 'c'])
+        g.add_edge('c', 'a')
+        self.assertNotIn('topological', g._cache)
+        with self.assertRaises(CycleError):
+            g.topological_sort()
+        g.remove_edge('c', 'a')
+        g.add_vertex('d')
+        g.add_vertex('d')
+        self.assertEqual(g.DFS(), {'c': (2, 3, 'a'), 'a': (1, 4, None), 'b': (5, 6, None), 'd': (7, 8, None)})
+        self.assertEqual(g.strongly_connected_components(), [['c'], ['a'], ['b'], ['d']])
+        self.assertEqual(g.bfs('a'), {'a': (0, None), 'c': (1, 'a')})
+        self.assertEqual(g.topological_sort(), ['d', 'b', 'a', 'c'])
+        # edges that cannot change the results
+        g.add_edge('b', 'c')
+        g.add_edge('d', 'b')
+        self.assertEqual(set(g._cache), {'DFS', 'scc', 'topological'})
+        self.assertIn(('a',), g._bfs_cache)
+        self.assertEqual(g.topological_sort(), ['d', 'b', 'a', 'c'])
+        # the order is repaired: b moves after a
+        g.add_edge('a', 'b', 2.5)
+        self.assertEqual(g.topological_sort(), ['d', 'a', 'b', 'c'])
+        self.assertNotIn(('a',), g._bfs_cache)
+        self.assertEqual(g.edges, [('a', 'c', 1), ('a', 'b', 2.5), ('b', 'c', 1), ('d', 'b', 1)])
+        with self.assertRaises(KeyError):
+            g.add_edge('a', 'z')
+        with self.assertRaises(KeyError):
+            g.remove_edge('c', 'a')
+
+    def test_connected_components(self):
+        self.assertEqual(self.g.connected_components(), [['a', 'b', 'c', 'd']])
+        g = Graph('abcde', [('b', 'a'), ('c', 'e')], directed=True)
+        for h in (g, CSRGraph.from_graph(g)):
+            self.assertEqual(h.connected_components(), [['a', 'b'], ['c', 'e'], ['d']])
+        for directed in (True, False):
+            for seed in range(3):
+                g = random_graph(300, 280, directed=directed, seed=seed)
+                undirected = Graph(g.vertices, g.edges)
+                expected = []
+                for v in g.vertices:
+                    if not any(v in component for component in expected):
+                        expected.append(sorted(undirected.bfs(v)))
+                csr = CSRGraph.from_graph(g)
+                self.assertEqual(g.connected_components(), expected)
+                self.assertEqual(csr.connected_components(), expected)
+                self.assertEqual(csr.parallel_connected_components(processes=2, chunks=7), expected)
+
+    def test_parallel_bfs(self):
+        for directed in (True, False):
+            g = random_graph(500, 1500, directed=directed, seed=4, engine=CSRGraph)
+            expected = g.bfs(0, 1)
+            result = g.parallel_bfs(0, 1, processes=2, chunks=3, threshold=2)
+            self.assertEqual({v: d for v, (d, _) in result.items()}, {v: d for v, (d, _) in expected.items()})
+            self.assertEqual(len(result), len(expected))
+            for vertex, (distance, parent) in result.items():
+                if parent is not None:
+                    self.assertEqual(result[parent][0], distance - 1)
+                    self.assertIn(vertex, g.neighbors(parent))
+            # the main process alone gives the same result as bfs
+            self.assertEqual(list(g.parallel_bfs(0, 1, processes=1, threshold=500).items()), list(expected.items()))
+
+    def test_edge_list(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'graph.txt')
+            with open(filename, 'w') as edge_list:
+                edge_list.write("# a comment\n\n10 20\n20 30\n% another one\n30 10\n  40   50\n10 20")
+            expected = CSRGraph([10, 20, 30, 40, 50], [(10, 20), (20, 30), (30, 10), (40, 50), (10, 20)], directed=True)
+            for chunk_size in (3, 1 << 24):
+                g = CSRGraph.from_edge_list(filename, directed=True, cache=False, chunk_size=chunk_size)
+                self.assertEqual((list(g.labels), list(g.offsets), list(g.targets)), (expected.labels, list(expected.offsets), list(expected.targets)))
+            self.assertFalse(os.path.exists(filename + '.csr'))
+            # the first load writes the cache, the second maps it
+            g = CSRGraph.from_edge_list(filename)
+            self.assertTrue(os.path.exists(filename + '.csr'))
+            mapped = CSRGraph.from_edge_list(filename)
+            self.assertIsInstance(mapped.targets, memoryview)
+            self.assertEqual((list(mapped.labels), list(mapped.offsets), list(mapped.targets)), (g.labels, list(g.offsets), list(g.targets)))
+            self.assertEqual(mapped.num_edges, 5)
+            self.assertEqual(list(mapped.bfs(10).items()), list(g.bfs(10).items()))
+            self.assertEqual(mapped.DFS(), g.DFS())
+            self.assertEqual(mapped.parallel_connected_components(processes=2), [[10, 20, 30], [40, 50]])
+            # a new file: the cache is rebuilt
+            with open(filename, 'a') as edge_list:
+                edge_list.write("\n50 60\n")
+            self.assertEqual(list(CSRGraph.from_edge_list(filename).labels), [10, 20, 30, 40, 50, 60])
+            # weights, and labels that are not ints
+            with open(filename, 'w') as edge_list:
+                edge_list.write("a b 2.5\nb c 1\n")
+            for _ in range(2):
+                g = CSRGraph.from_edge_list(filename, directed=True, label=str)
+                self.assertEqual(list(g.labels), ['a', 'b', 'c'])
+                self.assertEqual(list(g.weights), [2.5, 1])
+                self.assertEqual(g.shortest_path('a', 'c'), (3.5, ['a', 'b', 'c']))
+            # the cache is only reused for the same type of labels, and never for other label functions
+            with open(filename, 'w') as edge_list:
+                edge_list.write("1 2\n3 4\n")
+            self.assertEqual(list(CSRGraph.from_edge_list(filename).labels), [1, 2, 3, 4])
+            self.assertEqual(list(CSRGraph.from_edge_list(filename, label=str).labels), ['1', '2', '3', '4'])
+            g = CSRGraph.from_edge_list(filename, label=float)
+            self.assertEqual([type(label) for label in g.labels], [float] * 4)
+            self.assertEqual(g.bfs(3.0), {3.0: (0, None), 4.0: (1, 3.0)})
+            self.assertEqual(list(CSRGraph.from_edge_list(filename, label=str).labels), ['1', '2', '3', '4'])
+            self.assertEqual(list(CSRGraph.from_edge_list(filename).labels), [1, 2, 3, 4])
+            # only int and str labels can be saved, and an empty label comes back
+            with self.assertRaises(ValueError):
+                g.save(filename + '.csr')
+            with self.assertRaises(ValueError):
+                CSRGraph(['a\nb'], []).save(filename + '.csr')
+            for labels in ([''], [], ['', 'a']):
+                CSRGraph(labels, []).save(filename + '.csr')
+                self.assertEqual(list(CSRGraph.load(filename + '.csr').labels), labels)
+            for text in ("1 2\n3\n", "1 2\n3 4 5\n6\n", "1\n2 3 4\n", "1 2\n\n3 4 5\n"):
+                with open(filename, 'w') as edge_list:
+                    edge_list.write(text)
+                for chunk_size in (3, 1 << 24):
+                    with self.assertRaises(ValueError):
+                        CSRGraph.from_edge_list(filename, cache=False, chunk_size=chunk_size)
+            with self.assertRaises(ValueError):
+                CSRGraph.load(filename)
+
+    def test_minimum_spanning_tree(self):
+        edges = [('a', 'b', 4), ('a', 'h', 8), ('b', 'c', 8), ('b', 'h', 11), ('c', 'd', 7), ('c', 'f', 4), ('c', 'i', 2),
+                 ('d', 'e', 9), ('d', 'f', 14), ('e', 'f', 10), ('f', 'g', 2), ('g', 'h', 1), ('g', 'i', 6), ('h', 'i', 7)]
+        for engine in (Graph, CSRGraph):
+            g = engine('abcdefghijk', edges + [('j', 'k', 3), ('j', 'j', 0)])
+            for algorithm in ('kruskal', 'prim', 'auto'):
+                tree = g.minimum_spanning_tree(algorithm)
+                self.assertEqual(sum(w for _, _, w in tree), 40)
+                self.assertEqual(len(tree), 9)
+            self.assertEqual(g.minimum_spanning_tree('kruskal')[:3], [('g', 'h', 1), ('c', 'i', 2), ('f', 'g', 2)])
+            self.assertEqual(g.minimum_spanning_tree('prim')[:3], [('a', 'b', 4), ('a', 'h', 8), ('h', 'g', 1)])
+            with self.assertRaises(ValueError):
+                engine('ab', [('a', 'b')], directed=True).minimum_spanning_tree()
+            with self.assertRaises(ValueError):
+                g.minimum_spanning_tree('boruvka')
+        # brute force: no edge out of the tree is lighter than the heaviest edge of the tree path between its ends
+        for seed in range(5):
+            g = random_graph(40, 120, directed=False, seed=seed, weights=(1, 30))
+            expected = None
+            for h in (g, CSRGraph.from_graph(g)):
+                for algorithm in ('kruskal', 'prim'):
+                    tree = h.minimum_spanning_tree(algorithm)
+                    total = sum(w for _, _, w in tree)
+                    expected = total if expected is None else expected
+                    self.assertEqual(total, expected)
+                    forest = Graph(g.vertices, tree)
+                    self.assertEqual(len(forest.connected_components()), len(g.connected_components()))
+            for u in g.vertices:
+                for v, w in zip(g.graph[u], g.weights[u]):
+                    if u != v:
+                        path = forest.shortest_path(u, v)[1]
+                        heaviest = max(min(x for y, x in zip(forest.graph[a], forest.weights[a]) if y == b) for a, b in zip(path, path[1:]))
+                        self.assertLessEqual(heaviest, w)
+
+    def test_union_find(self):
+        sets = UnionFind(6)
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(2, 3))
+        self.assertTrue(sets.union(1, 3))
+        self.assertFalse(sets.union(0, 2))
+        self.assertEqual(sets.count, 3)
+        self.assertEqual(len({sets.find(x) for x in range(4)}), 1)
+        self.assertNotEqual(sets.find(4), sets.find(5))
+        # union by rank: a long chain of unions stays flat
+        sets = UnionFind(1 << 12)
+        for x in range(1, 1 << 12):
+            sets.union(x - 1, x)
+        self.assertLessEqual(max(sets.rank), 12)
+
+    def test_reachability_index(self):
+        index = ReachabilityIndex(self.g)
+        self.assertTrue(index.reaches('b', 'a'))
+        self.assertTrue(index.reaches('a', 'a'))
+        self.assertFalse(index.reaches('a', 'b'))
+        with self.assertRaises(KeyError):
+            index.reaches('a', 'z')
+        for directed in (True, False):
+            for seed in range(4):
+                g = random_graph(70, 100, directed=directed, seed=seed)
+                for h in (g, CSRGraph.from_graph(g)):
+                    index = ReachabilityIndex(h)
+                    for u in g.vertices:
+                        reached = g.bfs(u)
+                        self.assertEqual([v for v in g.vertices if index.reaches(u, v)], [v for v in g.vertices if v in reached])
+                    self.assertLessEqual(index.memory(), len(index.rows) ** 2 // 8 + len(index.rows))
+
+
+if __name__ == '__main__':
+    # Example usage
+    g = Graph(['a', 'b', 'c', 'd'], [('a', 'c'), ('d', 'a'), ('b', 'c'), ('b', 'd')], directed=True)
+    print(g.dfs())  # Should print the entry and exit times for each vertex
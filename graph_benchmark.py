@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks for the graph algorithms in `graph`.
+
+Run the module as a script to print the results::
+
+    python3 graph_benchmark.py
+
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from graph import Graph, CSRGraph, ReachabilityIndex, path_graph, random_graph
+
+ENGINES = (Graph, CSRGraph)
+
+
+def best_time(function, repeat=3):
+    """
+    :return: the best time of `repeat` calls to `function`, in seconds, or None if it raises RecursionError
+    :rtype: float
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            function()
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_edges(n, m, seed=0):
+    """
+    Generate m random edges between the vertices 0 to n-1, without building a list.
+    """
+    rng = random.Random(seed)
+    for _ in range(m):
+        yield rng.randrange(n), rng.randrange(n)
+
+
+def random_dag_edges(n, m, seed=0):
+    """
+    Generate m random edges between the vertices 0 to n-1, each one from a smaller to a larger vertex, so that they make a DAG.
+    """
+    rng = random.Random(seed)
+    for _ in range(m):
+        u, v = rng.randrange(n - 1), rng.randrange(n - 1)
+        yield (u, v + 1) if u <= v else (v, u)
+
+
+def road_grid(rows, columns, seed=0):
+    """
+    Generate the edges of a road-like network: a rows x columns grid, each crossing linked to its right and lower neighbors by a road of random length between 1 and 100.
+    """
+    rng = random.Random(seed)
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns:
+                yield vertex, vertex + 1, rng.randint(1, 100)
+            if row + 1 < rows:
+                yield vertex, vertex + columns, rng.randint(1, 100)
+
+
+def construction_cost(engine, n, m, directed=True):
+    """
+    Build a random graph from a stream of edges.
+
+    :return: the graph, the construction time, and the memory it holds once built (the edge list of `Graph` included, since it keeps it)
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    edges = random_edges(n, m) if engine is CSRGraph else list(random_edges(n, m))
+    g = engine(range(n), edges, directed=directed)
+    elapsed = time.perf_counter() - start
+    del g, edges
+    tracemalloc.start()
+    edges = random_edges(n, m) if engine is CSRGraph else list(random_edges(n, m))
+    g = engine(range(n), edges, directed=directed)
+    del edges
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return g, elapsed, memory
+
+
+def format_time(seconds):
+    return "RecursionError" if seconds is None else "{:8.3f} s".format(seconds)
+
+
+def main():
+    print("DFS, recursive vs explicit stack (recursion limit {}):".format(sys.getrecursionlimit()))
+    graphs = [
+        ("path, 500 vertices", path_graph(500)),
+        ("path, 100000 vertices", path_graph(100000)),
+        ("path, 1000000 vertices", path_graph(1000000)),
+        ("random, 500 vertices, 2000 edges", random_graph(500, 2000)),
+        ("random, 100000 vertices, 500000 edges", random_graph(100000, 500000)),
+        ("random undirected, 100000 vertices, 500000 edges", random_graph(100000, 500000, directed=False)),
+    ]
+    for name, g in graphs:
+        repeat = 1 if len(g.graph) > 100000 else 3
+        recursive = best_time(g.dfs_recursive, repeat)
+        iterative = best_time(g.DFS, repeat)
+        print("  {:50} recursive {:>14}, iterative {}, {:8.0f} vertices/s".format(
+            name, format_time(recursive), format_time(iterative), len(g.graph) / iterative))
+
+    n, m = 200000, 2000000
+    print("Representation, random graph with {} vertices and {} edges:".format(n, m))
+    for directed in (True, False):
+        for engine in ENGINES:
+            g, elapsed, memory = construction_cost(engine, n, m, directed)
+            dfs = best_time(g.DFS, 1)
+            print("  {:8} {:10} construction {:7.2f} s, {:7.1f} MB ({:5.1f} bytes/edge), DFS {}".format(
+                engine.__name__, "directed" if directed else "undirected", elapsed, memory / 2**20, memory / m, format_time(dfs)))
+            del g
+
+    print("BFS from vertex 0, random graphs with {} vertices and {} edges, and a path of {} vertices:".format(n, m, n))
+    for name, directed in (("random, directed", True), ("random, undirected", False), ("path", True)):
+        if name == "path":
+            g = path_graph(n)
+        else:
+            g = Graph(range(n), list(random_edges(n, m)), directed=directed)
+        csr = CSRGraph.from_graph(g)
+        csr.reverse_arrays()
+        timings = [
+            ("Graph", best_time(lambda: g.bfs(0), 1)),
+            ("CSRGraph top-down", best_time(lambda: csr.bfs(0), 1)),
+            ("CSRGraph direction-optimizing", best_time(lambda: csr.bfs(0, direction_optimizing=True), 1)),
+        ]
+        levels = max(distance for distance, _ in csr.bfs(0).values())
+        print("  {:20} {} levels: ".format(name, levels) + ", ".join("{} {}".format(label, format_time(t)) for label, t in timings))
+        del g, csr
+
+    n, m = 300000, 1200000
+    print("Strongly connected components, topological sort and condensation, random graph with {} vertices and {} edges:".format(n, m))
+    for name, edges in (("DAG", list(random_dag_edges(n, m))), ("with cycles", list(random_edges(n, m)))):
+        for engine in ENGINES:
+            g = engine(range(n), edges, directed=True)
+            sort = "topological sort {}".format(format_time(best_time(g.topological_sort, 1))) if name == "DAG" else ""
+            print("  {:12} {:8} SCC {}, condensation {}".format(name, engine.__name__,
+                format_time(best_time(g.strongly_connected_components, 1)), format_time(best_time(g.condensation, 1))) + (", " + sort if sort else ""))
+            del g
+        del edges
+
+    n, m = 1000000, 5000000
+    print("Loading an edge list file of {} vertices and {} edges:".format(n, m))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'edges.txt')
+        with open(filename, 'w') as edge_list:
+            edge_list.writelines("{} {}\n".format(u, v) for u, v in random_edges(n, m))
+        start = time.perf_counter()
+        with open(filename) as edge_list:
+            g = Graph(range(n), [tuple(map(int, line.split())) for line in edge_list])
+        print("  Graph from a list of tuples  {}".format(format_time(time.perf_counter() - start)))
+        del g
+        start = time.perf_counter()
+        g = CSRGraph.from_edge_list(filename)
+        print("  CSRGraph, parsed by chunks   {} (text {:.0f} MB, binary cache {:.0f} MB)".format(
+            format_time(time.perf_counter() - start), os.path.getsize(filename) / 2**20, os.path.getsize(filename + '.csr') / 2**20))
+        bfs = best_time(lambda: g.bfs(g.labels[0]), 1)
+        del g
+        start = time.perf_counter()
+        g = CSRGraph.from_edge_list(filename)
+        print("  CSRGraph, mapped from cache  {}".format(format_time(time.perf_counter() - start)))
+        print("  BFS on the parsed graph {}, on the mapped one {}".format(format_time(bfs), format_time(best_time(lambda: g.bfs(g.labels[0]), 1))))
+        del g
+
+    n, m = 200000, 1000000
+    print("Parallel connected components and BFS, random undirected graph with {} vertices and {} edges, {} CPUs:".format(n, m, os.cpu_count()))
+    g = CSRGraph(range(n), random_edges(n, m))
+    serial_components = best_time(g.connected_components, 1)
+    serial_bfs = best_time(lambda: g.bfs(0), 1)
+    print("  {:12} components {}, BFS {}".format("serial", format_time(serial_components), format_time(serial_bfs)))
+    for processes in sorted({1, 2, 4, os.cpu_count()}):
+        components = best_time(lambda: g.parallel_connected_components(processes), 1)
+        bfs = best_time(lambda: g.parallel_bfs(0, processes=processes), 1)
+        print("  {:2} processes components {} (speedup {:4.2f}), BFS {} (speedup {:4.2f})".format(
+            processes, format_time(components), serial_components / components, format_time(bfs), serial_bfs / bfs))
+    del g
+
+    n = 100000
+    print("Reachability index, graphs with {} vertices:".format(n))
+    rng = random.Random(0)
+    queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(100000)]
+    for name, edges in (("random DAG, 200000 edges", random_dag_edges(n, 200000)),
+                        ("random graph with cycles, 150000 edges", random_edges(n, 150000))):
+        g = CSRGraph(range(n), edges, directed=True)
+        start = time.perf_counter()
+        index = ReachabilityIndex(g)
+        elapsed = time.perf_counter() - start
+        memory = sys.getsizeof(index.component_of) + sys.getsizeof(index.rows) + sum(map(sys.getsizeof, index.rows))
+        start = time.perf_counter()
+        for u, v in queries:
+            index.reaches(u, v)
+        query = (time.perf_counter() - start) / len(queries)
+        bfs = best_time(lambda: [v in g.bfs(u) for u, v in queries[:5]], 1) / 5
+        print("  {:40} {} components, built in {}, {:.0f} MB of bitsets ({:.0f} MB in all), {:.2f} µs per query, against {:.2f} ms per BFS".format(
+            name, len(index.rows), format_time(elapsed), index.memory() / 2**20, memory / 2**20, query * 1e6, bfs * 1e3))
+        del g, index
+
+    m = 500000
+    print("Minimum spanning trees, random undirected graphs with {} edges of random weights:".format(m))
+    for density in (2, 5, 10, 20, 50, 200):
+        n = m // density
+        rng = random.Random(density)
+        edges = [(u, v, rng.random()) for u, v in random_edges(n, m)]
+        for engine in ENGINES:
+            g = engine(range(n), edges)
+            kruskal = best_time(lambda: g.minimum_spanning_tree('kruskal'), 1)
+            prim = best_time(lambda: g.minimum_spanning_tree('prim'), 1)
+            auto = 'prim' if density >= engine.prim_density else 'kruskal'
+            best = 'prim' if prim < kruskal else 'kruskal'
+            print("  {:3} edges/vertex {:8} Kruskal {}, Prim {}: {} is faster, 'auto' picks {}".format(
+                density, engine.__name__, format_time(kruskal), format_time(prim), best, auto))
+            del g
+        del edges
+
+    n, m, edits = 100000, 400000, 200
+    print("Edits between queries, random DAG with {} vertices and {} edges, {} edge additions each followed by a topological sort and a BFS:".format(n, m, edits))
+    g = Graph(range(n), random_dag_edges(n, m), directed=True)
+    added = list(random_dag_edges(n, edits, seed=1))
+    start = time.perf_counter()
+    rebuilds = 3
+    for u, v in added[:rebuilds]:
+        h = Graph(range(n), g.edges + [(u, v)], directed=True)
+        h.topological_sort()
+        h.bfs(0)
+    rebuild = (time.perf_counter() - start) / rebuilds
+    g.topological_sort()
+    g.bfs(0)
+    start = time.perf_counter()
+    for u, v in added:
+        g.add_edge(u, v)
+        g.topological_sort()
+        g.bfs(0)
+    cached = (time.perf_counter() - start) / edits
+    print("  rebuild from scratch {} per edit, cached results {} per edit ({:.0f} times faster)".format(format_time(rebuild), format_time(cached), rebuild / cached))
+    del g, h
+
+    rows = columns = 500
+    n = rows * columns
+    print("Shortest paths, road-like grid of {} x {} crossings ({} vertices, {} roads):".format(rows, columns, n, 2 * n - rows - columns))
+    g = Graph(range(n), list(road_grid(rows, columns)))
+    csr = CSRGraph.from_graph(g)
+    for h in (g, csr):
+        for heap in ('binary', 'project'):
+            print("  {:8} Dijkstra from one source, {:7} heap {}".format(type(h).__name__, heap, format_time(best_time(lambda: h.dijkstra(0, heap=heap), 1))))
+    rng = random.Random(1)
+    pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(20)]
+    for h in (g, csr):
+        for bidirectional in (False, True):
+            elapsed = best_time(lambda: [h.shortest_path(source, target, bidirectional) for source, target in pairs], 1)
+            print("  {:8} {:13} point-to-point query {}".format(type(h).__name__, "bidirectional" if bidirectional else "one-way", format_time(elapsed / len(pairs))))
+    del g, csr
+    rows = columns = 100
+    n = rows * columns
+    g = CSRGraph(range(n), road_grid(rows, columns))
+    print("  Bellman-Ford vs Dijkstra, {} x {} grid: {} vs {}".format(
+        rows, columns, format_time(best_time(lambda: g.bellman_ford(0), 1)), format_time(best_time(lambda: g.dijkstra(0), 1))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+
+"""
+Benchmarks for the hash tables in `hash_table_chaining`.
+
+Run the module as a script to print the results::
+
+    python3 hash_table_benchmark.py
+
+"""
+
+import gc
+import random
+import time
+import tracemalloc
+
+from hash_table_chaining import HashTable, OpenAddressingHashTable
+
+TABLES = (
+    ("fixed, 10 buckets", dict(max_load=None)),
+    ("resizing", dict()),
+    ("incremental", dict(incremental=True)),
+)
+
+
+def random_keys(n, seed=0):
+    """
+    :return: n distinct string keys, in a random order
+    :rtype: list
+    """
+    keys = ["key{}".format(i) for i in range(n)]
+    random.Random(seed).shuffle(keys)
+    return keys
+
+
+def operations_per_second(operation, keys):
+    """
+    Apply an operation to each key, timing each call. The garbage collector is disabled meanwhile, as in `timeit`: its full collections over millions of nodes would otherwise hide the cost of the operations.
+
+    :return: the number of calls per second, and the slowest call, in seconds
+    :rtype: tuple
+    """
+    clock = time.perf_counter
+    slowest = 0
+    gc.disable()
+    try:
+        start = clock()
+        for key in keys:
+            before = clock()
+            operation(key)
+            slowest = max(slowest, clock() - before)
+        elapsed = clock() - start
+    finally:
+        gc.enable()
+    return len(keys) / elapsed, slowest
+
+
+def distributions(n):
+    """
+    :return: named lists of n keys: random strings, consecutive integers, and integers with a stride of 1024
+    :rtype: list
+    """
+    return [
+        ("strings", random_keys(n)),
+        ("consecutive integers", list(range(n))),
+        ("integers, stride 1024", list(range(0, n << 10, 1 << 10))),
+    ]
+
+
+def long_keys(n):
+    """
+    :return: n distinct keys of 100 characters, which only differ by their last 8 characters
+    :rtype: list
+    """
+    return ["/srv/cache/" + "x" * 80 + "/{:08d}".format(i) for i in range(n)]
+
+
+def zipf_queries(keys, count, exponent, seed=0):
+    """
+    Draw keys with a Zipf distribution: the key of rank r comes with a probability proportional to 1 / r^exponent, the ranks being shuffled over the keys. An exponent of 0 gives a uniform distribution. The queries are copies of the keys, so that they are not found by identity.
+
+    :return: a list of `count` keys
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    ranked = list(keys)
+    rng.shuffle(ranked)
+    total, cumulative = 0, []
+    for rank in range(1, len(ranked) + 1):
+        total += rank ** -exponent
+        cumulative.append(total)
+    return [(key + '.')[:-1] for key in rng.choices(ranked, cum_weights=cumulative, k=count)]
+
+
+def table_memory(engine, keys):
+    """
+    :return: the memory held by a table of the given keys, keys excluded, in bytes
+    :rtype: int
+    """
+    tracemalloc.start()
+    ht = engine()
+    for key in keys:
+        ht.insert(key)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+
+def best_rate(operation, keys, repeat=3):
+    """
+    Apply an operation to each key, `repeat` times, with the garbage collector disabled.
+
+    :return: the best number of calls per second
+    :rtype: float
+    """
+    best = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for key in keys:
+                operation(key)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return len(keys) / best
+
+
+def run_time(function):
+    """
+    :return: the time of one call to `function`, with the garbage collector disabled, in seconds
+    :rtype: float
+    """
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def format_rate(rate):
+    return "{:8.0f} ops/s".format(rate)
+
+
+def main():
+    print("Operations per second by number of keys (slowest single call in parentheses):")
+    for n in (1000, 10000, 100000, 1000000):
+        keys = random_keys(n)
+        for name, options in TABLES:
+            if options.get('max_load', 1.0) is None and n > 10000:
+                print("  {:>8} keys, {:18} skipped, {} keys per bucket".format(n, name, n // 10))
+                continue
+            ht = HashTable(**options)
+            insert, insert_slowest = operations_per_second(ht.insert, keys)
+            size = ht.size
+            search, search_slowest = operations_per_second(ht.search, keys)
+            delete, delete_slowest = operations_per_second(ht.delete, keys)
+            print("  {:>8} keys, {:18} {:8} buckets, insert {} ({:6.1f} ms), search {} ({:6.1f} ms), delete {} ({:6.1f} ms)".format(
+                n, name, size, format_rate(insert), insert_slowest * 1e3, format_rate(search), search_slowest * 1e3,
+                format_rate(delete), delete_slowest * 1e3))
+
+    print("Chaining vs open addressing:")
+    for n in (100000, 1000000):
+        for name, keys in distributions(n):
+            for engine in (HashTable, OpenAddressingHashTable):
+                if engine is HashTable and "stride" in name and n > 100000:
+                    print("  {:>8} {:22} {:24} skipped, about 800 keys per used bucket".format(n, name, engine.__name__))
+                    continue
+                ht = engine()
+                insert, _ = operations_per_second(ht.insert, keys)
+                search, _ = operations_per_second(ht.search, keys)
+                get, _ = operations_per_second(ht.get, keys)
+                delete, _ = operations_per_second(ht.delete, keys)
+                memory = "{:6.1f} bytes/key".format(table_memory(engine, keys) / n) if n <= 100000 else ""
+                print("  {:>8} {:22} {:24} insert {}, search {}, get {}, delete {} {}".format(
+                    n, name, engine.__name__, format_rate(insert), format_rate(search), format_rate(get), format_rate(delete), memory))
+
+    n, count = 100000, 300000
+    keys = long_keys(n)
+    print("Lookups of {} keys among {} keys of 100 characters, by Zipf exponent:".format(count, n))
+    tables = [
+        ("chaining, load 1", lambda **options: HashTable(**options)),
+        ("chaining, 8 keys per bucket", lambda **options: HashTable(size=n // 8, max_load=None, **options)),
+    ]
+    for exponent in (0, 0.8, 1.0, 1.2):
+        queries = zipf_queries(keys, count, exponent)
+        for name, table in tables:
+            for move_to_front in (False, True):
+                ht = table(move_to_front=move_to_front)
+                for key in keys:
+                    ht.insert(key)
+                get = best_rate(ht.get, queries)
+                print("  exponent {:3} {:28} {:13} {}".format(exponent, name, "move-to-front" if move_to_front else "", format_rate(get)))
+        ht = OpenAddressingHashTable()
+        for key in keys:
+            ht.insert(key)
+        get = best_rate(ht.get, queries)
+        print("  exponent {:3} {:42} {}".format(exponent, "open addressing", format_rate(get)))
+
+
+    n = 1000000
+    print("One call per key vs bulk calls, {} string keys:".format(n))
+    for engine in (HashTable, OpenAddressingHashTable):
+        rates = []
+        # Fresh strings for each run, since a string keeps its hash once computed
+        for bulk in (False, True):
+            ht = engine()
+            for operation in ('insert', 'search', 'delete'):
+                keys = random_keys(n, seed=len(rates))
+                if bulk:
+                    method = getattr(ht, operation + '_many')
+                    rates.append(n / run_time(lambda: method(keys)))
+                else:
+                    method = getattr(ht, operation)
+                    rates.append(n / run_time(lambda: [method(key) for key in keys]))
+        ht = engine()
+        rates.append(n / run_time(lambda: ht.insert_many("key{}".format(i) for i in range(n))))
+        print("  {:24} insert {} / {} bulk ({} streamed), search {} / {} bulk, delete {} / {} bulk".format(
+            engine.__name__, format_rate(rates[0]), format_rate(rates[3]), format_rate(rates[6]).strip(),
+            format_rate(rates[1]), format_rate(rates[4]), format_rate(rates[2]), format_rate(rates[5])))
+
+
+if __name__ == '__main__':
+    main()
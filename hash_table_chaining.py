@@ -1,5 +1,14 @@
 #!/usr/bin/python3
 
+import random
+import unittest
+from array import array
+from itertools import islice, repeat
+
+_MISSING = object()
+_EMPTY = object()
+
+
 class Node():
     """
     An element in the linked list.
@@ -7,9 +16,11 @@ class Node():
     :ivar key: the value stored on the node
     :ivar prev_ptr: pointer to the node to the left
     :ivar next_ptr: pointer to the node to the right
+    :ivar value: the value mapped to the key, in a hash table
+    :ivar hash_value: the full hash of the key, in a hash table
     """
     
-    def __init__(self, key=None, prev_ptr=None, next_ptr=None):
+    def __init__(self, key=None, prev_ptr=None, next_ptr=None, value=None, hash_value=None):
         """
         Create a new Node object.
 
@@ -19,13 +30,20 @@ class Node():
         :type prev_ptr: Node
         :param next_ptr: a pointer to the right node, or None.
         :type next_ptr: Node
+        :param value: the value mapped to the key, or None.
+        :param hash_value: the full hash of the key, or None.
+        :type hash_value: int
         """
         self.key = key
         self.prev_ptr = prev_ptr
         self.next_ptr = next_ptr
+        self.value = value
+        self.hash_value = hash_value
 
     def __str__(self):
-        return str(self.key)
+        if self.value is None:
+            return str(self.key)
+        return '{}: {}'.format(self.key, self.value)
 
 class LinkedList():
     """
@@ -56,19 +74,41 @@ class LinkedList():
         self.head = node    
         self.length += 1
 
-    def search(self, k):
+    def search(self, k, h=None):
         """ Search the list for a key.
 
         :param k: a key value 
         :type k: str
+        :param h: the hash of the key, to compare with the hash of each node before comparing the keys
+        :type h: int
         :return: the first node containing the key
         :rtype: Node
         """
         node = self.head
-        while node is not None and node.key != k:
-            node = node.next_ptr
+        if h is None:
+            while node is not None and node.key != k:
+                node = node.next_ptr
+        else:
+            while node is not None and (node.hash_value != h or node.key is not k and node.key != k):
+                node = node.next_ptr
         return node
 
+    def move_to_front(self, node):
+        """ Move a node of the list to its head.
+
+        :param node: a node reference
+        :type node: Node
+        """
+        if node is self.head:
+            return
+        node.prev_ptr.next_ptr = node.next_ptr
+        if node.next_ptr is not None:
+            node.next_ptr.prev_ptr = node.prev_ptr
+        node.prev_ptr = None
+        node.next_ptr = self.head
+        self.head.prev_ptr = node
+        self.head = node
+
     def delete(self, node):
         """ Delete a node from the list.
 
@@ -103,17 +143,63 @@ class LinkedList():
 class HashTable:
     """
     A hash table implementation using chaining (linked lists).
+
+    The table maps each key to a value, stored on its node, like a `dict`: a key appears at most once, and inserting it again updates its value. Keys inserted without a value map to None, so that the table also works as a set. Each node also keeps the full hash of its key: a search only compares the keys of the nodes with the same hash, and a resize does not hash the keys again. With `move_to_front`, a key that is found moves to the head of its bucket, so that the most requested keys are found first.
+
+    The table doubles its number of buckets when the load factor (keys per bucket) goes over `max_load`, and halves it, down to its initial size, when the load factor falls under `min_load`. A resize normally moves all the keys at once. In incremental mode, the old buckets are kept aside and a few of them are moved at each operation, so that no single operation pays for the whole table: at least `rehash_step`, and enough to finish before the load factor can trigger the next resize. A key is in its old bucket until that bucket is moved, and in the new table after.
+
+    :ivar size: the number of buckets
+    :ivar table: the buckets, as linked lists, or None for a bucket that was never used
+    :ivar count: the number of keys
     """
 
-    def __init__(self, size=10):
+    # The number of keys that the bulk methods hash at once (see `insert_many`)
+    batch_size = 1 << 16
+
+    def __init__(self, size=10, max_load=1.0, min_load=0.25, incremental=False, rehash_step=4, move_to_front=False):
         """
         Initialize the hash table with a given size.
         
-        :param size: the number of buckets in the hash table
+        :param size: the number of buckets in the hash table, which is also the smallest size it shrinks to
         :type size: int
+        :param max_load: the load factor over which the table grows, or None for a table that never resizes
+        :type max_load: float
+        :param min_load: the load factor under which the table shrinks, less than half of `max_load` so that a resize does not trigger the opposite one; 0 for a table that never shrinks
+        :type min_load: float
+        :param incremental: True to move the keys a few buckets at a time after a resize
+        :type incremental: bool
+        :param rehash_step: the smallest number of old buckets moved at each operation, in incremental mode
+        :type rehash_step: int
+        :param move_to_front: True to move each key that is found to the head of its bucket
+        :type move_to_front: bool
         """
+        if size < 1 or rehash_step < 1:
+            raise ValueError("the size and the rehash step must be positive")
+        if max_load is not None and not 0 <= 2 * min_load < max_load:
+            raise ValueError("min_load must be less than half of max_load")
         self.size = size
-        self.table = [LinkedList() for _ in range(size)]
+        self.table = [None] * size
+        self.count = 0
+        self.min_size = size
+        self.max_load = max_load
+        self.min_load = min_load
+        self.incremental = incremental
+        self.rehash_step = rehash_step
+        self.move_to_front = move_to_front
+        self._old = None
+        self._moved = 0
+        self._step = rehash_step
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def load_factor(self):
+        """
+        :return: the number of keys per bucket
+        :rtype: float
+        """
+        return self.count / self.size
 
     def hash_function(self, key):
         """
@@ -126,15 +212,127 @@ class HashTable:
         """
         return hash(key) % self.size
 
-    def insert(self, key):
+    def _bucket(self, h, create=False):
+        """
+        Find the list that holds a hash, after moving the next old buckets if a resize is in progress.
+
+        :param h: the hash of a key
+        :type h: int
+        :param create: True to create the list if the bucket was never used
+        :type create: bool
+        :return: the old bucket of the hash if it was not moved yet, its bucket in the table otherwise, or None
+        :rtype: LinkedList
+        """
+        table = self.table
+        index = None
+        if self._old is not None:
+            self._rehash(self._step)
+            if self._old is not None:
+                index = h % len(self._old)
+                if index >= self._moved:
+                    table = self._old
+                else:
+                    index = None
+        if index is None:
+            index = h % self.size
+        bucket = table[index]
+        if bucket is None and create:
+            bucket = table[index] = LinkedList()
+        return bucket
+
+    def _find(self, key, create=False):
         """
-        Insert a key into the hash table.
+        Find the node of a key, and move it to the front of its bucket in move-to-front mode.
+
+        :return: the bucket of the key (None if it was never used and `create` is False), the node of the key or None, and the hash of the key
+        :rtype: tuple
+        """
+        h = hash(key)
+        bucket = self._bucket(h, create)
+        if bucket is None:
+            return None, None, h
+        node = bucket.search(key, h)
+        if node is not None and self.move_to_front:
+            bucket.move_to_front(node)
+        return bucket, node, h
+
+    def _move(self, bucket):
+        """ Relink the nodes of a bucket into the table. """
+        if bucket is None:
+            return
+        table = self.table
+        node = bucket.head
+        while node is not None:
+            next_node = node.next_ptr
+            node.prev_ptr = None
+            index = node.hash_value % self.size
+            if table[index] is None:
+                table[index] = LinkedList()
+            table[index].insert(node)
+            node = next_node
+
+    def _rehash(self, buckets):
+        """ Move up to `buckets` old buckets into the table. """
+        end = min(self._moved + buckets, len(self._old))
+        for index in range(self._moved, end):
+            self._move(self._old[index])
+            self._old[index] = None
+        self._moved = end
+        if end == len(self._old):
+            self._old = None
+
+    def resize(self, size):
+        """
+        Rehash the keys into a given number of buckets. A resize that comes before the end of the previous one finishes it first.
+
+        :param size: the new number of buckets
+        :type size: int
+        :raises ValueError: if the size is not positive
+        """
+        if size < 1:
+            raise ValueError("the size must be positive")
+        if self._old is not None:
+            self._rehash(len(self._old))
+        old = self.table
+        self.size = size
+        self.table = [None] * size
+        if self.incremental:
+            self._old = old
+            self._moved = 0
+            slack = self.count
+            if self.max_load is not None:
+                slack = min(self.max_load * size - self.count, self.count - self.min_load * size)
+            self._step = max(self.rehash_step, -(-len(old) // max(int(slack), 1)))
+        else:
+            for bucket in old:
+                self._move(bucket)
+
+    def _check_load(self):
+        """ Grow or shrink the table if the load factor is out of bounds. """
+        if self.max_load is None:
+            return
+        if self.count > self.max_load * self.size:
+            self.resize(2 * self.size)
+        elif self.count < self.min_load * self.size and self.size > self.min_size:
+            self.resize(max(self.size // 2, self.min_size))
+
+    def insert(self, key, value=None):
+        """
+        Insert a key into the hash table, or update its value if it is already there.
         
         :param key: the key to be inserted
         :type key: str
+        :param value: the value mapped to the key
         """
-        index = self.hash_function(key)
-        self.table[index].insert(Node(key))
+        bucket, node, h = self._find(key, create=True)
+        if node is not None:
+            node.value = value
+            return
+        bucket.insert(Node(key, value=value, hash_value=h))
+        self.count += 1
+        self._check_load()
+
+    put = insert
 
     def search(self, key):
         """
@@ -145,8 +343,28 @@ class HashTable:
         :return: the node containing the key, or None if not found
         :rtype: Node
         """
-        index = self.hash_function(key)
-        return self.table[index].search(key)
+        return self._find(key)[1]
+
+    def get(self, key, default=None):
+        """
+        :return: the value mapped to a key, or `default` if the key is not in the table
+        """
+        node = self.search(key)
+        return node.value if node is not None else default
+
+    def setdefault(self, key, value=None):
+        """
+        Put a key in the table, only if it is absent.
+
+        :return: the value mapped to the key, either the one already there or `value`
+        """
+        bucket, node, h = self._find(key, create=True)
+        if node is not None:
+            return node.value
+        bucket.insert(Node(key, value=value, hash_value=h))
+        self.count += 1
+        self._check_load()
+        return value
 
     def delete(self, key):
         """
@@ -154,11 +372,170 @@ class HashTable:
         
         :param key: the key to be deleted
         :type key: str
+        :return: the deleted node, or None if the key was not in the table
+        :rtype: Node
+        """
+        bucket, node, _ = self._find(key)
+        if node is not None:
+            bucket.delete(node)
+            self.count -= 1
+            self._check_load()
+        return node
+
+    def pop(self, key, default=_MISSING):
         """
-        index = self.hash_function(key)
-        node = self.table[index].search(key)
+        Delete a key from the table.
+
+        :return: the value that was mapped to the key, or `default` if the key is not in the table
+        :raises KeyError: if the key is not in the table and there is no default
+        """
+        node = self.delete(key)
         if node is not None:
-            self.table[index].delete(node)
+            return node.value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def _presize(self, extra):
+        """ Grow the table at once to the size that `extra` more keys call for, and finish any resize in progress. """
+        if self.max_load is not None:
+            size = self.size
+            while self.count + extra > self.max_load * size:
+                size *= 2
+            if size != self.size:
+                self.resize(size)
+        if self._old is not None:
+            self._rehash(len(self._old))
+
+    def _shrink(self):
+        """ Shrink the table at once to the size its load factor calls for. """
+        if self.max_load is None:
+            return
+        size = self.size
+        while self.count < self.min_load * size and size > self.min_size:
+            size = max(size // 2, self.min_size)
+        if size != self.size:
+            self.resize(size)
+            if self._old is not None:
+                self._rehash(len(self._old))
+
+    def insert_many(self, keys, values=None):
+        """
+        Insert keys into the hash table, or update the values of those already there.
+
+        The keys are read by batches of `batch_size`, so that any iterable can be streamed. The hashes of a batch are computed first, then the table grows once, to the size the batch calls for (or the size of `keys`, if it has one), and the keys go straight to their buckets. A resize in progress is finished first.
+
+        :param keys: the keys to be inserted
+        :type keys: iterable
+        :param values: the values mapped to the keys, in the same order, or None to map the keys to None
+        :type values: iterable
+        :return: the number of keys that were not in the table
+        :rtype: int
+        :raises ValueError: if there are not as many values as keys, once the batches before the mismatch are inserted
+        """
+        if values is not None and hasattr(keys, '__len__') and hasattr(values, '__len__') and len(keys) != len(values):
+            raise ValueError("{} keys but {} values".format(len(keys), len(values)))
+        if hasattr(keys, '__len__'):
+            self._presize(len(keys))
+        added = 0
+        pairs = zip(keys, values, strict=True) if values is not None else zip(keys, repeat(None))
+        for batch in _batches(pairs, self.batch_size):
+            hashes = [hash(key) for key, _ in batch]
+            self._presize(len(batch))
+            table, size = self.table, self.size
+            count = self.count
+            for (key, value), h in zip(batch, hashes):
+                index = h % size
+                bucket = table[index]
+                if bucket is None:
+                    bucket = table[index] = LinkedList()
+                node = bucket.search(key, h)
+                if node is not None:
+                    node.value = value
+                else:
+                    bucket.insert(Node(key, value=value, hash_value=h))
+                    count += 1
+            added += count - self.count
+            self.count = count
+        return added
+
+    def search_many(self, keys):
+        """
+        Search for keys in the hash table, by batches of `batch_size` keys hashed at once. A resize in progress is finished first.
+
+        :param keys: the keys to be searched
+        :type keys: iterable
+        :return: the node containing each key, or None
+        :rtype: list
+        """
+        nodes = []
+        for batch in _batches(keys, self.batch_size):
+            hashes = list(map(hash, batch))
+            if self._old is not None:
+                self._rehash(len(self._old))
+            table, size, move_to_front = self.table, self.size, self.move_to_front
+            for key, h in zip(batch, hashes):
+                bucket = table[h % size]
+                node = bucket.search(key, h) if bucket is not None else None
+                if node is not None and move_to_front:
+                    bucket.move_to_front(node)
+                nodes.append(node)
+        return nodes
+
+    def delete_many(self, keys):
+        """
+        Delete keys from the hash table, by batches of `batch_size` keys hashed at once, then shrink the table once if it is too sparse. A resize in progress is finished first.
+
+        :param keys: the keys to be deleted
+        :type keys: iterable
+        :return: the deleted node of each key, or None if the key was not in the table
+        :rtype: list
+        """
+        nodes = []
+        for batch in _batches(keys, self.batch_size):
+            hashes = list(map(hash, batch))
+            if self._old is not None:
+                self._rehash(len(self._old))
+            table, size = self.table, self.size
+            for key, h in zip(batch, hashes):
+                bucket = table[h % size]
+                node = bucket.search(key, h) if bucket is not None else None
+                if node is not None:
+                    bucket.delete(node)
+                    self.count -= 1
+                nodes.append(node)
+        self._shrink()
+        return nodes
+
+    def __getitem__(self, key):
+        node = self.search(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key, value):
+        self.insert(key, value)
+
+    def __delitem__(self, key):
+        if self.delete(key) is None:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def __iter__(self):
+        """
+        Iterate over the keys, in no particular order. Searches may run during the iteration, as long as no key is inserted or deleted: a resize in progress is finished first, since a search would move old buckets into the slots already passed, and the keys of a bucket are listed before they are yielded, since a search can reorder them in move-to-front mode.
+        """
+        if self._old is not None:
+            self._rehash(len(self._old))
+        for bucket in self.table:
+            keys = []
+            node = bucket.head if bucket is not None else None
+            while node is not None:
+                keys.append(node.key)
+                node = node.next_ptr
+            yield from keys
 
     def __str__(self):
         """
@@ -169,9 +546,628 @@ class HashTable:
         """
         result = []
         for i, linked_list in enumerate(self.table):
-            result.append(f"Bucket {i}: {linked_list}")
+            result.append(f"Bucket {i}: {linked_list or 'Empty'}")
+        if self._old is not None:
+            for i in range(self._moved, len(self._old)):
+                result.append(f"Old bucket {i}: {self._old[i] or 'Empty'}")
+        return "\n".join(result)
+
+
+class OpenAddressingHashTable:
+    """
+    A hash table with open addressing, with the same methods as `HashTable`.
+
+    The keys, their hashes and their values are kept in three parallel lists of slots, instead of a linked list of nodes per bucket. Collisions are solved by linear probing, with Robin Hood insertion: a key that is further from its home slot takes the place of a key that is closer to its own, so that probe lengths stay short and even. A search stops at the first key that is closer to its home than the searched key would be. Deletion shifts the following keys of the cluster back by one slot, so that there are no tombstones to skip or clean up.
+
+    The home slot of a key takes the top bits of its hash times a large odd constant (Fibonacci hashing), which spreads integer keys with regular strides over the table. The number of slots is a power of two. It doubles when the load factor goes over `max_load`, which must be less than 1, and halves, down to its initial size, under `min_load`.
+
+    :ivar size: the number of slots
+    :ivar keys: the key of each slot, or `_EMPTY`
+    :ivar hashes: the scrambled hash of each slot, in an array of 64-bit integers
+    :ivar values: the value of each key
+    :ivar count: the number of keys
+    """
+
+    # The number of keys that the bulk methods hash at once (see `insert_many`)
+    batch_size = 1 << 16
+
+    def __init__(self, size=8, max_load=0.75, min_load=0.2):
+        """
+        Initialize the hash table with a given size.
+
+        :param size: the number of slots, rounded up to a power of two, which is also the smallest size the table shrinks to
+        :type size: int
+        :param max_load: the load factor over which the table grows
+        :type max_load: float
+        :param min_load: the load factor under which the table shrinks, less than half of `max_load`; 0 for a table that never shrinks
+        :type min_load: float
+        """
+        if size < 1:
+            raise ValueError("the size must be positive")
+        if not 0 <= 2 * min_load < max_load < 1:
+            raise ValueError("max_load must be less than 1, and min_load less than half of max_load")
+        self.max_load = max_load
+        self.min_load = min_load
+        self.count = 0
+        self._allocate(1 << (size - 1).bit_length())
+        self.min_size = self.size
+
+    def _allocate(self, size):
+        self.size = size
+        self._shift = 64 - (size.bit_length() - 1)
+        self.keys = [_EMPTY] * size
+        self.hashes = array('Q', bytes(8 * size))
+        self.values = [None] * size
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def load_factor(self):
+        """
+        :return: the fraction of used slots
+        :rtype: float
+        """
+        return self.count / self.size
+
+    def hash_function(self, key):
+        """
+        Compute the home slot of a key.
+
+        :param key: the key to be hashed
+        :type key: str
+        :return: the home slot
+        :rtype: int
+        """
+        return _scramble(hash(key)) >> self._shift & (self.size - 1)
+
+    def _find(self, key, scrambled):
+        """
+        :return: the slot of a key, or -1 if it is not in the table
+        :rtype: int
+        """
+        keys, hashes, shift = self.keys, self.hashes, self._shift
+        mask = self.size - 1
+        i = scrambled >> shift & mask
+        distance = 0
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                return -1
+            h = hashes[i]
+            if h == scrambled and (k is key or k == key):
+                return i
+            if (i - (h >> shift)) & mask < distance:
+                return -1
+            i = (i + 1) & mask
+            distance += 1
+
+    def _place(self, key, scrambled, value):
+        """ Put a key that is not in the table in its slot, moving the keys that are closer to their home. """
+        keys, hashes, values, shift = self.keys, self.hashes, self.values, self._shift
+        mask = self.size - 1
+        i = scrambled >> shift & mask
+        distance = 0
+        while keys[i] is not _EMPTY:
+            resident = (i - (hashes[i] >> shift)) & mask
+            if resident < distance:
+                keys[i], key = key, keys[i]
+                hashes[i], scrambled = scrambled, hashes[i]
+                values[i], value = value, values[i]
+                distance = resident
+            i = (i + 1) & mask
+            distance += 1
+        keys[i] = key
+        hashes[i] = scrambled
+        values[i] = value
+
+    def resize(self, size):
+        """
+        Rehash the keys into a given number of slots.
+
+        :param size: the new number of slots, rounded up to a power of two
+        :type size: int
+        :raises ValueError: if the size is not positive
+        """
+        if size < 1:
+            raise ValueError("the size must be positive")
+        keys, hashes, values = self.keys, self.hashes, self.values
+        self._allocate(1 << (max(size, self.count + 1) - 1).bit_length())
+        for key, scrambled, value in zip(keys, hashes, values):
+            if key is not _EMPTY:
+                self._place(key, scrambled, value)
+
+    def _check_load(self):
+        """ Grow or shrink the table if the load factor is out of bounds. """
+        if self.count > self.max_load * self.size:
+            self.resize(2 * self.size)
+        elif self.count < self.min_load * self.size and self.size > self.min_size:
+            self.resize(max(self.size // 2, self.min_size))
+
+    def insert(self, key, value=None):
+        """
+        Insert a key into the hash table, or update its value if it is already there.
+
+        :param key: the key to be inserted
+        :type key: str
+        :param value: the value mapped to the key
+        """
+        scrambled = _scramble(hash(key))
+        i = self._find(key, scrambled)
+        if i >= 0:
+            self.values[i] = value
+            return
+        self._place(key, scrambled, value)
+        self.count += 1
+        self._check_load()
+
+    put = insert
+
+    def search(self, key):
+        """
+        Search for a key in the hash table.
+
+        :param key: the key to be searched
+        :type key: str
+        :return: a new node with the key and its value, or None if not found; updating the node does not change the table
+        :rtype: Node
+        """
+        i = self._find(key, _scramble(hash(key)))
+        return Node(self.keys[i], value=self.values[i]) if i >= 0 else None
+
+    def get(self, key, default=None):
+        """
+        :return: the value mapped to a key, or `default` if the key is not in the table
+        """
+        i = self._find(key, _scramble(hash(key)))
+        return self.values[i] if i >= 0 else default
+
+    def setdefault(self, key, value=None):
+        """
+        Put a key in the table, only if it is absent.
+
+        :return: the value mapped to the key, either the one already there or `value`
+        """
+        scrambled = _scramble(hash(key))
+        i = self._find(key, scrambled)
+        if i >= 0:
+            return self.values[i]
+        self._place(key, scrambled, value)
+        self.count += 1
+        self._check_load()
+        return value
+
+    def delete(self, key):
+        """
+        Delete a key from the hash table.
+
+        :param key: the key to be deleted
+        :type key: str
+        :return: a node with the deleted key and its value, or None if the key was not in the table
+        :rtype: Node
+        """
+        i = self._find(key, _scramble(hash(key)))
+        if i < 0:
+            return None
+        node = self._remove(i)
+        self._check_load()
+        return node
+
+    def _remove(self, i):
+        """
+        Empty a slot, and shift the rest of its cluster back.
+
+        :return: a node with the key and the value of the slot
+        :rtype: Node
+        """
+        keys, hashes, values, shift = self.keys, self.hashes, self.values, self._shift
+        mask = self.size - 1
+        node = Node(keys[i], value=values[i])
+        j = (i + 1) & mask
+        while keys[j] is not _EMPTY and (j - (hashes[j] >> shift)) & mask:
+            keys[i] = keys[j]
+            hashes[i] = hashes[j]
+            values[i] = values[j]
+            i = j
+            j = (j + 1) & mask
+        keys[i] = _EMPTY
+        values[i] = None
+        self.count -= 1
+        return node
+
+    def pop(self, key, default=_MISSING):
+        """
+        Delete a key from the table.
+
+        :return: the value that was mapped to the key, or `default` if the key is not in the table
+        :raises KeyError: if the key is not in the table and there is no default
+        """
+        node = self.delete(key)
+        if node is not None:
+            return node.value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def _presize(self, extra):
+        """ Grow the table at once to the size that `extra` more keys call for. """
+        size = self.size
+        while self.count + extra > self.max_load * size:
+            size *= 2
+        if size != self.size:
+            self.resize(size)
+
+    def insert_many(self, keys, values=None):
+        """
+        Insert keys into the hash table, or update the values of those already there.
+
+        The keys are read by batches of `batch_size`, so that any iterable can be streamed. The hashes of a batch are computed first, then the table grows once, to the size the batch calls for (or the size of `keys`, if it has one), and the keys go straight to their slots.
+
+        :param keys: the keys to be inserted
+        :type keys: iterable
+        :param values: the values mapped to the keys, in the same order, or None to map the keys to None
+        :type values: iterable
+        :return: the number of keys that were not in the table
+        :rtype: int
+        :raises ValueError: if there are not as many values as keys, once the batches before the mismatch are inserted
+        """
+        if values is not None and hasattr(keys, '__len__') and hasattr(values, '__len__') and len(keys) != len(values):
+            raise ValueError("{} keys but {} values".format(len(keys), len(values)))
+        if hasattr(keys, '__len__'):
+            self._presize(len(keys))
+        added = 0
+        pairs = zip(keys, values, strict=True) if values is not None else zip(keys, repeat(None))
+        for batch in _batches(pairs, self.batch_size):
+            hashes = [_scramble(hash(key)) for key, _ in batch]
+            self._presize(len(batch))
+            find, place, stored = self._find, self._place, self.values
+            count = self.count
+            for (key, value), scrambled in zip(batch, hashes):
+                i = find(key, scrambled)
+                if i >= 0:
+                    stored[i] = value
+                else:
+                    place(key, scrambled, value)
+                    count += 1
+            added += count - self.count
+            self.count = count
+        return added
+
+    def search_many(self, keys):
+        """
+        Search for keys in the hash table, by batches of `batch_size` keys hashed at once.
+
+        :param keys: the keys to be searched
+        :type keys: iterable
+        :return: a new node with each key and its value, or None
+        :rtype: list
+        """
+        nodes = []
+        for batch in _batches(keys, self.batch_size):
+            hashes = [_scramble(h) for h in map(hash, batch)]
+            find, stored = self._find, self.values
+            for key, scrambled in zip(batch, hashes):
+                i = find(key, scrambled)
+                nodes.append(Node(self.keys[i], value=stored[i]) if i >= 0 else None)
+        return nodes
+
+    def delete_many(self, keys):
+        """
+        Delete keys from the hash table, by batches of `batch_size` keys hashed at once, then shrink the table once if it is too sparse.
+
+        :param keys: the keys to be deleted
+        :type keys: iterable
+        :return: a node with each deleted key and its value, or None if the key was not in the table
+        :rtype: list
+        """
+        nodes = []
+        for batch in _batches(keys, self.batch_size):
+            hashes = [_scramble(h) for h in map(hash, batch)]
+            find, remove = self._find, self._remove
+            for key, scrambled in zip(batch, hashes):
+                i = find(key, scrambled)
+                nodes.append(remove(i) if i >= 0 else None)
+        size = self.size
+        while self.count < self.min_load * size and size > self.min_size:
+            size //= 2
+        if size != self.size:
+            self.resize(size)
+        return nodes
+
+    def __getitem__(self, key):
+        i = self._find(key, _scramble(hash(key)))
+        if i < 0:
+            raise KeyError(key)
+        return self.values[i]
+
+    def __setitem__(self, key, value):
+        self.insert(key, value)
+
+    def __delitem__(self, key):
+        if self.delete(key) is None:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return self._find(key, _scramble(hash(key))) >= 0
+
+    def __iter__(self):
+        """ Iterate over the keys, in no particular order. """
+        for key in self.keys:
+            if key is not _EMPTY:
+                yield key
+
+    def __str__(self):
+        """
+        Return a string representation of the hash table.
+
+        :return: a string representation of the hash table
+        :rtype: str
+        """
+        result = []
+        for i, key in enumerate(self.keys):
+            if key is _EMPTY:
+                result.append(f"Slot {i}: Empty")
+            else:
+                result.append(f"Slot {i}: {Node(key, value=self.values[i])}")
         return "\n".join(result)
 
+
+def _batches(iterable, size):
+    """ Split an iterable into lists of `size` items, the last one shorter. """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def _scramble(h):
+    """ Multiply a hash by 2^64 divided by the golden ratio, modulo 2^64. """
+    return (h * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+
+TABLES = (
+    lambda **options: HashTable(**options),
+    lambda **options: HashTable(incremental=True, **options),
+    lambda **options: HashTable(move_to_front=True, **options),
+    OpenAddressingHashTable,
+)
+
+
+class CountingKey:
+    """ A key with a constant hash, which counts the calls to `__hash__` and `__eq__`. """
+
+    hashes = 0
+    comparisons = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def __hash__(self):
+        CountingKey.hashes += 1
+        return 42
+
+    def __eq__(self, other):
+        CountingKey.comparisons += 1
+        return self.name == other.name
+
+
+class HashTableTest(unittest.TestCase):
+
+    def test_insert_search_delete(self):
+        for table in TABLES:
+            ht = table(size=5)
+            for key in ("apple", "banana", "cherry", 1, 2):
+                ht.insert(key)
+            self.assertEqual(len(ht), 5)
+            self.assertEqual(ht.search("banana").key, "banana")
+            self.assertIsNone(ht.search("fig"))
+            ht.delete("banana")
+            ht.delete("fig")
+            self.assertIsNone(ht.search("banana"))
+            self.assertEqual(len(ht), 4)
+
+    def test_resize(self):
+        for incremental in (False, True):
+            ht = HashTable(size=4, incremental=incremental, rehash_step=1)
+            keys = ["key{}".format(i) for i in range(1000)]
+            for i, key in enumerate(keys):
+                ht.insert(key)
+                self.assertLessEqual(ht.load_factor, 1.0)
+                self.assertIsNotNone(ht.search(keys[i // 2]))
+            self.assertEqual(ht.size, 1024)
+            self.assertTrue(all(ht.search(key) is not None for key in keys))
+            for i, key in enumerate(keys[:-3]):
+                ht.delete(key)
+                self.assertIsNone(ht.search(key))
+                self.assertIsNotNone(ht.search(keys[-1 - i % 3]))
+            self.assertEqual(ht.size, 8)
+            self.assertEqual(len(ht), 3)
+            self.assertTrue(all(ht.search(key) is not None for key in keys[-3:]))
+
+    def test_incremental(self):
+        ht = HashTable(size=8, incremental=True, rehash_step=2)
+        for key in range(9):
+            ht.insert(key)
+        self.assertEqual(ht.size, 16)
+        self.assertIsNotNone(ht._old)
+        for key in range(9):
+            self.assertEqual(ht.search(key).key, key)
+        self.assertIsNone(ht._old)
+        self.assertEqual(sum(bucket.length for bucket in ht.table if bucket is not None), 9)
+
+    def test_iterate_while_searching(self):
+        for n in (9, 17):
+            for options in (dict(incremental=True, rehash_step=1), dict(move_to_front=True, size=1, max_load=None)):
+                ht = HashTable(**dict(dict(size=8), **options))
+                keys = ["k{}".format(i) for i in range(n)]
+                for key in keys:
+                    ht.insert(key)
+                self.assertEqual(sorted(key for key in ht if key in ht), sorted(keys))
+
+    def test_map(self):
+        for table in TABLES:
+            self.check_map(table(size=2))
+
+    def check_map(self, ht):
+        ht.put("apple", 1)
+        ht["banana"] = 2
+        ht.insert("cherry")
+        ht.put("apple", 3)
+        self.assertEqual(len(ht), 3)
+        self.assertEqual(ht["apple"], 3)
+        self.assertEqual(ht.get("banana"), 2)
+        self.assertIsNone(ht.get("cherry", 0))
+        self.assertEqual(ht.get("fig", 0), 0)
+        self.assertIn("cherry", ht)
+        self.assertNotIn("fig", ht)
+        self.assertEqual(ht.setdefault("banana", 4), 2)
+        self.assertEqual(ht.setdefault("fig", 5), 5)
+        self.assertEqual(sorted(ht), ["apple", "banana", "cherry", "fig"])
+        self.assertEqual(ht.pop("apple"), 3)
+        self.assertEqual(ht.pop("apple", None), None)
+        with self.assertRaises(KeyError):
+            ht.pop("apple")
+        with self.assertRaises(KeyError):
+            ht["apple"]
+        with self.assertRaises(KeyError):
+            del ht["apple"]
+        del ht["fig"]
+        self.assertEqual(len(ht), 2)
+
+    def test_no_duplicates(self):
+        for table in TABLES:
+            ht = table(size=4)
+            for i in range(300):
+                ht.insert(i % 100, i)
+            self.assertEqual(len(ht), 100)
+            self.assertEqual(sorted(ht), list(range(100)))
+            self.assertEqual([ht[i] for i in range(100)], list(range(200, 300)))
+
+    def test_same_as_dict(self):
+        rng = random.Random(0)
+        for table in TABLES:
+            for keys in (range(0, 1 << 20, 1 << 10), ["key{}".format(i) for i in range(1000)]):
+                ht, expected = table(), {}
+                for _ in range(20000):
+                    key = rng.choice(keys)
+                    if rng.random() < 0.4:
+                        self.assertEqual(ht.pop(key, None), expected.pop(key, None))
+                    else:
+                        ht[key] = expected[key] = rng.random()
+                    self.assertEqual(len(ht), len(expected))
+                self.assertEqual({key: ht[key] for key in ht}, expected)
+                self.assertTrue(all(ht.get(key) == expected.get(key) for key in keys))
+
+    def test_robin_hood(self):
+        ht = OpenAddressingHashTable(size=64, min_load=0)
+        rng = random.Random(1)
+        for key in rng.sample(range(10000), 40):
+            ht.insert(key)
+        for key in rng.sample(list(ht), 20):
+            ht.delete(key)
+        mask = ht.size - 1
+        distances = [None if key is _EMPTY else (i - (ht.hashes[i] >> ht._shift)) & mask for i, key in enumerate(ht.keys)]
+        for i, distance in enumerate(distances):
+            # a key is never further from its home than the key before it, plus one
+            if distance is not None:
+                self.assertLessEqual(distance, 0 if distances[i - 1] is None else distances[i - 1] + 1)
+        self.assertEqual(ht.hash_function("apple"), _scramble(hash("apple")) >> ht._shift)
+        self.assertEqual(ht.size, 64)
+        with self.assertRaises(ValueError):
+            OpenAddressingHashTable(max_load=1.0)
+
+    def test_cached_hashes(self):
+        CountingKey.hashes = CountingKey.comparisons = 0
+        ht = HashTable(size=2)
+        keys = [CountingKey(i) for i in range(20)]
+        for key in keys:
+            ht.insert(key)
+        self.assertEqual(ht.size, 32)
+        self.assertEqual(CountingKey.hashes, 20)
+        self.assertIsNotNone(ht.search(CountingKey(3)))
+        self.assertIsNone(ht.search(CountingKey(20)))
+        ht.insert("apple")
+        CountingKey.comparisons = 0
+        self.assertEqual(ht.search("apple").hash_value, hash("apple"))
+        self.assertEqual(CountingKey.comparisons, 0)
+
+    def test_move_to_front(self):
+        ht = HashTable(size=1, max_load=None, move_to_front=True)
+        for key in range(5):
+            ht.insert(key, str(key))
+        self.assertEqual(str(ht.table[0]), ' 4: 4 -> 3: 3 -> 2: 2 -> 1: 1 -> 0: 0')
+        self.assertEqual(ht[2], '2')
+        self.assertIn(0, ht)
+        self.assertEqual(str(ht.table[0]), ' 0: 0 -> 2: 2 -> 4: 4 -> 3: 3 -> 1: 1')
+        ht.insert(1, 'one')
+        ht.delete(4)
+        self.assertEqual(str(ht.table[0]), ' 1: one -> 0: 0 -> 2: 2 -> 3: 3')
+        self.assertEqual(ht.table[0].length, 4)
+
+    def test_bulk(self):
+        for table in TABLES:
+            ht, expected = table(size=4), table(size=4)
+            ht.batch_size = 7
+            keys = ["key{}".format(i % 60) for i in range(100)]
+            self.assertEqual(ht.insert_many(iter(keys), range(100)), 60)
+            for key, value in zip(keys, range(100)):
+                expected.insert(key, value)
+            self.assertEqual(len(ht), 60)
+            self.assertEqual({key: ht[key] for key in ht}, {key: expected[key] for key in expected})
+            self.assertEqual(ht.insert_many(["key0", "key100"]), 1)
+            self.assertIsNone(ht["key0"])
+            queries = ["key{}".format(i) for i in range(0, 120, 3)]
+            self.assertEqual([node and (node.key, node.value) for node in ht.search_many(queries)],
+                             [node and (node.key, node.value) for node in map(ht.search, queries)])
+            deleted = ht.delete_many(key for key in queries)
+            self.assertEqual([node is not None for node in deleted], [int(key[3:]) < 60 or key == "key100" for key in queries])
+            self.assertEqual(ht.search_many(queries), [None] * len(queries))
+            self.assertEqual(len(ht), 61 - sum(node is not None for node in deleted))
+            remaining = list(ht)
+            self.assertEqual([node.key for node in ht.delete_many(remaining)], remaining)
+            self.assertEqual(len(ht), 0)
+            self.assertEqual(ht.size, ht.min_size)
+
+    def test_bulk_values_length(self):
+        for table in TABLES:
+            ht = table()
+            with self.assertRaises(ValueError):
+                ht.insert_many(range(10), [1, 2])
+            self.assertEqual(len(ht), 0)
+            ht.batch_size = 4
+            with self.assertRaises(ValueError):
+                ht.insert_many(iter(range(10)), iter(range(9)))
+            self.assertEqual(len(ht), 8)
+            with self.assertRaises(ValueError):
+                ht.insert_many(iter(range(2)), iter(range(3)))
+
+    def test_presize(self):
+        for table in (HashTable, OpenAddressingHashTable):
+            ht = table()
+            sizes = []
+            resize = ht.resize
+            ht.resize = lambda size: sizes.append(size) or resize(size)
+            ht.insert_many(range(10000))
+            self.assertEqual(len(sizes), 1)
+            self.assertLessEqual(ht.load_factor, ht.max_load)
+            ht.delete_many(range(9990))
+            self.assertEqual(len(sizes), 2)
+            self.assertEqual([node and node.key for node in ht.search_many(range(9985, 10000))], [None] * 5 + list(range(9990, 10000)))
+
+    def test_fixed_size(self):
+        ht = HashTable(size=3, max_load=None)
+        for key in range(100):
+            ht.insert(key)
+        self.assertEqual(ht.size, 3)
+        self.assertEqual(ht.load_factor, 100 / 3)
+        for table in TABLES:
+            with self.assertRaises(ValueError):
+                table().resize(0)
+        with self.assertRaises(ValueError):
+            HashTable(max_load=1.0, min_load=0.5)
+
+
 # Example usage
 if __name__ == "__main__":
     ht = HashTable(size=5)